@@ -10,6 +10,7 @@
 
 import http.server
 import threading
+import unittest.mock
 
 from test.helper import FakeYDL, expect_dict, expect_value, http_server_port
 from yt_dlp.compat import compat_etree_fromstring
@@ -20,22 +21,45 @@
     RegexNotFoundError,
     encode_data_uri,
     strip_jsonp,
+    unified_timestamp,
 )
 
 TEAPOT_RESPONSE_STATUS = 418
 TEAPOT_RESPONSE_BODY = "<h1>418 I'm a teapot</h1>"
 
 
+VOD_M3U8 = '''#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXTINF:10.0,
+segment-1.ts
+#EXTINF:5.0,
+segment-2.ts
+#EXT-X-ENDLIST
+'''
+
+
 class InfoExtractorTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    requested_paths = []
+
     def log_message(self, format, *args):
         pass
 
     def do_GET(self):
+        self.requested_paths.append(self.path)
         if self.path == '/teapot':
             self.send_response(TEAPOT_RESPONSE_STATUS)
             self.send_header('Content-Type', 'text/html; charset=utf-8')
             self.end_headers()
             self.wfile.write(TEAPOT_RESPONSE_BODY.encode())
+        elif self.path == '/redirect-vod.m3u8':
+            self.send_response(302)
+            self.send_header('Location', '/vod.m3u8')
+            self.end_headers()
+        elif self.path == '/vod.m3u8':
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-mpegurl')
+            self.end_headers()
+            self.wfile.write(VOD_M3U8.encode())
         else:
             assert False
 
@@ -1374,13 +1398,49 @@ def test_parse_mpd_formats(self):
 
         for mpd_file, mpd_url, mpd_base_url, expected_formats, expected_subtitles in _TEST_CASES:
             with open(f'./test/testdata/mpd/{mpd_file}.mpd', encoding='utf-8') as f:
+                mpd_string = f.read()
+            for mpd_doc in (compat_etree_fromstring(mpd_string.encode()), self.ie._parse_mpd_xml(mpd_string, None)):
                 formats, subtitles = self.ie._parse_mpd_formats_and_subtitles(
-                    compat_etree_fromstring(f.read().encode()),
-                    mpd_base_url=mpd_base_url, mpd_url=mpd_url)
+                    mpd_doc, mpd_base_url=mpd_base_url, mpd_url=mpd_url)
                 self.ie._sort_formats(formats)
                 expect_value(self, formats, expected_formats, None)
                 expect_value(self, subtitles, expected_subtitles, None)
 
+    def test_parse_mpd_formats_live(self):
+        mpd_doc = compat_etree_fromstring(b'''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" availabilityStartTime="2020-01-01T00:00:00Z" timeShiftBufferDepth="PT10S" minimumUpdatePeriod="PT2S">
+  <Period id="0" start="PT0S">
+    <AdaptationSet mimeType="video/mp4">
+      <SegmentTemplate timescale="1000" duration="4000" startNumber="1" initialization="init.m4s" media="seg-$Number$.m4s"/>
+      <Representation id="v" bandwidth="1000"/>
+    </AdaptationSet>
+  </Period>
+</MPD>''')
+        # 101 seconds after availabilityStartTime: 25 segments are complete, the last 3 are within the buffer
+        with unittest.mock.patch('time.time', return_value=unified_timestamp('2020-01-01T00:01:41Z')):
+            formats, _ = self.ie._parse_mpd_formats_and_subtitles(
+                mpd_doc, mpd_base_url='http://example.com/', mpd_url='http://example.com/live.mpd')
+        self.assertEqual(
+            [fragment['path'] for fragment in formats[0]['fragments']],
+            ['init.m4s', 'seg-23.m4s', 'seg-24.m4s', 'seg-25.m4s'])
+
+        # Without timeShiftBufferDepth, only the segments of one minimumUpdatePeriod are listed
+        mpd_doc = compat_etree_fromstring(b'''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" availabilityStartTime="1970-01-01T00:00:00Z" minimumUpdatePeriod="PT8S">
+  <Period id="0" start="PT0S">
+    <AdaptationSet mimeType="video/mp4">
+      <SegmentTemplate timescale="1000" duration="2000" startNumber="1" initialization="init.m4s" media="seg-$Number$.m4s"/>
+      <Representation id="v" bandwidth="1000"/>
+    </AdaptationSet>
+  </Period>
+</MPD>''')
+        with unittest.mock.patch('time.time', return_value=unified_timestamp('2020-01-01T00:00:00Z')):
+            formats, _ = self.ie._parse_mpd_formats_and_subtitles(
+                mpd_doc, mpd_base_url='http://example.com/', mpd_url='http://example.com/live.mpd')
+        self.assertEqual(
+            [fragment['path'] for fragment in formats[0]['fragments']],
+            ['init.m4s', 'seg-788918397.m4s', 'seg-788918398.m4s', 'seg-788918399.m4s', 'seg-788918400.m4s'])
+
     def test_parse_ism_formats(self):
         _TEST_CASES = [
             (
@@ -1906,6 +1966,46 @@ def test_response_with_expected_status_returns_content(self):
             expected_status=TEAPOT_RESPONSE_STATUS)
         self.assertEqual(content, TEAPOT_RESPONSE_BODY)
 
+    def test_m3u8_manifest_cache(self):
+        httpd = http.server.HTTPServer(
+            ('127.0.0.1', 0), InfoExtractorTestRequestHandler)
+        port = http_server_port(httpd)
+        server_thread = threading.Thread(target=httpd.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        InfoExtractorTestRequestHandler.requested_paths.clear()
+
+        m3u8_url = f'http://127.0.0.1:{port}/redirect-vod.m3u8'
+        formats = self.ie._extract_m3u8_formats(m3u8_url, None)
+        self.assertEqual(formats[0]['url'], f'http://127.0.0.1:{port}/vod.m3u8')
+        self.assertEqual(self.ie._extract_m3u8_vod_duration(m3u8_url, None), 15)
+        self.assertEqual(
+            self.ie._downloader.manifest_cache.load(formats[0]['url']), (formats[0]['url'], VOD_M3U8))
+        self.assertEqual(InfoExtractorTestRequestHandler.requested_paths, ['/redirect-vod.m3u8', '/vod.m3u8'])
+        httpd.shutdown()
+
+    def test_map_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def func(x):
+            barrier.wait()
+            return x * 2
+
+        self.assertEqual(self.ie._map_concurrently(func, [1, 2, 3]), [2, 4, 6])
+
+        def fail(x):
+            if x == 2:
+                raise ValueError(x)
+            return x
+
+        with self.assertRaises(ValueError):
+            self.ie._map_concurrently(fail, [1, 2, 3])
+
+        for params in ({'concurrent_requests': 1}, {'sleep_interval_requests': 1}):
+            ie = DummyIE(FakeYDL(params))
+            self.assertEqual(
+                ie._map_concurrently(lambda _: threading.get_ident(), range(3)), [threading.get_ident()] * 3)
+
     def test_search_nextjs_data(self):
         data = '<script id="__NEXT_DATA__" type="application/json">{"props":{}}</script>'
         self.assertEqual(self.ie._search_nextjs_data(data, None), {'props': {}})
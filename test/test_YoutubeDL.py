@@ -11,6 +11,7 @@
 
 import contextlib
 import copy
+import http.cookiejar
 import json
 
 from test.helper import FakeYDL, assertRegexpMatches, try_rm
@@ -399,6 +400,38 @@ def format_info(f_id):
             downloaded = ydl.downloaded_info_dicts[0]
             self.assertEqual(downloaded['format_id'], f1['format_id'])
 
+    def test_format_sorter(self):
+        formats = [
+            {'format_id': 'av1', 'ext': 'mp4', 'vcodec': 'av01.0.05M.08', 'acodec': 'none', 'height': 1080, 'fps': 30, 'url': TEST_URL},
+            {'format_id': 'vp9', 'ext': 'webm', 'vcodec': 'vp9', 'acodec': 'none', 'height': 1080, 'fps': 60, 'url': TEST_URL},
+            {'format_id': 'hdr', 'ext': 'webm', 'vcodec': 'vp09.02', 'acodec': 'none', 'height': 720, 'dynamic_range': 'HDR10', 'url': TEST_URL},
+            {'format_id': 'avc', 'ext': 'mp4', 'vcodec': 'avc1.4d401f', 'acodec': 'mp4a.40.2', 'height': 360, 'tbr': 500, 'url': TEST_URL},
+            {'format_id': 'hls', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'aac', 'height': 720, 'protocol': 'm3u8_native', 'url': TEST_URL},
+            {'format_id': 'opus', 'ext': 'webm', 'vcodec': 'none', 'acodec': 'opus', 'abr': 160, 'url': TEST_URL},
+            {'format_id': 'm4a', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': 128, 'language_preference': 10, 'url': TEST_URL},
+            {'format_id': 'unknown', 'url': TEST_URL, 'preference': -2},
+        ]
+
+        for params, field_preference in (
+            ({}, []),
+            ({'format_sort': ['res:720', '+size', 'codec:vp9:m4a']}, []),
+            ({'format_sort': ['res~480', 'fps'], 'prefer_free_formats': True}, ['proto']),
+            ({'format_sort': ['hasaud', 'ext'], 'format_sort_force': True}, ['id']),
+        ):
+            with self.subTest(params=params, field_preference=field_preference):
+                ydl = YDL(params)
+                sorter = ydl._get_format_sorter(field_preference)
+                self.assertIs(ydl._get_format_sorter(list(field_preference)), sorter)
+                for fmt in formats:
+                    fmt = fmt.copy()
+                    self.assertEqual(sorter.calculate_preference(fmt), tuple(
+                        sorter._calculate_field_preference(fmt, field) for field in sorter._order))
+
+        ydl = YDL({'format_sort': ['res:720']})
+        sorter = ydl._get_format_sorter([])
+        ydl.params['format_sort'] = ['res:480']
+        self.assertIsNot(ydl._get_format_sorter([]), sorter)
+
     def test_audio_only_extractor_format_selection(self):
         # For extractors with incomplete formats (all formats are audio-only or
         # video-only) best and worst should fallback to corresponding best/worst
@@ -867,6 +900,14 @@ def gen():
             raise self.assertTrue(False, 'LazyList should not be evaluated till here')
         test('%(key.4)s', '4', info={'key': LazyList(gen())})
 
+        # Only the fields used by the template are copied
+        info = {**self.outtmpl_info, '__postprocessors': [], '__pending_error': 'x'}
+        test('%(__postprocessors)s-%(__pending_error)s', 'NA-NA', info=info)
+        test('%(title3&{}|)s', ('foo/bar\\test', 'foo⧸bar⧹test'), info=info)
+        outtmpl, tmpl_dict = FakeYDL().prepare_outtmpl('%(id)s-%(formats.0.id)s', info)
+        self.assertEqual(outtmpl % tmpl_dict, '1234-id 1')
+        self.assertEqual(outtmpl, FakeYDL().prepare_outtmpl('%(id)s-%(formats.0.id)s', info)[0])
+
         # Empty filename
         test('%(foo|)s-%(bar|)s.%(ext)s', '-.mp4')
         # test('%(foo|)s.%(ext)s', ('.mp4', '_.mp4'))  # FIXME: ?
@@ -889,6 +930,27 @@ def gen():
         test('%(title3)s', ('foo/bar\\test', 'foo⧸bar⧹test'))
         test('folder/%(title3)s', ('folder/foo/bar\\test', f'folder{os.path.sep}foo⧸bar⧹test'))
 
+    def test_info_json_encoder(self):
+        info = {
+            'id': '1234', 'title': 'ünïcode "quoted"', 'epoch': 1, '_version': {}, 'duration': None,
+            'filepath': 'a.mp4', '__postprocessors': [], 'tbr': float('nan'), 'count': 2**70,
+            'formats': [{'format_id': 'a', 'fragments': LazyList([{'path': str(i)} for i in range(3)])}],
+            'tags': ('a', 'b'), 'ids': {1}, 'type': LazyList,
+        }
+        for remove_private_keys in (False, True):
+            for kwargs in ({}, {'ensure_ascii': False}, {'indent': 2}):
+                expected = json.dumps(YoutubeDL.sanitize_info(copy.deepcopy(info), remove_private_keys), **kwargs)
+                self.assertEqual(json.dumps(
+                    info, cls=YoutubeDL.InfoJSONEncoder, remove_private_keys=remove_private_keys, **kwargs), expected)
+        self.assertEqual(json.dumps(None, cls=YoutubeDL.InfoJSONEncoder), 'null')
+        self.assertEqual(
+            json.dumps({1: {True: 1.5, None: False}, 'epoch': 1, '_version': {}}, cls=YoutubeDL.InfoJSONEncoder),
+            '{"1": {"true": 1.5, "null": false}, "epoch": 1, "_version": {}, "_type": "video"}')
+
+        info = {}
+        json.dumps(info, cls=YoutubeDL.InfoJSONEncoder)
+        self.assertEqual(info['_type'], 'video')
+
     def test_format_note(self):
         ydl = YoutubeDL()
         self.assertEqual(ydl._format_note({}), '')
@@ -1348,6 +1410,55 @@ def test(initial_info, note):
 
         try_rm(TEST_FILE)
 
+    def test_load_info_json(self):
+        fragments = [{'url': f'https://example.com/{i}.m4s', 'duration': 2.0, 'path': None} for i in range(3)]
+        info = {
+            'id': '1', 'title': '"fragments": [] \\"fragments\\": [', 'epoch': 1, '_version': {},
+            'formats': [
+                {'format_id': 'a', 'url': TEST_URL, 'fragments': fragments},
+                {'format_id': 'b', 'url': TEST_URL, 'fragments': [{'url': TEST_URL, 'range': [0, 1]}]},
+                {'format_id': 'c', 'url': TEST_URL, 'fragments': []},
+            ],
+            'fragments': fragments,
+        }
+        for clean_infojson in (False, True):
+            ydl = FakeYDL({'clean_infojson': clean_infojson})
+            json_data = json.dumps(info, indent=2 * clean_infojson)
+            expected = ydl.sanitize_info(json.loads(json_data), clean_infojson)
+            infos = ydl._load_info_json(json_data)
+            self.assertEqual(len(infos), 1)
+            self.assertIsInstance(infos[0]['fragments'], LazyList)
+            self.assertIsInstance(infos[0]['formats'][0]['fragments'], LazyList)
+            self.assertIsInstance(infos[0]['formats'][1]['fragments'], list)
+            self.assertEqual(ydl.sanitize_info(infos[0]), expected)
+            infos = ydl._load_info_json(f'[{json_data}, {json_data}]')
+            self.assertEqual(list(map(ydl.sanitize_info, infos)), [expected, expected])
+
+    def test_calc_headers_cache(self):
+        ydl = FakeYDL({'http_headers': {'Referer': 'https://example.com/'}})
+        ydl.cookiejar.set_cookie(http.cookiejar.Cookie(
+            0, 'a', 'b', None, False, '.example.com', True, True, '/', False, False, None, False, None, None, {}))
+        headers = {'X-Test': '1'}
+        formats = [
+            {'format_id': str(i), 'url': f'https://cdn{i % 2}.example.com/video?itag={i}', 'http_headers': headers}
+            for i in range(6)]
+        formats.append({'format_id': 'other', 'url': 'https://other.test/video'})
+
+        with patch.object(ydl.cookiejar, 'get_cookies_for_url', wraps=ydl.cookiejar.get_cookies_for_url) as get_cookies:
+            result = ydl.process_ie_result(_make_result(formats, __x_forwarded_for_ip='1.2.3.4'), download=False)
+        self.assertEqual(get_cookies.call_count, 3)
+
+        for fmt in result['formats']:
+            if fmt['format_id'] == 'other':
+                self.assertNotIn('cookies', fmt)
+                self.assertNotIn('X-Test', fmt['http_headers'])
+            else:
+                self.assertEqual(fmt['cookies'], 'a=b; Domain=.example.com; Path=/')
+                self.assertEqual(fmt['http_headers']['X-Test'], '1')
+            self.assertEqual(fmt['http_headers']['X-Forwarded-For'], '1.2.3.4')
+            self.assertEqual(fmt['http_headers']['Referer'], 'https://example.com/')
+        self.assertIsNot(result['formats'][0]['http_headers'], result['formats'][2]['http_headers'])
+
     def test_add_headers_cookie(self):
         def check_for_cookie_header(result):
             return traverse_obj(result, ((None, ('formats', 0)), 'http_headers', 'Cookie'), casesense=False, get_all=False)
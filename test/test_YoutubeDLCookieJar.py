@@ -8,8 +8,11 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import http.cookiejar
 import re
 import tempfile
+import time
+import urllib.request
 
 from yt_dlp.cookies import YoutubeDLCookieJar
 
@@ -61,6 +64,73 @@ def test_get_cookies_for_url(self):
         cookies = cookiejar.get_cookies_for_url('https://foobar.foobar/')
         self.assertFalse(cookies)
 
+    def test_get_cookies_for_url_matches_cookiejar(self):
+        def make_cookie(domain, name, path='/', secure=False, expires=None):
+            return http.cookiejar.Cookie(
+                0, name, f'{name}_VALUE', None, False, domain, bool(domain), domain.startswith('.'),
+                path, path != '/', secure, expires, False, None, None, {})
+
+        cookiejar = YoutubeDLCookieJar()
+        for i in range(50):
+            cookiejar.set_cookie(make_cookie(f'.unrelated{i}.test', 'UNRELATED'))
+        cookiejar.set_cookie(make_cookie('.foobar.foobar', 'PARENT'))
+        cookiejar.set_cookie(make_cookie('www.foobar.foobar', 'HOST'))
+        cookiejar.set_cookie(make_cookie('.www.foobar.foobar', 'PATH', path='/path'))
+        cookiejar.set_cookie(make_cookie('.foobar.foobar', 'SECURE', secure=True))
+        cookiejar.set_cookie(make_cookie('.ar.foobar', 'NOT_A_LABEL_BOUNDARY'))
+        cookiejar.set_cookie(make_cookie('.foobar.foobar', 'EXPIRED', expires=1))
+        cookiejar.set_cookie(make_cookie('localhost.local', 'LOCAL'))
+
+        reference = http.cookiejar.CookieJar()
+        for cookie in cookiejar:
+            reference.set_cookie(cookie)
+
+        for url in (
+            'http://www.foobar.foobar/', 'https://www.foobar.foobar/path/video',
+            'https://sub.www.foobar.foobar/path', 'https://foobar.foobar/',
+            'http://localhost:8080/', 'https://unrelated3.test/',
+        ):
+            with self.subTest(url=url):
+                reference._policy._now = reference._now = int(time.time())
+                expected = reference._cookies_for_request(urllib.request.Request(url))
+                # Check both the uncached and the cached lookup
+                for _ in range(2):
+                    self.assertEqual(
+                        [cookie.name for cookie in cookiejar.get_cookies_for_url(url)],
+                        [cookie.name for cookie in expected])
+
+    def test_get_cookies_for_url_cache_invalidation(self):
+        cookiejar = YoutubeDLCookieJar('./test/testdata/cookies/session_cookies.txt')
+        cookiejar.load()
+        self.assertEqual(len(cookiejar.get_cookies_for_url('https://www.foobar.foobar/')), 2)
+
+        cookiejar.clear('www.foobar.foobar', '/', 'YoutubeDLExpires0')
+        self.assertEqual(len(cookiejar.get_cookies_for_url('https://www.foobar.foobar/')), 1)
+
+        cookiejar.set_cookie(http.cookiejar.Cookie(
+            0, 'NEW', 'NEW_VALUE', None, False, '.foobar.foobar', True, True,
+            '/', False, False, None, False, None, None, {}))
+        self.assertEqual(
+            sorted(cookie.name for cookie in cookiejar.get_cookies_for_url('https://www.foobar.foobar/')),
+            ['NEW', 'YoutubeDLExpiresEmpty'])
+        self.assertIn('NEW=NEW_VALUE', cookiejar.get_cookie_header('https://foobar.foobar/'))
+
+        cookiejar.clear()
+        self.assertFalse(cookiejar.get_cookies_for_url('https://www.foobar.foobar/'))
+
+    def test_get_cookies_for_url_cache_size(self):
+        cookiejar = YoutubeDLCookieJar('./test/testdata/cookies/session_cookies.txt')
+        cookiejar.load()
+        for i in range(cookiejar._LOOKUP_CACHE_SIZE * 2):
+            self.assertEqual(len(cookiejar.get_cookies_for_url(f'https://www.foobar.foobar/segment-{i}.ts')), 2)
+        self.assertEqual(len(cookiejar._lookup_cache), cookiejar._LOOKUP_CACHE_SIZE)
+
+    def test_get_cookies_for_url_without_host(self):
+        cookiejar = YoutubeDLCookieJar('./test/testdata/cookies/session_cookies.txt')
+        cookiejar.load()
+        self.assertEqual(cookiejar.get_cookies_for_url('data:text/plain,hello'), [])
+        self.assertIsNone(cookiejar.get_cookie_header('data:text/plain,hello'))
+
 
 if __name__ == '__main__':
     unittest.main()
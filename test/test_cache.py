@@ -9,9 +9,11 @@
 
 
 import shutil
+import time
+from unittest.mock import patch
 
 from test.helper import FakeYDL
-from yt_dlp.cache import Cache
+from yt_dlp.cache import Cache, ManifestCache
 
 
 def _is_empty(d):
@@ -52,6 +54,23 @@ def test_cache(self):
         self.assertFalse(os.path.exists(self.test_dir))
         self.assertEqual(c.load('test_cache', 'k.'), None)
 
+    def test_manifest_cache(self):
+        c = ManifestCache(FakeYDL())
+        self.assertEqual(c.load('http://a'), None)
+        c.store('http://a', 'manifest a', 'http://redirected/a')
+        c.store('http://b', 'manifest b')
+        self.assertEqual(c.load('http://a'), ('http://redirected/a', 'manifest a'))
+        self.assertEqual(c.load('http://b'), ('http://b', 'manifest b'))
+
+        with patch.object(ManifestCache, 'MAX_ENTRIES', 2):
+            c.load('http://a')
+            c.store('http://c', 'manifest c')
+            self.assertEqual(c.load('http://b'), None)
+            self.assertEqual(c.load('http://a'), ('http://redirected/a', 'manifest a'))
+
+        with patch('time.monotonic', return_value=time.monotonic() + ManifestCache.MAX_AGE + 1):
+            self.assertEqual(c.load('http://a'), None)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import threading
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+# (type, startNumber, number of segments) of the MPD on each refresh
+LIVE_MPD_WINDOWS = [('dynamic', 1, 3), ('dynamic', 2, 4), ('dynamic', 4, 2), ('static', 4, 3)]
+
+LIVE_MPD_TMPL = '''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="{type}" minimumUpdatePeriod="PT0.1S" profiles="urn:mpeg:dash:profile:isoff-live:2011">
+  <Period id="0" start="PT0S">
+    <AdaptationSet mimeType="video/mp4">
+      <SegmentTemplate timescale="1" startNumber="{start}" initialization="init.m4s" media="seg-$Number$.m4s">
+        <SegmentTimeline><S t="{t}" d="2" r="{r}"/></SegmentTimeline>
+      </SegmentTemplate>
+      <Representation id="v" bandwidth="1000" codecs="avc1.4d401f" width="640" height="360"/>
+    </AdaptationSet>
+  </Period>
+</MPD>'''
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    mpd_fetches = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, content_type, payload):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', len(payload))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == '/live.mpd':
+            mpd_type, start, count = LIVE_MPD_WINDOWS[min(self.mpd_fetches, len(LIVE_MPD_WINDOWS) - 1)]
+            HTTPTestRequestHandler.mpd_fetches += 1
+            self.respond('application/dash+xml', LIVE_MPD_TMPL.format(
+                type=mpd_type, start=start, t=(start - 1) * 2, r=count - 1).encode())
+        elif self.path == '/init.m4s':
+            self.respond('video/mp4', b'init|')
+        elif self.path.startswith('/seg-'):
+            self.respond('video/mp4', self.path[1:].encode() + b'|')
+        else:
+            assert False
+
+
+class TestDashSegmentsFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+
+    def download_live(self, params):
+        HTTPTestRequestHandler.mpd_fetches = 0
+        ydl = YoutubeDL({'logger': FakeLogger(), **params})
+        filename = 'testfile.mp4'
+        try_rm(filename)
+        mpd_url = f'http://127.0.0.1:{self.port}/live.mpd'
+        self.assertTrue(DashSegmentsFD(ydl, ydl.params).real_download(filename, {
+            'id': 'live',
+            'extractor_key': 'Generic',
+            'format_id': 'dash-v',
+            'manifest_url': mpd_url,
+            'manifest_stream_number': 0,
+            'url': mpd_url,
+            'protocol': 'http_dash_segments',
+            'fragments': [],
+            'is_live': True,
+        }))
+        with open(filename, 'rb') as f:
+            content = f.read()
+        try_rm(filename)
+        return content
+
+    def test_live(self):
+        # Each segment is downloaded once, until the MPD becomes static
+        expected = b'init|' + b''.join(b'seg-%d.m4s|' % number for number in range(1, 7))
+        self.assertEqual(self.download_live({}), expected)
+        self.assertEqual(HTTPTestRequestHandler.mpd_fetches, len(LIVE_MPD_WINDOWS))
+        self.assertEqual(self.download_live({'concurrent_fragment_downloads': 3}), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,11 +8,12 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import gzip
 import http.server
 import re
 import threading
 
-from test.helper import http_server_port, try_rm
+from test.helper import http_server_port, try_rm, verify_address_availability
 from yt_dlp import YoutubeDL
 from yt_dlp.downloader.http import HttpFD
 from yt_dlp.utils import encodeFilename
@@ -25,6 +26,8 @@
 
 
 class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    client_addresses = []
+
     def log_message(self, format, *args):
         pass
 
@@ -56,6 +59,7 @@ def serve(self, range=True, content_length=True):
         self.wfile.write(b'#' * size)
 
     def do_GET(self):
+        self.client_addresses.append(self.client_address[0])
         if self.path == '/regular':
             self.serve()
         elif self.path == '/no-content-length':
@@ -64,6 +68,14 @@ def do_GET(self):
             self.serve(range=False)
         elif self.path == '/no-range-no-content-length':
             self.serve(range=False, content_length=False)
+        elif self.path == '/gzip':
+            payload = gzip.compress(b'#' * TEST_SIZE)
+            self.send_response(200)
+            self.send_header('Content-Type', 'video/mp4')
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', len(payload))
+            self.end_headers()
+            self.wfile.write(payload)
         else:
             assert False
 
@@ -101,6 +113,41 @@ def test_chunked(self):
             'http_chunk_size': 1000,
         })
 
+    def test_content_encoding(self):
+        progress = []
+        ydl = YoutubeDL({'logger': FakeLogger()})
+        downloader = HttpFD(ydl, ydl.params)
+        downloader.add_progress_hook(progress.append)
+        self.assertTrue(downloader.real_download('testfile.mp4', {'url': f'http://127.0.0.1:{self.port}/gzip'}))
+        self.assertEqual(os.path.getsize(encodeFilename('testfile.mp4')), TEST_SIZE)
+        try_rm(encodeFilename('testfile.mp4'))
+        wire_len = len(gzip.compress(b'#' * TEST_SIZE))
+        downloading = [p for p in progress if p['status'] == 'downloading']
+        self.assertEqual(downloading[-1]['downloaded_bytes'], TEST_SIZE)
+        self.assertEqual(downloading[-1]['downloaded_wire_bytes'], wire_len)
+        self.assertEqual(downloading[-1]['total_wire_bytes'], wire_len)
+        self.assertIsNone(downloading[-1]['total_bytes'])
+
+        # The filesize limits apply to the size on the wire
+        ydl = YoutubeDL({'logger': FakeLogger(), 'max_filesize': wire_len - 1})
+        self.assertFalse(HttpFD(ydl, ydl.params).real_download(
+            'testfile.mp4', {'url': f'http://127.0.0.1:{self.port}/gzip'}))
+        ydl = YoutubeDL({'logger': FakeLogger(), 'max_filesize': wire_len})
+        self.assertTrue(HttpFD(ydl, ydl.params).real_download(
+            'testfile.mp4', {'url': f'http://127.0.0.1:{self.port}/gzip'}))
+        try_rm(encodeFilename('testfile.mp4'))
+
+    def test_source_addresses(self):
+        source_addresses = ['127.0.0.5', '127.0.0.6']
+        for source_address in source_addresses:
+            verify_address_availability(source_address)
+        HTTPTestRequestHandler.client_addresses.clear()
+        self.download({
+            'http_chunk_size': 1000,
+            'source_addresses': source_addresses,
+        }, 'regular')
+        self.assertEqual(set(HTTPTestRequestHandler.client_addresses), set(source_addresses))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -22,7 +22,9 @@
 import tempfile
 import threading
 import time
+import types
 import urllib.error
+import urllib.parse
 import urllib.request
 import warnings
 import zlib
@@ -39,13 +41,18 @@
 from yt_dlp.dependencies import brotli, curl_cffi, requests, urllib3
 from yt_dlp.networking import (
     HEADRequest,
+    HTTPCache,
+    NetworkMetrics,
+    ProxyPool,
     PUTRequest,
+    RateLimiter,
     Request,
     RequestDirector,
     RequestHandler,
     Response,
+    SourceAddressPool,
 )
-from yt_dlp.networking._urllib import UrllibRH
+from yt_dlp.networking._urllib import ContentDecodingReader, UrllibRH
 from yt_dlp.networking.exceptions import (
     CertificateVerifyError,
     HTTPError,
@@ -431,6 +438,39 @@ def test_raise_http_error(self, handler):
             # Should not raise an error
             validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200')).close()
 
+    def test_network_metrics(self, handler):
+        metrics = NetworkMetrics()
+        hook_records = []
+        metrics.hooks.append(hook_records.append)
+        director = RequestDirector(logger=FakeLogger(), metrics=metrics)
+        with handler(verify=False) as rh:
+            director.add_handler(rh)
+            res = director.send(Request(f'https://127.0.0.1:{self.https_port}/gen_200'))
+            res.read()
+            res.close()
+            with pytest.raises(HTTPError):
+                director.send(Request(f'https://127.0.0.1:{self.https_port}/gen_404'))
+
+        assert hook_records == list(metrics.requests)
+        first, second = metrics.requests
+        assert first['status'] == 200
+        assert first['error'] is None
+        assert first['handler'] == rh.RH_KEY
+        assert first['host'] == '127.0.0.1'
+        for phase in ('connect', 'tls', 'ttfb', 'transfer'):
+            assert first[phase] >= 0
+        assert first['tls'] <= first['ttfb']
+        assert second['status'] == 404
+        assert second['error']
+        assert 'transfer' not in second
+
+        stats = metrics.summary()['127.0.0.1'][rh.RH_KEY]
+        assert stats['requests'] == 2
+        assert stats['errors'] == 1
+        assert stats['ttfb']['count'] == 2
+        assert stats['transfer']['count'] == 1
+        assert stats['ttfb']['max'] >= first['ttfb']
+
     def test_response_url(self, handler):
         with handler() as rh:
             # Response url should be that of the last url in redirect chain
@@ -614,6 +654,17 @@ def test_source_address(self, handler):
                 rh, Request(f'http://127.0.0.1:{self.http_port}/source_address')).read().decode()
             assert source_address == data
 
+    def test_source_address_extension(self, handler):
+        source_addresses = [f'127.0.0.{random.randint(5, 255)}' for _ in range(2)]
+        for source_address in source_addresses:
+            verify_address_availability(source_address)
+        with handler(source_address=source_addresses[0]) as rh:
+            for source_address in (*source_addresses, None):
+                data = validate_and_send(rh, Request(
+                    f'http://127.0.0.1:{self.http_port}/source_address',
+                    extensions={'source_address': source_address})).read().decode()
+                assert data == (source_address or source_addresses[0])
+
     # Not supported by CurlCFFI
     @pytest.mark.skip_handler('CurlCFFI', 'not supported by curl-cffi')
     def test_gzip_trailing_garbage(self, handler):
@@ -680,6 +731,21 @@ def test_read(self, handler):
             assert res.read().decode().endswith('\n\n')
             assert res.read() == b''
 
+    def test_readinto(self, handler):
+        with handler() as rh:
+            for encoding in ('gzip', 'deflate'):
+                res = validate_and_send(
+                    rh, Request(
+                        f'http://127.0.0.1:{self.http_port}/content-encoding',
+                        headers={'ytdl-encoding': encoding}))
+                buffer = memoryview(bytearray(8))
+                data = b''
+                while size := res.readinto(buffer):
+                    data += buffer[:size]
+                assert data == b'<html><video src="/vid.mp4" /></html>'
+                assert res.readinto(buffer) == 0
+                assert res.read() == b''
+
     def test_request_disable_proxy(self, handler):
         for proxy_proto in handler._SUPPORTED_PROXY_SCHEMES or ['http']:
             # Given the handler is configured with a proxy
@@ -858,6 +924,49 @@ def get_response():
 
         assert get_response().read() == b'<html></html>'
 
+    @pytest.mark.parametrize('encoding', [
+        'gzip', 'deflate', 'gzip, deflate',
+        pytest.param('br', marks=pytest.mark.skipif(not brotli, reason='brotli support is not installed')),
+    ])
+    def test_content_decoding(self, handler, encoding):
+        with handler() as rh:
+            res = validate_and_send(
+                rh, Request(
+                    f'http://127.0.0.1:{self.http_port}/content-encoding',
+                    headers={'ytdl-encoding': encoding}))
+            assert res.read(6) == b'<html>'
+            assert res.read() == b'<video src="/vid.mp4" /></html>'
+            assert res.wire_bytes == int(res.headers['Content-Length'])
+
+    def test_content_decoding_reader(self):
+        payload = os.urandom(256 * 1024) * 8
+        for encoding, data in (
+            ('gzip', gzip.compress(payload) + b'trailing garbage'),
+            ('deflate', zlib.compress(payload)),
+            ('deflate', zlib.compress(payload, wbits=-zlib.MAX_WBITS)),
+        ):
+            reader = ContentDecodingReader(io.BytesIO(data), [encoding])
+            # Decoded incrementally
+            assert reader.read(1024) == payload[:1024]
+            assert reader.wire_bytes < len(data)
+            buffer = bytearray(1024)
+            assert reader.readinto(buffer) == 1024
+            assert buffer == payload[1024:2048]
+            assert reader.read() == payload[2048:]
+            assert reader.read() == b''
+            assert reader.wire_bytes == len(data)
+            assert reader.bytes_read == len(payload)
+
+        # Encodings are decoded in reverse order of their application
+        reader = ContentDecodingReader(io.BytesIO(zlib.compress(gzip.compress(payload))), ['deflate', 'gzip'])
+        assert reader.read() == payload
+
+        reader = ContentDecodingReader(io.BytesIO(gzip.compress(payload)[:-100]), ['gzip'])
+        with pytest.raises(zlib.error):
+            reader.read()
+
+        assert ContentDecodingReader(io.BytesIO(b''), ['gzip', 'deflate']).read() == b''
+
     def test_verify_cert_error_text(self, handler):
         # Check the output of the error message
         with handler() as rh:
@@ -994,6 +1103,12 @@ def test_impersonate(self, handler, params, extensions):
             # Check that user agent is added over ours
             assert 'User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36' in res
 
+    def test_http2_preference(self, handler):
+        with FakeYDL() as ydl:
+            assert ydl._request_director._get_handlers(
+                Request('https://127.0.0.1', extensions={'http2': True}))[0].RH_KEY == 'CurlCFFI'
+            assert ydl._request_director._get_handlers(Request('https://127.0.0.1'))[-1].RH_KEY == 'CurlCFFI'
+
     def test_headers(self, handler):
         with handler(headers=std_headers) as rh:
             # Ensure curl-impersonate overrides our standard headers (usually added
@@ -1271,6 +1386,10 @@ class HTTPSupportedRH(ValidationRH):
             ({'legacy_ssl': False}, False),
             ({'legacy_ssl': True}, False),
             ({'legacy_ssl': 'notabool'}, AssertionError),
+            ({'source_address': '127.0.0.1'}, False),
+            ({'source_address': 127}, AssertionError),
+            ({'http2': True}, False),
+            ({'http2': 'notabool'}, AssertionError),
         ]),
         ('Requests', 'http', [
             ({'cookiejar': 'notacookiejar'}, AssertionError),
@@ -1281,6 +1400,8 @@ class HTTPSupportedRH(ValidationRH):
             ({'legacy_ssl': False}, False),
             ({'legacy_ssl': True}, False),
             ({'legacy_ssl': 'notabool'}, AssertionError),
+            ({'source_address': '127.0.0.1'}, False),
+            ({'source_address': 127}, AssertionError),
         ]),
         ('CurlCFFI', 'http', [
             ({'cookiejar': 'notacookiejar'}, AssertionError),
@@ -1297,6 +1418,9 @@ class HTTPSupportedRH(ValidationRH):
             ({'legacy_ssl': False}, False),
             ({'legacy_ssl': True}, False),
             ({'legacy_ssl': 'notabool'}, AssertionError),
+            ({'source_address': '127.0.0.1'}, False),
+            ({'source_address': 127}, AssertionError),
+            ({'http2': True}, False),
         ]),
         (NoCheckRH, 'http', [
             ({'cookiejar': 'notacookiejar'}, False),
@@ -1308,6 +1432,8 @@ class HTTPSupportedRH(ValidationRH):
             ({'legacy_ssl': False}, False),
             ({'legacy_ssl': True}, False),
             ({'legacy_ssl': 'notabool'}, AssertionError),
+            ({'source_address': '127.0.0.1'}, False),
+            ({'source_address': 127}, AssertionError),
         ]),
     ]
 
@@ -1537,6 +1663,207 @@ def mock_close(*args, **kwargs):
         director.close()
         assert called
 
+    def test_send_many(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        class ConcurrentRH(FakeRH):
+            def _send(self, request: Request):
+                if request.url == 'http://error/':
+                    raise TransportError('error')
+                barrier.wait()
+                return super()._send(request)
+
+        director = RequestDirector(logger=FakeLogger())
+        director.add_handler(ConcurrentRH(logger=FakeLogger()))
+        assert director.send_many([]) == []
+
+        urls = ['http://a/', 'http://b/', 'http://c/']
+        futures = director.send_many(map(Request, urls))
+        assert [future.result().url for future in futures] == urls
+
+        futures = director.send_many([Request('http://error/')])
+        with pytest.raises(TransportError):
+            futures[0].result()
+
+    def test_http_cache(self, tmp_path):
+        sent = []
+
+        class CacheTestRH(FakeRH):
+            def _send(self, request: Request):
+                sent.append(request)
+                path = urllib.parse.urlparse(request.url).path
+                headers = {
+                    '/fresh': {'Cache-Control': 'max-age=3600'},
+                    '/etag': {'Cache-Control': 'no-cache', 'ETag': '"v1"'},
+                    '/no-store': {'Cache-Control': 'no-store', 'ETag': '"v1"'},
+                }[path]
+                if 'ETag' in headers and request.headers.get('If-None-Match') == headers['ETag']:
+                    raise HTTPError(Response(fp=io.BytesIO(b''), headers=headers, url=request.url, status=304))
+                return Response(fp=io.BytesIO(path.encode()), headers=headers, url=request.url)
+
+        director = RequestDirector(logger=FakeLogger(), http_cache=HTTPCache(str(tmp_path)))
+        director.add_handler(CacheTestRH(logger=FakeLogger()))
+
+        def send(path, **extensions):
+            response = director.send(Request(f'http://cache{path}', extensions=extensions))
+            return response.read(), response.extensions.get('http_cache')
+
+        # Fresh responses are served without a request
+        assert send('/fresh', cache=True) == (b'/fresh', None)
+        assert send('/fresh', cache=True) == (b'/fresh', 'hit')
+        assert len(sent) == 1
+
+        # Responses with validators are revalidated with a conditional request
+        assert send('/etag', cache=True) == (b'/etag', None)
+        assert 'If-None-Match' not in sent[-1].headers
+        assert send('/etag', cache=True) == (b'/etag', 'revalidated')
+        assert sent[-1].headers['If-None-Match'] == '"v1"'
+        assert len(sent) == 3
+
+        # Only cacheable requests and responses are cached
+        assert send('/no-store', cache=True) == (b'/no-store', None)
+        assert send('/no-store', cache=True) == (b'/no-store', None)
+        assert 'If-None-Match' not in sent[-1].headers
+        assert send('/fresh') == (b'/fresh', None)
+        assert len(sent) == 6
+
+    def test_proxy_pool(self, monkeypatch):
+        # Always pick the first available proxy
+        monkeypatch.setattr(random, 'choices', lambda population, weights: population[:1])
+        sent, broken = [], {'http://bad'}
+
+        class ProxyPoolTestRH(FakeRH):
+            def _send(self, request: Request):
+                proxy = request.proxies['all']
+                sent.append(proxy)
+                if proxy in broken:
+                    raise ProxyError(proxy)
+                return Response(fp=io.BytesIO(proxy.encode()), headers={}, url=request.url)
+
+        pool = ProxyPool(['http://bad', 'http://good'], max_failures=2)
+        director = RequestDirector(logger=FakeLogger(), proxy_pool=pool)
+        director.add_handler(ProxyPoolTestRH(logger=FakeLogger()))
+
+        def send(method='GET', **extensions):
+            sent.clear()
+            return director.send(Request('http://a/', method=method, extensions=extensions)).read()
+
+        # Failed requests are retried through the next proxy
+        assert send(proxy_pool_key='video') == b'http://good'
+        assert sent == ['http://bad', 'http://good']
+        assert pool.healthy_proxies() == ['http://bad', 'http://good']
+
+        # Requests with the same key stick to the same proxy
+        assert send(proxy_pool_key='video') == b'http://good'
+        assert sent == ['http://good']
+
+        # Failing proxies are ejected
+        assert send() == b'http://good'
+        assert sent == ['http://bad', 'http://good']
+        assert pool.healthy_proxies() == ['http://good']
+        assert send() == b'http://good'
+        assert sent == ['http://good']
+
+        # Only idempotent requests are retried
+        broken.add('http://good')
+        with pytest.raises(ProxyError):
+            send(method='POST')
+        assert sent == ['http://good']
+
+        # Ejected proxies are given another try after check_interval
+        broken.discard('http://bad')
+        pool.check_interval = 0
+        assert send(proxy_pool_key='video') == b'http://bad'
+        assert sent == ['http://good', 'http://bad']
+        assert pool.healthy_proxies() == ['http://bad']
+        assert send(proxy_pool_key='video') == b'http://bad'
+
+        # Requests with proxies of their own bypass the pool
+        sent.clear()
+        director.send(Request('http://a/', proxies={'all': 'http://own'})).read()
+        assert sent == ['http://own']
+
+    def test_rate_limiter(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(time, 'sleep', sleeps.append)
+
+        class RateLimitedRH(FakeRH):
+            def _send(self, request: Request):
+                if request.url.endswith('/429'):
+                    raise HTTPError(Response(
+                        fp=io.BytesIO(b''), headers={'Retry-After': '30'}, url=request.url, status=429))
+                fp = io.BytesIO(b'x' * 1000)
+                if request.url.endswith('/no-readinto'):
+                    fp = types.SimpleNamespace(read=fp.read, close=fp.close)
+                return Response(fp=fp, headers={}, url=request.url)
+
+        rate_limiter = RateLimiter(requests_per_second=10, bytes_per_second=1000, burst=2)
+        director = RequestDirector(logger=FakeLogger(), rate_limiter=rate_limiter)
+        director.add_handler(RateLimitedRH(logger=FakeLogger()))
+
+        # Burst, then paced to the request rate
+        director.send(Request('http://a/'))
+        director.send(Request('http://a/'))
+        assert not sleeps
+        director.send(Request('http://a/'))
+        assert sleeps == [pytest.approx(0.1, abs=0.05)]
+
+        # Each host has its own budget
+        sleeps.clear()
+        response = director.send(Request('http://b/'))
+        assert response.read(500) == b'x' * 500
+        assert response.read() == b'x' * 500
+        assert not sleeps
+        director.send(Request('http://b/')).read()
+        assert sleeps == [pytest.approx(1, abs=0.05)]
+
+        # Retry-After blocks the host and slows down its request rate
+        sleeps.clear()
+        with pytest.raises(HTTPError):
+            director.send(Request('http://c/429'))
+        director.send(Request('http://c/'))
+        assert sleeps == [pytest.approx(30, abs=0.5)]
+        assert rate_limiter._hosts['c']['rate_factor'] < 1
+
+        # Bytes read with readinto() are counted once, also when it falls back to read()
+        reserved = []
+        monkeypatch.setattr(rate_limiter, 'reserve_bytes', lambda host, amount: reserved.append(amount) or 0)
+        for url in ('http://f/', 'http://f/no-readinto'):
+            reserved.clear()
+            response = director.send(Request(url))
+            buffer = bytearray(1000)
+            assert response.readinto(buffer) == 1000
+            assert response.read() == b''
+            assert reserved == [1000, 0]
+
+        # Retry-After is capped
+        rate_limiter = RateLimiter(max_retry_after=60)
+        assert rate_limiter.report_response('d', 429, {'Retry-After': '31536000'}) == 31536000
+        assert rate_limiter.reserve_request('d') == pytest.approx(60, abs=0.5)
+        assert rate_limiter.report_response('e', 503, {'Retry-After': '30'}) is None
+        assert rate_limiter.reserve_request('e') == pytest.approx(30, abs=0.5)
+
+
+class TestSourceAddressPool:
+    def test_round_robin(self):
+        pool = SourceAddressPool(['127.0.0.1', '127.0.0.2', '127.0.0.3'])
+        assert [pool.get() for _ in range(6)] == ['127.0.0.1', '127.0.0.2', '127.0.0.3'] * 2
+
+    def test_throughput_weights(self):
+        pool = SourceAddressPool(['127.0.0.1', '127.0.0.2'])
+        pool.report('127.0.0.1', 3000, 1)
+        pool.report('127.0.0.2', 1000, 1)
+        pool.report('127.0.0.3', 1000, 1)  # unknown addresses are ignored
+        addresses = [pool.get() for _ in range(8)]
+        assert addresses.count('127.0.0.1') == 6
+        assert addresses.count('127.0.0.2') == 2
+
+        # Addresses without throughput are still used occasionally
+        pool.report('127.0.0.2', 0, 1)
+        pool.report('127.0.0.2', 0, 1)
+        pool.report('127.0.0.2', 0, 1)
+        assert '127.0.0.2' in [pool.get() for _ in range(40)]
+
 
 # XXX: do we want to move this to test_YoutubeDL.py?
 class TestYoutubeDLNetworking:
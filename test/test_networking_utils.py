@@ -10,14 +10,18 @@
 
 import io
 import random
+import socket
 import ssl
+import time
 
 from yt_dlp.cookies import YoutubeDLCookieJar
 from yt_dlp.dependencies import certifi
 from yt_dlp.networking import Response
+from yt_dlp.networking import _helper
 from yt_dlp.networking._helper import (
     InstanceStoreMixin,
     add_accept_encoding_header,
+    create_connection,
     get_redirect_method,
     make_socks_proxy_opts,
     select_proxy,
@@ -168,6 +172,81 @@ def test_mixin(self):
         assert mixin._get_instance(t=1234) != m
 
 
+class TestCreateConnection:
+    BLACKHOLE_ADDR = (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::1', 0, 0, 0))
+
+    @pytest.fixture
+    def server(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(('127.0.0.1', 0))
+            server.listen()
+            yield server.getsockname()
+
+    @pytest.fixture
+    def resolver(self, monkeypatch):
+        """Local resolver stub, returning the `addrs` set on it and recording the lookups"""
+        class Resolver:
+            addrs = []
+            lookups = []
+
+            def getaddrinfo(self, host, port, family=0, type=0, *args, **kwargs):
+                self.lookups.append(host)
+                return self.addrs
+
+        resolver = Resolver()
+        _helper._dns_cache.clear()
+        monkeypatch.setattr(_helper.socket, 'getaddrinfo', resolver.getaddrinfo)
+        yield resolver
+        _helper._dns_cache.clear()
+
+    @staticmethod
+    def connect_with_blackhole(ip_addr, timeout, source_address):
+        if ip_addr[4][0] == '2001:db8::1':
+            time.sleep(1)
+            raise TimeoutError('timed out')
+        return _helper._socket_connect(ip_addr, timeout, source_address)
+
+    def test_dns_cache(self, server, resolver):
+        resolver.addrs = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', server)]
+        for _ in range(3):
+            create_connection(('cached.test', server[1])).close()
+        assert resolver.lookups == ['cached.test']
+
+        create_connection(('other.test', server[1])).close()
+        assert resolver.lookups == ['cached.test', 'other.test']
+
+        # Failed connections evict the cached addresses
+        resolver.addrs = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', 1))]
+        _helper._dns_cache.invalidate('cached.test', server[1], 0, socket.SOCK_STREAM)
+        with pytest.raises(OSError):
+            create_connection(('cached.test', server[1]))
+        resolver.addrs = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', server)]
+        create_connection(('cached.test', server[1])).close()
+        assert resolver.lookups == ['cached.test', 'other.test', 'cached.test', 'cached.test']
+
+    def test_happy_eyeballs(self, server, resolver):
+        resolver.addrs = [self.BLACKHOLE_ADDR, (socket.AF_INET, socket.SOCK_STREAM, 6, '', server)]
+        start = time.monotonic()
+        sock = create_connection(
+            ('dualstack.test', server[1]), _create_socket_func=self.connect_with_blackhole, _attempt_delay=0.05)
+        try:
+            assert time.monotonic() - start < 0.5
+            assert sock.getpeername() == server
+        finally:
+            sock.close()
+
+    def test_happy_eyeballs_all_fail(self, resolver):
+        resolver.addrs = [self.BLACKHOLE_ADDR, (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', 1))]
+        with pytest.raises(OSError):
+            create_connection(
+                ('dualstack.test', 1), _create_socket_func=self.connect_with_blackhole, _attempt_delay=0.05)
+
+    def test_interleave_addrinfo(self):
+        v6 = [(socket.AF_INET6, socket.SOCK_STREAM, 6, '', (f'::{i}', 80, 0, 0)) for i in range(3)]
+        v4 = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (f'127.0.0.{i}', 80)) for i in range(2)]
+        assert _helper._interleave_addrinfo([*v6, *v4]) == [v6[0], v4[0], v6[1], v4[1], v6[2]]
+
+
 class TestNetworkingExceptions:
 
     @staticmethod
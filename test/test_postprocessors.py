@@ -4,14 +4,18 @@
 import os
 import sys
 import unittest
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import tempfile
+
 from yt_dlp import YoutubeDL
 from yt_dlp.utils import shell_quote
 from yt_dlp.postprocessor import (
     ExecPP,
+    FFmpegSubtitlesConvertorPP,
     FFmpegThumbnailsConvertorPP,
     MetadataFromFieldPP,
     MetadataParserPP,
@@ -61,6 +65,67 @@ def test_escaping(self):
             os.remove(file.format(out))
 
 
+class TestSubtitlesConvertor(unittest.TestCase):
+    VTT = '''WEBVTT
+Kind: captions
+
+00:00:01.234 --> 00:00:03.000 align:start position:0%
+Hello <c.colorE5E5E5>world</c> &amp; <i>you</i>
+second<00:00:02.000><c> line</c>
+
+NOTE a comment
+
+01:00:00.000 --> 01:00:02.500
+bye
+'''
+
+    def _convert(self, data, ext, new_ext):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, f'video.en.{ext}')
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(data)
+            info = {
+                'requested_subtitles': {'en': {'ext': ext, 'filepath': filepath}},
+                '__files_to_move': {filepath: filepath},
+            }
+            pp = FFmpegSubtitlesConvertorPP(YoutubeDL(), new_ext)
+            with patch.object(pp, 'run_ffmpeg', side_effect=AssertionError('ffmpeg should not be called')):
+                files_to_delete, info = pp.run(info)
+            sub = info['requested_subtitles']['en']
+            self.assertEqual(files_to_delete, [filepath])
+            self.assertEqual(sub['ext'], new_ext)
+            with open(sub['filepath'], encoding='utf-8') as f:
+                self.assertEqual(f.read(), sub['data'])
+            return sub['data']
+
+    def test_native_conversion(self):
+        srt = self._convert(self.VTT, 'vtt', 'srt')
+        self.assertEqual(srt, (
+            '1\n00:00:01,234 --> 00:00:03,000\nHello world & <i>you</i>\nsecond line\n\n'
+            '2\n01:00:00,000 --> 01:00:02,500\nbye\n\n'))
+        self.assertEqual(self._convert(srt, 'srt', 'vtt'), (
+            'WEBVTT\n\n00:00:01.234 --> 00:00:03.000\nHello world &amp; <i>you</i>\nsecond line\n\n'
+            '01:00:00.000 --> 01:00:02.500\nbye\n\n'))
+        self.assertTrue(self._convert(self.VTT, 'vtt', 'ass').endswith(
+            'Dialogue: 0,0:00:01.23,0:00:03.00,Default,,0,0,0,,Hello world & {\\i1}you{\\i0}\\Nsecond line\n'
+            'Dialogue: 0,1:00:00.00,1:00:02.50,Default,,0,0,0,,bye\n'))
+        self.assertEqual(
+            self._convert(self.VTT, 'vtt', 'lrc'),
+            '[00:01.23]Hello world & you second line\n[60:00.00]bye\n')
+
+    def test_native_conversion_escaping(self):
+        vtt = 'WEBVTT\n\n00:00:01.000 --> 00:00:02.000\n&lt;b&gt;not bold&lt;/b&gt; {x} \\ <ruby>漢<rt>kan</rt></ruby>\n'
+        self.assertEqual(
+            self._convert(vtt, 'vtt', 'srt'),
+            '1\n00:00:01,000 --> 00:00:02,000\n<b>not bold</b> {x} \\ 漢\n\n')
+        self.assertTrue(self._convert(vtt, 'vtt', 'ass').endswith(
+            'Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,<b>not bold</b> \\{x\\} \\\\ 漢\n'))
+        self.assertEqual(self._convert(vtt, 'vtt', 'lrc'), '[00:01.00]<b>not bold</b> {x} \\ 漢\n')
+        self.assertEqual(
+            self._convert('1\n00:00:01,000 --> 00:00:02,000\n1 < 2 & <b>3</b>\n', 'srt', 'vtt'),
+            'WEBVTT\n\n00:00:01.000 --> 00:00:02.000\n1 &lt; 2 &amp; <b>3</b>\n\n')
+
+
 class TestExec(unittest.TestCase):
     def test_parse_cmd(self):
         pp = ExecPP(YoutubeDL(), '')
@@ -72,6 +137,39 @@ def test_parse_cmd(self):
         self.assertEqual(pp.parse_cmd('echo %(filepath)q', info), cmd)
 
 
+class TestSponsorBlockPP(unittest.TestCase):
+    # Both video ids share the hash prefix '58f7'
+    _RESPONSE = [
+        {'videoID': 'vidafB', 'segments': [{'segment': [1, 2], 'category': 'sponsor'}]},
+        {'videoID': 'vidalu', 'segments': [{'segment': [3, 4], 'category': 'intro'}]},
+    ]
+
+    def test_segment_buckets(self):
+        with tempfile.TemporaryDirectory() as cachedir:
+            pp = SponsorBlockPP(YoutubeDL({'cachedir': cachedir}))
+            with patch.object(pp, '_download_json', return_value=self._RESPONSE) as download_json:
+                pp.prefetch(['vidafB', 'vidalu'])
+                self.assertEqual(download_json.call_count, 1)
+                self.assertIn('/api/skipSegments/58f7?', download_json.call_args[0][0])
+
+                segments = pp._get_sponsor_segments('vidafB', 'YouTube')
+                self.assertEqual(segments, self._RESPONSE[0]['segments'])
+                segments[0]['segment'][0] = 0
+                self.assertEqual(pp._get_sponsor_segments('vidafB', 'YouTube'), self._RESPONSE[0]['segments'])
+                self.assertEqual(pp._get_sponsor_segments('vidalu', 'YouTube'), self._RESPONSE[1]['segments'])
+                self.assertEqual(download_json.call_count, 1)
+
+            pp = SponsorBlockPP(YoutubeDL({'cachedir': cachedir}))
+            with patch.object(pp, '_download_json', return_value=None) as download_json:
+                self.assertEqual(pp._get_sponsor_segments('vidalu', 'YouTube'), self._RESPONSE[1]['segments'])
+                self.assertEqual(download_json.call_count, 0)
+
+                pp._CACHE_TTL = 0
+                pp._segment_buckets.clear()
+                self.assertEqual(pp._get_sponsor_segments('vidalu', 'YouTube'), [])
+                self.assertEqual(download_json.call_count, 1)
+
+
 class TestModifyChaptersPP(unittest.TestCase):
     def setUp(self):
         self._pp = ModifyChaptersPP(YoutubeDL())
@@ -5,7 +5,7 @@
 import pytest
 
 from yt_dlp.utils import dict_get, int_or_none, str_or_none
-from yt_dlp.utils.traversal import traverse_obj
+from yt_dlp.utils.traversal import _compile_path, traverse_obj
 
 _TEST_DATA = {
     100: 100,
@@ -420,6 +420,33 @@ def test_traversal_morsel(self):
         assert traverse_obj(morsel, [(None,), any]) == morsel, \
             'Morsel should not be implicitly changed to dict on usage'
 
+    def test_traversal_compiled_paths(self):
+        path = ('urls', ..., {'url': ('url', {str}), 'index': 'index'})
+        assert _compile_path(path, True, False) is _compile_path(list(path), True, False), \
+            'equivalent paths should share their compiled form'
+        assert _compile_path(path, True, False) is not _compile_path(path, False, False), \
+            'paths should be compiled separately for each option'
+        assert _compile_path((1,), True, False) is not _compile_path((1.0,), True, False), \
+            'paths with equal keys of different types should not be shared'
+        assert traverse_obj(_TEST_DATA, path) == traverse_obj(_TEST_DATA, path) == _TEST_DATA['urls'], \
+            'compiled paths should be reusable'
+        assert traverse_obj([[1]], (0, 0)) == 1 and traverse_obj([[1]], (0, 0.0)) is None, \
+            'keys of different types should be applied differently'
+
+        for value in (0, 1):
+            assert traverse_obj(_TEST_DATA, ('urls', lambda _, v: v['index'] == value, 'index')) == [value], \
+                'lambdas recreated on each call should be applied with their closure'
+
+        class Extractor:
+            def _is_url(self, value):
+                return isinstance(value, str)
+
+        extractor = Extractor()
+        path = ('urls', ..., 'url', {extractor._is_url})
+        assert traverse_obj(_TEST_DATA, path) == [True, True]
+        assert _compile_path(path, True, False) is not _compile_path(path, True, False), \
+            'paths with bound methods should not be cached, keeping their instance alive'
+
 
 class TestDictGet:
     def test_dict_get(self):
@@ -26,6 +26,7 @@
     Config,
     DateRange,
     ExtractorError,
+    FragmentSequence,
     InAdvancePagedList,
     LazyList,
     NO_DEFAULT,
@@ -67,6 +68,7 @@
     get_elements_html_by_attribute,
     get_elements_html_by_class,
     get_elements_text_and_html_by_attribute,
+    index_html,
     int_or_none,
     intlist_to_bytes,
     iri_to_uri,
@@ -1828,6 +1830,31 @@ def test_get_elements_text_and_html_by_attribute(self):
         self.assertEqual(list(get_elements_text_and_html_by_attribute(
             'class', 'foo', '<a class="foo">nice</a><span class="foo">nice</span>', tag='a')), [('nice', '<a class="foo">nice</a>')])
 
+    def test_index_html(self):
+        html = '''
+            <div class="foo bar" data-id=1 title=' class="foo"'>nice</div>
+            <a id = "x" class=foo>a<span class="foo">also nice</span></a>
+            <p title="id=x" id=x2>p</p>
+        '''
+        queries = [
+            lambda: get_elements_html_by_class('foo', html),
+            lambda: get_elements_by_class('bar', html),
+            lambda: get_elements_by_attribute('id', 'x', html),
+            lambda: get_elements_html_by_attribute('data-id', '1', html),
+            lambda: get_elements_by_attribute('class', 'foo', html, tag='a'),
+            lambda: get_elements_by_attribute('title', 'id=x', html),
+            lambda: get_elements_by_attribute('no-such-attribute', 'x', html),
+        ]
+        expected = [query() for query in queries]
+        self.assertEqual(expected[0][:2], [
+            '<div class="foo bar" data-id=1 title=\' class="foo"\'>nice</div>',
+            '<span class="foo">also nice</span>'])
+
+        self.assertIs(index_html(html), index_html(html))
+        self.assertEqual([query() for query in queries], expected)
+        # The index is only used for the string it was built from
+        self.assertEqual(get_elements_by_class('foo', html + '<b class="foo">b</b>')[-1], 'b')
+
     GET_ELEMENT_BY_TAG_TEST_STRING = '''
     random text lorem ipsum</p>
     <div>
@@ -1933,6 +1960,41 @@ def test(ll, idx, val, cache):
         ll = reversed(ll)
         test(ll, -15, 14, range(15))
 
+    def test_FragmentSequence(self):
+        expected = [{'url': 'init.mp4'}] + [
+            {'path': f'{number}-{number * 2}.m4s', 'duration': 2} for number in range(1, 4)] + [
+            {'path': f'{number}-{6 + (number - 4) * 3}.m4s', 'duration': 3} for number in range(4, 6)] + [
+            {'url': 'last.m4s'}]
+
+        fragments = FragmentSequence([{'url': 'init.mp4'}])
+        fragments.add_template('path', '%(Number)d-%(Time)d.m4s', 3, 2, number=1, time=2, time_step=2)
+        fragments.add_template('path', '%(Number)d-%(Time)d.m4s', 0, 5)
+        fragments.add_template('path', '%(Number)d-%(Time)d.m4s', 2, 3, number=4, time=6, time_step=3)
+        fragments.append({'url': 'last.m4s'})
+
+        self.assertEqual(len(fragments), len(expected))
+        self.assertEqual(list(fragments), expected)
+        self.assertEqual(fragments, expected)
+        self.assertEqual([fragments[i] for i in range(-len(expected), len(expected))], expected * 2)
+        self.assertEqual(fragments[2:-1], expected[2:-1])
+        self.assertEqual(fragments[::-2], expected[::-2])
+        self.assertRaises(IndexError, lambda: fragments[len(expected)])
+        self.assertEqual(repr(fragments), repr(expected))
+
+        timeline = FragmentSequence()
+        timeline.add_timeline('path', '%(Number)d-%(Time)d.m4s', [(2, 2, 2), (0, 3, -1), (20, 3, 0)], 2, number=1)
+        self.assertEqual(timeline, [
+            {'path': '1-2.m4s', 'duration': 1.0}, {'path': '2-4.m4s', 'duration': 1.0},
+            {'path': '3-6.m4s', 'duration': 1.0}, {'path': '4-8.m4s', 'duration': 1.5},
+            {'path': '5-20.m4s', 'duration': 1.5}])
+        self.assertEqual([timeline[i] for i in range(len(timeline))], list(timeline))
+
+        merged = FragmentSequence(fragments)
+        merged.extend(fragments[1:])
+        self.assertEqual(merged, expected + expected[1:])
+        self.assertEqual(fragments, expected)
+        self.assertFalse(FragmentSequence())
+
     def test_format_bytes(self):
         self.assertEqual(format_bytes(0), '0.00B')
         self.assertEqual(format_bytes(1000), '1000.00B')
@@ -24,7 +24,7 @@
 import traceback
 import unicodedata
 
-from .cache import Cache
+from .cache import Cache, ManifestCache
 from .compat import urllib  # isort: split
 from .compat import compat_os_name, urllib_req_to_req
 from .cookies import LenientSimpleCookie, load_cookies
@@ -34,7 +34,16 @@
 from .extractor.common import UnsupportedURLIE
 from .extractor.openload import PhantomJSwrapper
 from .minicurses import format_text
-from .networking import HEADRequest, Request, RequestDirector
+from .networking import (
+    HEADRequest,
+    HTTPCache,
+    NetworkMetrics,
+    ProxyPool,
+    RateLimiter,
+    Request,
+    RequestDirector,
+    SourceAddressPool,
+)
 from .networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
 from .networking.exceptions import (
     HTTPError,
@@ -87,6 +96,7 @@
     ExistingVideoReached,
     ExtractorError,
     FormatSorter,
+    FragmentSequence,
     GeoRestrictedError,
     ISO3166Utils,
     LazyList,
@@ -314,6 +324,9 @@ class YoutubeDL:
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    http_cache:        Cache the HTTP responses that extractors mark as cacheable
+                       (e.g. player JS) in the cachedir, and revalidate them with
+                       conditional requests
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -349,12 +362,21 @@ class YoutubeDL:
     enable_file_urls:  Enable file:// URLs. This is disabled by default for security reasons.
     http_headers:      A dictionary of custom headers to be used for all requests
     proxy:             URL of the proxy server to use
+    proxy_pool:        List of proxy URLs to spread the requests over, with failover.
+                       Used for all requests instead of proxy. See networking.ProxyPool
+    proxy_pool_check_url: URL to request through the ejected proxies of the proxy_pool
+                       to check whether they are working again
     geo_verification_proxy:  URL of the proxy to use for IP address verification
                        on geo-restricted sites.
     socket_timeout:    Time to wait for unresponsive hosts, in seconds
     bidi_workaround:   Work around buggy terminals without bidirectional text
                        support, using fridibi
     debug_printtraffic:Print out sent and received HTTP traffic
+    network_metrics:   Record the timings of all network requests in
+                       YoutubeDL.network_metrics (see networking.NetworkMetrics).
+                       Only the last 10000 requests are kept individually
+    network_metrics_file: Write the recorded network timings to this JSON file
+                       when closing. Implies network_metrics
     default_search:    Prepend this string if an input url is not valid.
                        'auto' for elaborate guessing
     encoding:          Use this encoding instead of the system-specified.
@@ -389,6 +411,10 @@ class YoutubeDL:
                        * total_bytes: Size of the whole file, None if unknown
                        * total_bytes_estimate: Guess of the eventual file size,
                                                None if unavailable.
+                       * downloaded_wire_bytes: Bytes received before content
+                                                decoding, for content-encoded downloads
+                       * total_wire_bytes: Size of the whole content-encoded
+                                           response, None if unknown
                        * elapsed: The number of seconds since download started.
                        * eta: The estimated time in seconds, None if unknown
                        * speed: The download speed in bytes/second, None if
@@ -419,10 +445,24 @@ class YoutubeDL:
                        - "detect_or_warn": check whether we can do anything
                                            about it, warn otherwise (default)
     source_address:    Client-side IP address to bind to.
+    source_addresses:  List of client-side IP addresses to spread the downloads over,
+                       weighted by their measured throughput. Each request of a
+                       download is bound to one of them instead of source_address
     impersonate:       Client to impersonate for requests.
                        An ImpersonateTarget (from yt_dlp.networking.impersonate)
     sleep_interval_requests: Number of seconds to sleep between requests
                        during extraction
+    concurrent_requests: Maximum number of independent requests an extractor
+                       may make at the same time (default 4).
+                       Requests are sequential if sleep_interval_requests is set
+    host_ratelimit_requests: Maximum number of requests per second to each host.
+                       Shared by all extractions and downloads
+    host_ratelimit_bytes: Maximum number of bytes per second to read from each host.
+                       Shared by all extractions and downloads
+    host_ratelimit_burst: Number of requests that can be sent to a host at once
+                       before host_ratelimit_requests applies (default 1).
+                       If any of these is given, requests to hosts responding with
+                       HTTP 429/503 are also delayed according to Retry-After (at most 5 minutes)
     sleep_interval:    Number of seconds to sleep before each download when
                        used alone or a lower bound of a range for randomized
                        sleep before each download (minimum possible number
@@ -497,7 +537,7 @@ class YoutubeDL:
     nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
     max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
     continuedl, xattr_set_filesize, hls_use_mpegts, http_chunk_size,
-    external_downloader_args, concurrent_fragment_downloads, progress_delta.
+    external_downloader_args, concurrent_fragment_downloads, http2_fragments, progress_delta.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg/avconv binary; either the path
@@ -636,7 +676,27 @@ def __init__(self, params=None, auto_init=True):
         self._num_videos = 0
         self._playlist_level = 0
         self._playlist_urls = set()
+        self._format_sorters = {}
+        self.network_metrics = (
+            NetworkMetrics(max_requests=10000) if self.params.get('network_metrics') or self.params.get('network_metrics_file')
+            else None)
+        self.rate_limiter = (
+            RateLimiter(
+                self.params.get('host_ratelimit_requests'), self.params.get('host_ratelimit_bytes'),
+                self.params.get('host_ratelimit_burst') or 1)
+            if self.params.get('host_ratelimit_requests') or self.params.get('host_ratelimit_bytes')
+            else None)
+        self.proxy_pool = None
+        if self.params.get('proxy_pool'):
+            pool_proxies = [{'all': proxy} for proxy in self.params['proxy_pool']]
+            for proxies in pool_proxies:
+                clean_proxies(proxies, HTTPHeaderDict())
+            self.proxy_pool = ProxyPool(
+                [proxies['all'] for proxies in pool_proxies], check_url=self.params.get('proxy_pool_check_url'))
+        self.source_address_pool = (
+            SourceAddressPool(self.params['source_addresses']) if self.params.get('source_addresses') else None)
         self.cache = Cache(self)
+        self.manifest_cache = ManifestCache(self)
         self.__header_cookies = []
 
         stdout = sys.stderr if self.params.get('logtostderr') else sys.stdout
@@ -996,6 +1056,12 @@ def close(self):
         if '_request_director' in self.__dict__:
             self._request_director.close()
             del self._request_director
+        metrics_file = self.params.get('network_metrics_file')
+        if self.network_metrics and metrics_file:
+            try:
+                self.network_metrics.dump(metrics_file)
+            except OSError as e:
+                self.report_warning(f'Unable to write network metrics to "{metrics_file}": {e}')
 
     def trouble(self, message=None, tb=None, is_error=True):
         """Determine action to take when a download problem appears.
@@ -1192,6 +1258,111 @@ def _copy_infodict(info_dict):
         info_dict.pop('__pending_error', None)
         return info_dict
 
+    _OUTTMPL_EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
+    _OUTTMPL_MATH_FUNCTIONS = {
+        '+': float.__add__,
+        '-': float.__sub__,
+        '*': float.__mul__,
+    }
+    # Field is of the form key1.key2...
+    # where keys (except first) can be string, int, slice or "{field, ...}"
+    _OUTTMPL_FIELD_INNER_RE = r'(?:\w+|%(num)s|%(num)s?(?::%(num)s?){1,2})' % {'num': r'(?:-?\d+)'}  # noqa: UP031
+    _OUTTMPL_FIELD_RE = r'\w*(?:\.(?:%(inner)s|{%(field)s(?:,%(field)s)*}))*' % {  # noqa: UP031
+        'inner': _OUTTMPL_FIELD_INNER_RE,
+        'field': rf'\w*(?:\.{_OUTTMPL_FIELD_INNER_RE})*',
+    }
+    _OUTTMPL_MATH_FIELD_RE = re.compile(rf'(?:{_OUTTMPL_FIELD_RE}|-?{NUMBER_RE})')
+    _OUTTMPL_MATH_OPERATORS_RE = re.compile(r'(?:{})'.format('|'.join(map(re.escape, _OUTTMPL_MATH_FUNCTIONS.keys()))))
+    _OUTTMPL_INTERNAL_FORMAT_RE = re.compile(rf'''(?xs)
+        (?P<negate>-)?
+        (?P<fields>{_OUTTMPL_FIELD_RE})
+        (?P<maths>(?:{_OUTTMPL_MATH_OPERATORS_RE.pattern}{_OUTTMPL_MATH_FIELD_RE.pattern})*)
+        (?:>(?P<strf_format>.+?))?
+        (?P<remaining>
+            (?P<alternate>(?<!\\),[^|&)]+)?
+            (?:&(?P<replacement>.*?))?
+            (?:\|(?P<default>.*?))?
+        )$''')
+    # Fields that prepare_outtmpl adds to the info dict
+    _OUTTMPL_COMPUTED_FIELDS = ('duration_string', 'autonumber', 'video_autonumber', 'resolution')
+
+    class _ReplacementFormatter(string.Formatter):
+        def get_field(self, field_name, args, kwargs):
+            if field_name.isdigit():
+                return args[0], -1
+            raise ValueError('Unsupported field')
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _parse_outtmpl_fields(fields):
+        """ Parse the "key1.key2..." of an output template field into a traversal path """
+        def _from_user_input(field):
+            if field == ':':
+                return ...
+            elif ':' in field:
+                return slice(*map(int_or_none, field.split(':')))
+            elif int_or_none(field) is not None:
+                return int(field)
+            return field
+
+        fields = [f for x in re.split(r'\.({.+?})\.?', fields)
+                  for f in ([x] if x.startswith('{') else x.split('.'))]
+        for i in (0, -1):
+            if fields and not fields[i]:
+                fields.pop(i)
+
+        for i, f in enumerate(fields):
+            if not f.startswith('{'):
+                fields[i] = _from_user_input(f)
+                continue
+            assert f.endswith('}'), f'No closing brace for {f} in {fields}'
+            fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
+
+        return tuple(fields)
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _compile_outtmpl(cls, outtmpl):
+        """
+        Split the template into literal strings and the (prefix, key, format, flags, alternatives) of its fields
+
+        @returns (segments, top-level fields of the info dict that are used, or None if it may be used whole)
+        """
+        segments, used_fields, last_end = [''], set(), 0
+        for outer_mobj in cls._OUTTMPL_EXTERNAL_FORMAT_RE.finditer(outtmpl):
+            segments[-1] += outtmpl[last_end:outer_mobj.start()]
+            last_end = outer_mobj.end()
+            if not outer_mobj.group('has_key'):
+                segments[-1] += outer_mobj.group(0)
+                continue
+
+            key, alternatives = outer_mobj.group('key'), []
+            mobj = cls._OUTTMPL_INTERNAL_FORMAT_RE.match(key)
+            while mobj:
+                alternatives.append(mobj.groupdict())
+                mobj = mobj.group('alternate') and cls._OUTTMPL_INTERNAL_FORMAT_RE.match(mobj.group('remaining')[1:])
+
+            for mdict in alternatives:
+                try:
+                    path = cls._parse_outtmpl_fields(mdict['fields'])
+                except Exception:  # Raised again when the field is evaluated
+                    path = None
+                first_keys = (
+                    [v[0] for v in path[0].values()] if path and isinstance(path[0], dict)
+                    else path[:1] if path and not mdict['maths'] else [None])
+                if used_fields is None or not all(isinstance(k, (str, int)) for k in first_keys):
+                    used_fields = None
+                else:
+                    used_fields.update(first_keys)
+
+            segments.append((
+                outer_mobj.group('prefix'), key, outer_mobj.group('format'),
+                outer_mobj.group('conversion') or '', tuple(alternatives)))
+            segments.append('')
+        segments[-1] += outtmpl[last_end:]
+
+        return tuple(filter(None, segments)), None if used_fields is None else frozenset(used_fields)
+
     def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False):
         """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
         @param sanitize    Whether to sanitize the output as a filename.
@@ -1200,75 +1371,40 @@ def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False):
 
         info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
 
-        info_dict = self._copy_infodict(info_dict)
-        info_dict['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
-            formatSeconds(info_dict['duration'], '-' if sanitize else ':')
-            if info_dict.get('duration', None) is not None
-            else None)
-        info_dict['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
-        info_dict['video_autonumber'] = self._num_videos
-        if info_dict.get('resolution') is None:
-            info_dict['resolution'] = self.format_resolution(info_dict, default=None)
+        segments, used_fields = self._compile_outtmpl(outtmpl)
+        full_info_dict = info_dict
+        if used_fields is None:
+            info_dict = self._copy_infodict(info_dict)
+            used_fields = self._OUTTMPL_COMPUTED_FIELDS
+        else:  # Only the fields used by the template are needed
+            info_dict = {k: info_dict[k] for k in used_fields if k in info_dict}
+            info_dict.pop('__postprocessors', None)
+            info_dict.pop('__pending_error', None)
+
+        if 'duration_string' in used_fields:
+            info_dict['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
+                formatSeconds(full_info_dict['duration'], '-' if sanitize else ':')
+                if full_info_dict.get('duration', None) is not None
+                else None)
+        if 'autonumber' in used_fields:
+            info_dict['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
+        if 'video_autonumber' in used_fields:
+            info_dict['video_autonumber'] = self._num_videos
+        if 'resolution' in used_fields and info_dict.get('resolution') is None:
+            info_dict['resolution'] = self.format_resolution(full_info_dict, default=None)
 
         # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
         # of %(field)s to %(field)0Nd for backward compatibility
         field_size_compat_map = {
-            'playlist_index': number_of_digits(info_dict.get('__last_playlist_index') or 0),
-            'playlist_autonumber': number_of_digits(info_dict.get('n_entries') or 0),
-            'autonumber': self.params.get('autonumber_size') or 5,
+            'playlist_index': lambda: number_of_digits(full_info_dict.get('__last_playlist_index') or 0),
+            'playlist_autonumber': lambda: number_of_digits(full_info_dict.get('n_entries') or 0),
+            'autonumber': lambda: self.params.get('autonumber_size') or 5,
         }
 
         TMPL_DICT = {}
-        EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
-        MATH_FUNCTIONS = {
-            '+': float.__add__,
-            '-': float.__sub__,
-            '*': float.__mul__,
-        }
-        # Field is of the form key1.key2...
-        # where keys (except first) can be string, int, slice or "{field, ...}"
-        FIELD_INNER_RE = r'(?:\w+|%(num)s|%(num)s?(?::%(num)s?){1,2})' % {'num': r'(?:-?\d+)'}  # noqa: UP031
-        FIELD_RE = r'\w*(?:\.(?:%(inner)s|{%(field)s(?:,%(field)s)*}))*' % {  # noqa: UP031
-            'inner': FIELD_INNER_RE,
-            'field': rf'\w*(?:\.{FIELD_INNER_RE})*',
-        }
-        MATH_FIELD_RE = rf'(?:{FIELD_RE}|-?{NUMBER_RE})'
-        MATH_OPERATORS_RE = r'(?:{})'.format('|'.join(map(re.escape, MATH_FUNCTIONS.keys())))
-        INTERNAL_FORMAT_RE = re.compile(rf'''(?xs)
-            (?P<negate>-)?
-            (?P<fields>{FIELD_RE})
-            (?P<maths>(?:{MATH_OPERATORS_RE}{MATH_FIELD_RE})*)
-            (?:>(?P<strf_format>.+?))?
-            (?P<remaining>
-                (?P<alternate>(?<!\\),[^|&)]+)?
-                (?:&(?P<replacement>.*?))?
-                (?:\|(?P<default>.*?))?
-            )$''')
-
-        def _from_user_input(field):
-            if field == ':':
-                return ...
-            elif ':' in field:
-                return slice(*map(int_or_none, field.split(':')))
-            elif int_or_none(field) is not None:
-                return int(field)
-            return field
 
         def _traverse_infodict(fields):
-            fields = [f for x in re.split(r'\.({.+?})\.?', fields)
-                      for f in ([x] if x.startswith('{') else x.split('.'))]
-            for i in (0, -1):
-                if fields and not fields[i]:
-                    fields.pop(i)
-
-            for i, f in enumerate(fields):
-                if not f.startswith('{'):
-                    fields[i] = _from_user_input(f)
-                    continue
-                assert f.endswith('}'), f'No closing brace for {f} in {fields}'
-                fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
-
-            return traverse_obj(info_dict, fields, traverse_string=True)
+            return traverse_obj(info_dict, self._parse_outtmpl_fields(fields), traverse_string=True)
 
         def get_value(mdict):
             # Object traversal
@@ -1284,12 +1420,11 @@ def get_value(mdict):
                 value = float_or_none(value)
                 operator = None
                 while offset_key:
-                    item = re.match(
-                        MATH_FIELD_RE if operator else MATH_OPERATORS_RE,
+                    item = (self._OUTTMPL_MATH_FIELD_RE if operator else self._OUTTMPL_MATH_OPERATORS_RE).match(
                         offset_key).group(0)
                     offset_key = offset_key[len(item):]
                     if operator is None:
-                        operator = MATH_FUNCTIONS[item]
+                        operator = self._OUTTMPL_MATH_FUNCTIONS[item]
                         continue
                     item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
                     offset = float_or_none(item)
@@ -1321,32 +1456,23 @@ def filename_sanitizer(key, value, restricted=self.params.get('restrictfilenames
         sanitize = bool(sanitize)
 
         def _dumpjson_default(obj):
-            if isinstance(obj, (set, LazyList)):
+            if isinstance(obj, (set, LazyList, FragmentSequence)):
                 return list(obj)
             return repr(obj)
 
-        class _ReplacementFormatter(string.Formatter):
-            def get_field(self, field_name, args, kwargs):
-                if field_name.isdigit():
-                    return args[0], -1
-                raise ValueError('Unsupported field')
-
-        replacement_formatter = _ReplacementFormatter()
+        replacement_formatter = self._ReplacementFormatter()
 
-        def create_key(outer_mobj):
-            if not outer_mobj.group('has_key'):
-                return outer_mobj.group(0)
-            key = outer_mobj.group('key')
-            mobj = re.match(INTERNAL_FORMAT_RE, key)
+        def create_key(field):
+            if isinstance(field, str):
+                return field
+            prefix, key, fmt, flags, alternatives = field
+            outer_fmt = fmt
             value, replacement, default, last_field = None, None, na, ''
-            while mobj:
-                mobj = mobj.groupdict()
+            for mobj in alternatives:
                 default = mobj['default'] if mobj['default'] is not None else default
                 value = get_value(mobj)
                 last_field, replacement = mobj['fields'], mobj['replacement']
-                if value is None and mobj['alternate']:
-                    mobj = re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
-                else:
+                if value is not None or not mobj['alternate']:
                     break
 
             if None not in (value, replacement):
@@ -1355,11 +1481,9 @@ def create_key(outer_mobj):
                 except ValueError:
                     value, default = None, na
 
-            fmt = outer_mobj.group('format')
             if fmt == 's' and last_field in field_size_compat_map and isinstance(value, int):
-                fmt = f'0{field_size_compat_map[last_field]:d}d'
+                fmt = f'0{field_size_compat_map[last_field]():d}d'
 
-            flags = outer_mobj.group('conversion') or ''
             str_fmt = f'{fmt[:-1]}s'
             if value is None:
                 value, fmt = default, 's'
@@ -1409,11 +1533,11 @@ def create_key(outer_mobj):
                 if fmt[-1] in 'csra':
                     value = sanitizer(last_field, value)
 
-            key = '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format'))
+            key = '{}\0{}'.format(key.replace('%', '%\0'), outer_fmt)
             TMPL_DICT[key] = value
-            return '{prefix}%({key}){fmt}'.format(key=key, fmt=fmt, prefix=outer_mobj.group('prefix'))
+            return f'{prefix}%({key}){fmt}'
 
-        return EXTERNAL_FORMAT_RE.sub(create_key, outtmpl), TMPL_DICT
+        return ''.join(map(create_key, segments)), TMPL_DICT
 
     def evaluate_outtmpl(self, outtmpl, info_dict, *args, **kwargs):
         outtmpl, info_dict = self.prepare_outtmpl(outtmpl, info_dict, *args, **kwargs)
@@ -2564,8 +2688,23 @@ def restore_last_token(self):
         parsed_selector = _parse_format_selection(iter(TokenIterator(tokens)))
         return _build_selector_function(parsed_selector)
 
-    def _calc_headers(self, info_dict, load_cookies=False):
-        res = HTTPHeaderDict(self.params['http_headers'], info_dict.get('http_headers'))
+    def _calc_headers(self, info_dict, load_cookies=False, *, cache=None):
+        """
+        @param cache    A dict to memoize the results in when calculating the headers of many formats.
+                        Formats with the same scheme, host and path in their url and the same
+                        `http_headers` object, `cookies` and `__x_forwarded_for_ip` share the results
+        """
+        http_headers = info_dict.get('http_headers')
+        cache_key = cache is not None and (
+            *urllib.parse.urlsplit(info_dict['url'])[:3], id(http_headers),
+            info_dict.get('cookies'), info_dict.get('__x_forwarded_for_ip'), load_cookies)
+        if cache_key and cache_key in cache:
+            res, cookies_field, _ = cache[cache_key]
+            if cookies_field is not None:
+                info_dict['cookies'] = cookies_field
+            return HTTPHeaderDict(res)
+
+        res = HTTPHeaderDict(self.params['http_headers'], http_headers)
         clean_headers(res)
 
         if load_cookies:  # For --load-info-json
@@ -2574,6 +2713,7 @@ def _calc_headers(self, info_dict, load_cookies=False):
         # The `Cookie` header is removed to prevent leaks and unscoped cookies.
         # See: https://github.com/yt-dlp/yt-dlp/security/advisories/GHSA-v8mc-9377-rwjj
         res.pop('Cookie', None)
+        cookies_field = None
         cookies = self.cookiejar.get_cookies_for_url(info_dict['url'])
         if cookies:
             encoder = LenientSimpleCookie()
@@ -2591,13 +2731,17 @@ def _calc_headers(self, info_dict, load_cookies=False):
                     values.append(f'Expires={cookie.expires}')
                 if cookie.version:
                     values.append(f'Version={cookie.version}')
-            info_dict['cookies'] = '; '.join(values)
+            info_dict['cookies'] = cookies_field = '; '.join(values)
 
         if 'X-Forwarded-For' not in res:
             x_forwarded_for_ip = info_dict.get('__x_forwarded_for_ip')
             if x_forwarded_for_ip:
                 res['X-Forwarded-For'] = x_forwarded_for_ip
 
+        if cache_key:
+            # Keep a reference to `http_headers` so that its id cannot be reused
+            cache[cache_key] = res, cookies_field, http_headers
+            return HTTPHeaderDict(res)
         return res
 
     def _calc_cookies(self, url):
@@ -2712,10 +2856,21 @@ def _raise_pending_errors(self, info):
         if err:
             self.report_error(err, tb=False)
 
+    def _get_format_sorter(self, field_preference):
+        key = (
+            tuple(self.params.get('format_sort') or ()), bool(self.params.get('format_sort_force')),
+            bool(self.params.get('prefer_free_formats')), tuple(field_preference))
+        sorter = self._format_sorters.get(key)
+        if sorter is None:
+            sorter = self._format_sorters[key] = FormatSorter(self, field_preference)
+        elif self.params.get('verbose'):
+            sorter.print_verbose_info(self.write_debug)
+        return sorter
+
     def sort_formats(self, info_dict):
         formats = self._get_formats(info_dict)
-        formats.sort(key=FormatSorter(
-            self, info_dict.get('_format_sort_fields') or []).calculate_preference)
+        formats.sort(key=self._get_format_sorter(
+            info_dict.get('_format_sort_fields') or []).calculate_preference)
 
     def process_video_result(self, info_dict, download=True):
         assert info_dict.get('_type', 'video') == 'video'
@@ -2846,6 +3001,7 @@ def is_wellformed(f):
         if not formats:
             self.raise_no_formats(info_dict)
 
+        headers_cache = {}
         for fmt in formats:
             sanitize_string_field(fmt, 'format_id')
             sanitize_numeric_fields(fmt)
@@ -2867,7 +3023,8 @@ def is_wellformed(f):
             if (('manifest-filesize-approx' in self.params['compat_opts'] or not fmt.get('manifest_url'))
                     and not fmt.get('filesize') and not fmt.get('filesize_approx')):
                 fmt['filesize_approx'] = filesize_from_tbr(fmt.get('tbr'), info_dict.get('duration'))
-            fmt['http_headers'] = self._calc_headers(collections.ChainMap(fmt, info_dict), load_cookies=True)
+            fmt['http_headers'] = self._calc_headers(
+                collections.ChainMap(fmt, info_dict), load_cookies=True, cache=headers_cache)
 
         # Safeguard against old/insecure infojson when using --load-info-json
         if info_dict.get('http_headers'):
@@ -3164,7 +3321,7 @@ def print_field(field, actual_field=None, optional=False):
         print_field('format')
 
         if self.params.get('forcejson'):
-            self.to_stdout(json.dumps(self.sanitize_info(info_dict)))
+            self.to_stdout(json.dumps(info_dict, cls=self.InfoJSONEncoder))
 
     def dl(self, name, info, subtitle=False, test=False):
         if not info.get('url'):
@@ -3590,7 +3747,7 @@ def wrapper(*args, **kwargs):
             else:
                 if self.params.get('dump_single_json', False):
                     self.post_extract(res)
-                    self.to_stdout(json.dumps(self.sanitize_info(res)))
+                    self.to_stdout(json.dumps(res, cls=self.InfoJSONEncoder))
         return wrapper
 
     def download(self, url_list):
@@ -3609,13 +3766,58 @@ def download(self, url_list):
 
         return self._download_retcode
 
+    # A "fragments" array of objects that contain no arrays. Since the key is not preceded by
+    # a backslash, its quotes delimit a string and so it cannot be part of another string
+    _LAZY_FRAGMENTS_RE = re.compile(r'''(?x)
+        (?<!\\)"fragments"\s*:\s*
+        (?P<fragments>\[[^"\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]]*)*\])''')
+
+    def _load_info_json(self, json_data):
+        """
+        Load and sanitize the infodicts of an info json
+
+        The "fragments" of the formats are only parsed once they are used, since only
+        those of the selected formats are needed for downloading
+        """
+        remove_private_keys = self.params.get('clean_infojson', True)
+        raw_fragments, parts, last_end = [], [], 0
+        for mobj in self._LAZY_FRAGMENTS_RE.finditer(json_data):
+            parts.extend((json_data[last_end:mobj.start('fragments')], f'"\\u0000{len(raw_fragments)}"'))
+            raw_fragments.append(mobj.group('fragments'))
+            last_end = mobj.end()
+        parts.append(json_data[last_end:])
+        infos = [self.sanitize_info(info, remove_private_keys) for info in variadic(json.loads(''.join(parts)))]
+        if not raw_fragments:
+            return infos
+
+        reject = self._sanitize_info_reject(None, remove_private_keys)
+        object_pairs_hook = None
+        if remove_private_keys:
+            object_pairs_hook = lambda pairs: {k: v for k, v in pairs if not reject(k, v)}
+
+        def load_fragments(raw):
+            yield from json.loads(raw, object_pairs_hook=object_pairs_hook)
+
+        def add_fragments(obj):
+            if isinstance(obj, dict):
+                fragments = obj.get('fragments')
+                if isinstance(fragments, str) and fragments.startswith('\0'):
+                    obj['fragments'] = LazyList(load_fragments(raw_fragments[int(fragments[1:])]))
+                for v in obj.values():
+                    add_fragments(v)
+            elif isinstance(obj, list):
+                for v in obj:
+                    add_fragments(v)
+
+        add_fragments(infos)
+        return infos
+
     def download_with_info_file(self, info_filename):
         with contextlib.closing(fileinput.FileInput(
                 [info_filename], mode='r',
                 openhook=fileinput.hook_encoded('utf-8'))) as f:
             # FileInput doesn't have a read method, we can't call json.load
-            infos = [self.sanitize_info(info, self.params.get('clean_infojson', True))
-                     for info in variadic(json.loads('\n'.join(f)))]
+            infos = self._load_info_json('\n'.join(f))
         for info in infos:
             try:
                 self.__download_wrapper(self.process_ie_result)(info, download=True)
@@ -3636,28 +3838,12 @@ def sanitize_info(info_dict, remove_private_keys=False):
         """ Sanitize the infodict for converting to json """
         if info_dict is None:
             return info_dict
-        info_dict.setdefault('epoch', int(time.time()))
-        info_dict.setdefault('_type', 'video')
-        info_dict.setdefault('_version', {
-            'version': __version__,
-            'current_git_head': current_git_head(),
-            'release_git_head': RELEASE_GIT_HEAD,
-            'repository': ORIGIN,
-        })
-
-        if remove_private_keys:
-            reject = lambda k, v: v is None or k.startswith('__') or k in {
-                'requested_downloads', 'requested_formats', 'requested_subtitles', 'requested_entries',
-                'entries', 'filepath', '_filename', 'filename', 'infojson_filename', 'original_url',
-                'playlist_autonumber',
-            }
-        else:
-            reject = lambda k, v: False
+        reject = YoutubeDL._sanitize_info_reject(info_dict, remove_private_keys)
 
         def filter_fn(obj):
             if isinstance(obj, dict):
                 return {k: filter_fn(v) for k, v in obj.items() if not reject(k, v)}
-            elif isinstance(obj, (list, tuple, set, LazyList)):
+            elif isinstance(obj, (list, tuple, set, LazyList, FragmentSequence)):
                 return list(map(filter_fn, obj))
             elif obj is None or isinstance(obj, (str, int, float, bool)):
                 return obj
@@ -3666,6 +3852,129 @@ def filter_fn(obj):
 
         return filter_fn(info_dict)
 
+    @staticmethod
+    def _sanitize_info_reject(info_dict, remove_private_keys):
+        """ Add the default fields to the infodict (if given) and return a function telling which items to leave out """
+        if info_dict is not None:
+            info_dict.setdefault('epoch', int(time.time()))
+            info_dict.setdefault('_type', 'video')
+            info_dict.setdefault('_version', {
+                'version': __version__,
+                'current_git_head': current_git_head(),
+                'release_git_head': RELEASE_GIT_HEAD,
+                'repository': ORIGIN,
+            })
+
+        if remove_private_keys:
+            return lambda k, v: v is None or k.startswith('__') or k in {
+                'requested_downloads', 'requested_formats', 'requested_subtitles', 'requested_entries',
+                'entries', 'filepath', '_filename', 'filename', 'infojson_filename', 'original_url',
+                'playlist_autonumber',
+            }
+        return lambda k, v: False
+
+    class InfoJSONEncoder(json.JSONEncoder):
+        """
+        JSON encoder that sanitizes the infodict while encoding it
+
+        The output is the same as encoding sanitize_info(info_dict, remove_private_keys),
+        but the infodict is not copied, so that large fragment lists are not held in memory twice.
+        Use as json.dump(info_dict, fp, cls=YoutubeDL.InfoJSONEncoder, remove_private_keys=True)
+        """
+
+        def __init__(self, *args, remove_private_keys=False, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.remove_private_keys = remove_private_keys
+
+        def iterencode(self, o, _one_shot=False):
+            if self.indent is not None:
+                return super().iterencode(YoutubeDL.sanitize_info(o, self.remove_private_keys), _one_shot)
+            reject = YoutubeDL._sanitize_info_reject(o, self.remove_private_keys)
+            encode_str = json.encoder.encode_basestring_ascii if self.ensure_ascii else json.encoder.encode_basestring
+            item_separator, key_separator = self.item_separator, self.key_separator
+
+            def floatstr(o):
+                if o != o:
+                    text = 'NaN'
+                elif o == float('inf'):
+                    text = 'Infinity'
+                elif o == float('-inf'):
+                    text = '-Infinity'
+                else:
+                    return float.__repr__(o)
+                if not self.allow_nan:
+                    raise ValueError(f'Out of range float values are not JSON compliant: {o!r}')
+                return text
+
+            def encode_scalar(o):
+                """ Returns None for containers """
+                if isinstance(o, str):
+                    return encode_str(o)
+                elif o is None:
+                    return 'null'
+                elif o is True:
+                    return 'true'
+                elif o is False:
+                    return 'false'
+                elif isinstance(o, int):
+                    return int.__repr__(o)
+                elif isinstance(o, float):
+                    return floatstr(o)
+                elif isinstance(o, (dict, list, tuple, set, LazyList, FragmentSequence)):
+                    return None
+                return encode_str(repr(o))
+
+            def encode_key(k):
+                if isinstance(k, str):
+                    return encode_str(k)
+                elif isinstance(k, float):
+                    return encode_str(floatstr(k))
+                elif k is True or k is False or k is None:
+                    return encode_str(encode_scalar(k))
+                elif isinstance(k, int):
+                    return encode_str(int.__repr__(k))
+                elif self.skipkeys:
+                    return None
+                raise TypeError(f'keys must be str, int, float, bool or None, not {k.__class__.__name__}')
+
+            def encode_container(o):
+                # Scalars are collected into as few chunks as possible
+                if isinstance(o, dict):
+                    chunks, separator, end = ['{'], '', '}'
+                    items = [(k, v) for k, v in o.items() if not reject(k, v)]
+                    if self.sort_keys:
+                        items.sort()
+                    for k, v in items:
+                        key = encode_key(k)
+                        if key is None:
+                            continue
+                        chunks.append(f'{separator}{key}{key_separator}')
+                        separator = item_separator
+                        value = encode_scalar(v)
+                        if value is None:
+                            yield ''.join(chunks)
+                            chunks = []
+                            yield from encode_container(v)
+                        else:
+                            chunks.append(value)
+                else:
+                    chunks, separator, end = ['['], '', ']'
+                    for v in o:
+                        chunks.append(separator)
+                        separator = item_separator
+                        value = encode_scalar(v)
+                        if value is None:
+                            yield ''.join(chunks)
+                            chunks = []
+                            yield from encode_container(v)
+                        else:
+                            chunks.append(value)
+                chunks.append(end)
+                yield ''.join(chunks)
+
+            value = encode_scalar(o)
+            return (value,) if value is not None else encode_container(o)
+
     @staticmethod
     def filter_requested_info(info_dict, actually_filter=True):
         """ Alias of sanitize_info for backward compatibility """
@@ -4067,6 +4376,8 @@ def get_encoding(stream):
         })) or 'none'))
 
         write_debug(f'Proxy map: {self.proxies}')
+        if self.proxy_pool:
+            write_debug(f'Proxy pool: {self.proxy_pool.proxies}')
         write_debug(f'Request Handlers: {", ".join(rh.RH_NAME for rh in self._request_director.handlers.values())}')
         for plugin_type, plugins in {'Extractor': plugin_ies, 'Post-Processor': plugin_pps}.items():
             display_list = ['{}{}'.format(
@@ -4212,7 +4523,12 @@ def build_request_director(self, handlers, preferences=None):
         clean_headers(headers)
         clean_proxies(proxies, headers)
 
-        director = RequestDirector(logger=logger, verbose=self.params.get('debug_printtraffic'))
+        director = RequestDirector(
+            logger=logger, verbose=self.params.get('debug_printtraffic'),
+            metrics=self.network_metrics, rate_limiter=self.rate_limiter,
+            http_cache=HTTPCache(os.path.join(self.cache._get_root_dir(), 'http'))
+            if self.params.get('http_cache') and self.cache.enabled else None,
+            proxy_pool=self.proxy_pool)
         for handler in handlers:
             director.add_handler(handler(
                 logger=logger,
@@ -4277,7 +4593,8 @@ def _write_info_json(self, label, ie_result, infofn, overwrite=None):
 
         self.to_screen(f'[info] Writing {label} metadata as JSON to: {infofn}')
         try:
-            write_json_file(self.sanitize_info(ie_result, self.params.get('clean_infojson', True)), infofn)
+            write_json_file(ie_result, infofn, cls=self.InfoJSONEncoder,
+                            remove_private_keys=self.params.get('clean_infojson', True))
             return True
         except OSError:
             self.report_error(f'Cannot write {label} metadata to JSON file {infofn}')
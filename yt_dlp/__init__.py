@@ -205,6 +205,9 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('autonumber start', opts.autonumber_start)
     validate_positive('autonumber size', opts.autonumber_size, True)
     validate_positive('concurrent fragments', opts.concurrent_fragment_downloads, True)
+    validate_positive('concurrent requests', opts.concurrent_requests, True)
+    validate_positive('host requests rate limit', opts.host_ratelimit_requests, True)
+    validate_positive('host rate limit burst', opts.host_ratelimit_burst, True)
     validate_positive('playlist start', opts.playliststart, True)
     if opts.playlistend != -1:
         validate_minmax(opts.playliststart, opts.playlistend, 'playlist start', 'playlist end')
@@ -295,9 +298,22 @@ def validate_bytes(name, value):
 
     opts.ratelimit = validate_bytes('rate limit', opts.ratelimit)
     opts.throttledratelimit = validate_bytes('throttled rate limit', opts.throttledratelimit)
+    opts.host_ratelimit_bytes = validate_bytes('host rate limit', opts.host_ratelimit_bytes)
     opts.min_filesize = validate_bytes('min filesize', opts.min_filesize)
     opts.max_filesize = validate_bytes('max filesize', opts.max_filesize)
     opts.buffersize = validate_bytes('buffer size', opts.buffersize)
+
+    # Source addresses
+    opts.source_addresses = [address.strip() for address in (opts.source_address or '').split(',') if address.strip()]
+    opts.source_address = next(iter(opts.source_addresses), None)
+
+    # Proxy pool
+    if opts.proxy_pool_file:
+        try:
+            opts.proxy_pool = [
+                *opts.proxy_pool, *read_batch_urls(open(expand_path(opts.proxy_pool_file), encoding='utf-8'))]
+        except OSError as err:
+            raise ValueError(f'proxy pool file "{opts.proxy_pool_file}" could not be read: {err}')
     opts.http_chunk_size = validate_bytes('http chunk size', opts.http_chunk_size)
 
     # Output templates
@@ -829,6 +845,9 @@ def parse_options(argv=None):
         'allowed_extractors': opts.allowed_extractors or ['default'],
         'ratelimit': opts.ratelimit,
         'throttledratelimit': opts.throttledratelimit,
+        'host_ratelimit_requests': opts.host_ratelimit_requests,
+        'host_ratelimit_bytes': opts.host_ratelimit_bytes,
+        'host_ratelimit_burst': opts.host_ratelimit_burst,
         'overwrites': opts.overwrites,
         'retries': opts.retries,
         'file_access_retries': opts.file_access_retries,
@@ -838,6 +857,7 @@ def parse_options(argv=None):
         'skip_unavailable_fragments': opts.skip_unavailable_fragments,
         'keep_fragments': opts.keep_fragments,
         'concurrent_fragment_downloads': opts.concurrent_fragment_downloads,
+        'http2_fragments': opts.http2_fragments,
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'http_chunk_size': opts.http_chunk_size,
@@ -891,6 +911,7 @@ def parse_options(argv=None):
         'max_views': opts.max_views,
         'daterange': opts.date,
         'cachedir': opts.cachedir,
+        'http_cache': opts.http_cache,
         'youtube_print_sig_code': opts.youtube_print_sig_code,
         'age_limit': opts.age_limit,
         'download_archive': opts.download_archive,
@@ -906,9 +927,12 @@ def parse_options(argv=None):
         'enable_file_urls': opts.enable_file_urls,
         'http_headers': opts.headers,
         'proxy': opts.proxy,
+        'proxy_pool': opts.proxy_pool or None,
+        'proxy_pool_check_url': opts.proxy_pool_check_url,
         'socket_timeout': opts.socket_timeout,
         'bidi_workaround': opts.bidi_workaround,
         'debug_printtraffic': opts.debug_printtraffic,
+        'network_metrics_file': opts.network_metrics_file,
         'prefer_ffmpeg': opts.prefer_ffmpeg,
         'include_ads': opts.include_ads,
         'default_search': opts.default_search,
@@ -926,9 +950,11 @@ def parse_options(argv=None):
         'postprocessors': postprocessors,
         'fixup': opts.fixup,
         'source_address': opts.source_address,
+        'source_addresses': opts.source_addresses if len(opts.source_addresses) > 1 else None,
         'impersonate': opts.impersonate,
         'call_home': opts.call_home,
         'sleep_interval_requests': opts.sleep_interval_requests,
+        'concurrent_requests': opts.concurrent_requests,
         'sleep_interval': opts.sleep_interval,
         'max_sleep_interval': opts.max_sleep_interval,
         'sleep_interval_subtitles': opts.sleep_interval_subtitles,
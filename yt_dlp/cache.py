@@ -1,8 +1,11 @@
+import collections
 import contextlib
 import json
 import os
 import re
 import shutil
+import threading
+import time
 import traceback
 import urllib.parse
 
@@ -89,3 +92,35 @@ def remove(self):
             self._ydl.to_screen('.', skip_eol=True)
             shutil.rmtree(cachedir)
         self._ydl.to_screen('.')
+
+
+class ManifestCache:
+    """In-memory cache of the manifests downloaded by the extractors in this session,
+    so that the downloaders do not need to download them again"""
+
+    # Manifests older than this many seconds are not reused
+    MAX_AGE = 600
+    MAX_ENTRIES = 256
+
+    def __init__(self, ydl):
+        self._ydl = ydl
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()  # Extractors may run in threads (_map_concurrently)
+
+    def store(self, url, manifest, final_url=None):
+        """Store the manifest requested from url, which may have been redirected to final_url"""
+        with self._lock:
+            self._entries.pop(url, None)
+            self._entries[url] = (time.monotonic(), final_url or url, manifest)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def load(self, url):
+        """@returns (final_url, manifest), or None if url is not cached or is stale"""
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if not entry or time.monotonic() - entry[0] > self.MAX_AGE:
+                return None
+            self._entries[url] = entry
+        self._ydl.write_debug(f'Reusing manifest {url} from the session cache')
+        return entry[1:]
@@ -1217,6 +1217,7 @@ class YoutubeDLCookieJar(http.cookiejar.MozillaCookieJar):
     """
     _HTTPONLY_PREFIX = '#HttpOnly_'
     _ENTRY_LEN = 7
+    _LOOKUP_CACHE_SIZE = 256
     _HEADER = '''# Netscape HTTP Cookie File
 # This file is generated by yt-dlp.  Do not edit.
 
@@ -1230,6 +1231,9 @@ def __init__(self, filename=None, *args, **kwargs):
         if is_path_like(filename):
             filename = os.fspath(filename)
         self.filename = filename
+        self._lookup_cache = collections.OrderedDict()
+        self._domain_order = None
+        self._next_expiry = float('inf')
 
     @staticmethod
     def _true_or_false(cndn):
@@ -1348,9 +1352,82 @@ def get_cookies_for_url(self, url):
         """Generate a list of Cookie objects for a given url"""
         # Policy `_now` attribute must be set before calling `_cookies_for_request`
         # Ref: https://github.com/python/cpython/blob/3.7/Lib/http/cookiejar.py#L1360
-        self._policy._now = self._now = int(time.time())
-        return self._cookies_for_request(urllib.request.Request(normalize_url(sanitize_url(url))))
+        with self._cookies_lock:
+            self._policy._now = self._now = int(time.time())
+            return self._cookies_for_request(urllib.request.Request(normalize_url(sanitize_url(url))))
+
+    def set_cookie(self, cookie):
+        with self._cookies_lock:
+            super().set_cookie(cookie)
+            self._lookup_cache.clear()
+            if self._domain_order is not None and cookie.domain not in self._domain_order:
+                self._domain_order[cookie.domain] = len(self._domain_order)
+            if cookie.expires is not None:
+                self._next_expiry = min(self._next_expiry, cookie.expires)
+
+    def set_policy(self, policy):
+        with self._cookies_lock:
+            super().set_policy(policy)
+            self._lookup_cache.clear()
 
     def clear(self, *args, **kwargs):
-        with contextlib.suppress(KeyError):
-            return super().clear(*args, **kwargs)
+        with self._cookies_lock:
+            self._lookup_cache.clear()
+            self._domain_order = None
+            with contextlib.suppress(KeyError):
+                return super().clear(*args, **kwargs)
+
+    def clear_expired_cookies(self):
+        # `add_cookie_header` calls this on every request; avoid walking the whole jar
+        # when we know that nothing in it can have expired yet
+        with self._cookies_lock:
+            if time.time() < self._next_expiry:
+                return
+            super().clear_expired_cookies()
+            self._next_expiry = min((
+                cookie.expires for cookie in self if cookie.expires is not None), default=float('inf'))
+
+    @staticmethod
+    def _candidate_domains(request):
+        """All jar keys that `DefaultCookiePolicy.domain_return_ok` could accept for the request"""
+        domains = {''}
+        for host in http.cookiejar.eff_request_host(request):
+            labels = host.lstrip('.').split('.')
+            for i in range(len(labels)):
+                suffix = '.'.join(labels[i:])
+                domains.update((suffix, f'.{suffix}'))
+        return domains
+
+    def _cookies_for_request(self, request):
+        """
+        Same as `http.cookiejar.CookieJar._cookies_for_request`, but only looks at
+        domains which can match the request host instead of every domain in the jar.
+        Results of the most recent lookups are memoized per (scheme, host, port, path)
+        until the jar is modified
+        """
+        host = http.cookiejar.request_host(request)
+        if not host:  # e.g. data: URLs, for which request_port fails
+            return super()._cookies_for_request(request)
+        cache_key = (
+            request.type, host, http.cookiejar.request_port(request),
+            http.cookiejar.request_path(request), request.unverifiable)
+        cached = self._lookup_cache.get(cache_key)
+        if cached and self._now < cached[1]:
+            self._lookup_cache.move_to_end(cache_key)
+            return list(cached[0])
+
+        if self._domain_order is None:
+            self._domain_order = {domain: i for i, domain in enumerate(self._cookies)}
+        domains = sorted(
+            (domain for domain in self._candidate_domains(request) if domain in self._cookies),
+            key=self._domain_order.__getitem__)
+
+        cookies = []
+        for domain in domains:
+            cookies.extend(self._cookies_for_domain(domain, request))
+        self._lookup_cache[cache_key] = cookies, min((
+            cookie.expires for cookie in cookies if cookie.expires is not None), default=float('inf'))
+        self._lookup_cache.move_to_end(cache_key)
+        if len(self._lookup_cache) > self._LOOKUP_CACHE_SIZE:
+            self._lookup_cache.popitem(last=False)
+        return list(cookies)
@@ -1,9 +1,10 @@
+import functools
 import time
 import urllib.parse
 
 from . import get_suitable_downloader
 from .fragment import FragmentFD
-from ..utils import update_url_query, urljoin
+from ..utils import base_url, parse_duration, update_url_query, urljoin
 
 
 class DashSegmentsFD(FragmentFD):
@@ -13,13 +14,15 @@ class DashSegmentsFD(FragmentFD):
     """
 
     FD_NAME = 'dashsegments'
+    # Number of consecutive MPD refreshes without the format before the live download is ended
+    _LIVE_MAX_FAILURES = 5
 
     def real_download(self, filename, info_dict):
         if 'http_dash_segments_generator' in info_dict['protocol'].split('+'):
             real_downloader = None  # No external FD can support --live-from-start
+        elif info_dict.get('is_live'):
+            real_downloader = None  # The fragments are only known as the MPD is refreshed
         else:
-            if info_dict.get('is_live'):
-                self.report_error('Live DASH videos are not supported')
             real_downloader = get_suitable_downloader(
                 info_dict, self.params, None, protocol='dash_frag_urls', to_stdout=(filename == '-'))
 
@@ -28,6 +31,8 @@ def real_download(self, filename, info_dict):
         requested_formats = [{**info_dict, **fmt} for fmt in info_dict.get('requested_formats', [])]
         args = []
         for fmt in requested_formats or [info_dict]:
+            if fmt.get('is_live') and not callable(fmt.get('fragments')):
+                fmt['fragments'] = functools.partial(self._live_fragments, fmt)
             try:
                 fragment_count = 1 if self.params.get('test') else len(fmt['fragments'])
             except TypeError:
@@ -88,3 +93,49 @@ def _get_fragments(self, fmt, ctx, extra_query):
                 'index': i,
                 'url': fragment_url,
             }
+
+    @staticmethod
+    def _is_same_format(f, fmt):
+        # The format IDs of the MPD may have been prefixed with an mpd_id by the extractor
+        return f.get('manifest_stream_number') == fmt.get('manifest_stream_number') and (
+            f['format_id'] == fmt['format_id'] or fmt['format_id'].endswith(f'-{f["format_id"]}'))
+
+    def _live_fragments(self, fmt, ctx):
+        """
+        Generate the fragments of a live format by re-fetching its dynamic MPD manifest
+        every minimumUpdatePeriod, until it becomes static or stops listing the format.
+        Only the URLs of the current manifest are remembered, so that memory stays bounded
+        """
+        ie = self.ydl.get_info_extractor(fmt.get('extractor_key') or 'Generic')
+        downloaded, failures = set(), 0
+        while True:
+            fetch_time = time.time()
+            fmt_info, mpd_doc = None, None
+            res = ie._download_mpd_handle(
+                fmt['manifest_url'], fmt.get('id'), note=False, errnote=False, fatal=False,
+                headers=fmt.get('http_headers') or {})
+            if res:
+                mpd_doc, urlh = res
+                formats, _ = ie._parse_mpd_formats_and_subtitles(
+                    mpd_doc, mpd_base_url=base_url(urlh.url), mpd_url=urlh.url)
+                fmt_info = next((f for f in formats if self._is_same_format(f, fmt)), None)
+
+            if not fmt_info or not fmt_info.get('fragments'):
+                failures += 1
+                if failures > self._LIVE_MAX_FAILURES:
+                    self.report_warning(f'Unable to refresh the MPD manifest of format {fmt["format_id"]}')
+                    return
+            else:
+                failures = 0
+                fragment_urls = [
+                    fragment.get('url') or urljoin(fmt_info['fragment_base_url'], fragment['path'])
+                    for fragment in fmt_info['fragments']]
+                for fragment_url in fragment_urls:
+                    if fragment_url not in downloaded:
+                        yield {'url': fragment_url}
+                downloaded = set(fragment_urls)
+
+            if mpd_doc is not None and mpd_doc.get('type') != 'dynamic':
+                return
+            update_period = parse_duration(mpd_doc.get('minimumUpdatePeriod')) if mpd_doc is not None else None
+            time.sleep(max(fetch_time + (5 if update_period is None else update_period) - time.time(), 0))
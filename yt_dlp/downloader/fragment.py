@@ -1,3 +1,4 @@
+import collections
 import concurrent.futures
 import contextlib
 import json
@@ -37,6 +38,8 @@ class FragmentFD(FileDownloader):
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
     concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads
+    http2_fragments:    Prefer a request handler that downloads the fragments over
+                        a reused HTTP/2 connection (curl_cffi)
     _no_ytdl_file:      Don't use .ytdl file
 
     For each incomplete fragment download yt-dlp keeps on disk a special
@@ -116,6 +119,8 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
             'http_headers': headers or info_dict.get('http_headers'),
             'request_data': request_data,
             'ctx_id': ctx.get('ctx_id'),
+            'proxy_pool_key': ctx['filename'],
+            'http2': self.params.get('http2_fragments'),
         }
         frag_resume_len = 0
         if ctx['dl'].params.get('continuedl', True):
@@ -173,6 +178,10 @@ def _prepare_frag_download(self, ctx):
             'max_sleep_interval': 0,
             'sleep_interval_subtitles': 0,
         })
+        if self.params.get('http2_fragments') and 'CurlCFFI' not in self.ydl._request_director.handlers:
+            self.report_warning(
+                'HTTP/2 fragment downloads require curl_cffi, which is not available. '
+                'Downloading the fragments over HTTP/1.1', only_once=True)
         tmpfilename = self.temp_name(ctx['filename'])
         open_mode = 'wb'
 
@@ -491,9 +500,24 @@ def _download_fragment(fragment):
                 download_fragment(fragment, ctx_copy)
                 return fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized')
 
+            def bounded_map(pool, func, iterable):
+                # Unlike pool.map, do not exhaust the iterable up front, which may be
+                # an endless generator of live fragments
+                futures = collections.deque()
+                try:
+                    for item in iterable:
+                        futures.append(pool.submit(func, item))
+                        if len(futures) >= 2 * max_workers:
+                            yield futures.popleft().result()
+                    while futures:
+                        yield futures.popleft().result()
+                finally:
+                    for future in futures:
+                        future.cancel()
+
             with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
                 try:
-                    for fragment, frag_index, frag_filename in pool.map(_download_fragment, fragments):
+                    for fragment, frag_index, frag_filename in bounded_map(pool, _download_fragment, fragments):
                         ctx.update({
                             'fragment_filename_sanitized': frag_filename,
                             'fragment_index': frag_index,
@@ -112,6 +112,15 @@ def establish_connection():
                 range_end = ctx.content_len - 1
 
             request = Request(url, request_data, headers)
+            if self.ydl.source_address_pool:
+                # Spread the chunks and fragments over the source addresses
+                ctx.source_address = self.ydl.source_address_pool.get()
+                request.extensions['source_address'] = ctx.source_address
+            if self.ydl.proxy_pool:
+                # Keep all the requests of a download on the same proxy
+                request.extensions['proxy_pool_key'] = info_dict.get('proxy_pool_key') or filename
+            if info_dict.get('http2'):
+                request.extensions['http2'] = True
             has_range = range_start is not None
             if has_range:
                 request.headers['Range'] = f'bytes={int(range_start)}-{int_or_none(range_end) or ""}'
@@ -152,7 +161,7 @@ def establish_connection():
                     try:
                         # Open the connection again without the range header
                         ctx.data = self.ydl.urlopen(
-                            Request(url, request_data, headers))
+                            Request(url, request_data, headers, extensions=request.extensions))
                         content_length = ctx.data.headers['Content-Length']
                     except HTTPError as err:
                         if err.status < 500 or err.status >= 600:
@@ -200,11 +209,14 @@ def close_stream():
 
         def download():
             data_len = ctx.data.headers.get('Content-length')
+            wire_len = None
 
-            if ctx.data.headers.get('Content-encoding'):
+            encoded = bool(ctx.data.headers.get('Content-encoding'))
+            if encoded:
                 # Content-encoding is present, Content-length is not reliable anymore as we are
                 # doing auto decompression. (See: https://github.com/yt-dlp/yt-dlp/pull/6176)
-                data_len = None
+                # It is still the size on the wire, which is used for progress and the filesize limits
+                wire_len, data_len = int_or_none(data_len), None
 
             # Range HTTP header may be ignored/unsupported by a webserver
             # (e.g. extractor/scivee.py, extractor/bambuser.py).
@@ -216,19 +228,23 @@ def download():
 
             if data_len is not None:
                 data_len = int(data_len) + ctx.resume_len
-                min_data_len = self.params.get('min_filesize')
-                max_data_len = self.params.get('max_filesize')
-                if min_data_len is not None and data_len < min_data_len:
+            min_data_len = self.params.get('min_filesize')
+            max_data_len = self.params.get('max_filesize')
+            expected_len = data_len if data_len is not None else wire_len
+            if expected_len is not None:
+                if min_data_len is not None and expected_len < min_data_len:
                     self.to_screen(
-                        f'\r[download] File is smaller than min-filesize ({data_len} bytes < {min_data_len} bytes). Aborting.')
+                        f'\r[download] File is smaller than min-filesize ({expected_len} bytes < {min_data_len} bytes). Aborting.')
                     return False
-                if max_data_len is not None and data_len > max_data_len:
+                if max_data_len is not None and expected_len > max_data_len:
                     self.to_screen(
-                        f'\r[download] File is larger than max-filesize ({data_len} bytes > {max_data_len} bytes). Aborting.')
+                        f'\r[download] File is larger than max-filesize ({expected_len} bytes > {max_data_len} bytes). Aborting.')
                     return False
 
             byte_counter = 0 + ctx.resume_len
             block_size = ctx.block_size
+            # Read into a single reusable buffer, grown with the block size, instead of a new bytes per block
+            buffer = memoryview(bytearray(block_size))
             start = time.time()
 
             # measure time over whole while-loop, so slow_down() and best_block_size() work together properly
@@ -247,13 +263,22 @@ def retry(e):
                 raise RetryDownload(e)
 
             while True:
+                if block_size > len(buffer):
+                    buffer = memoryview(bytearray(block_size))
                 try:
                     # Download and write
-                    data_block = ctx.data.read(block_size if not is_test else min(block_size, data_len - byte_counter))
+                    data_block = buffer[:ctx.data.readinto(
+                        buffer[:block_size if not is_test else min(block_size, data_len - byte_counter)])]
                 except TransportError as err:
                     retry(err)
 
                 byte_counter += len(data_block)
+                wire_counter = ctx.data.wire_bytes if encoded else None
+                if max_data_len is not None and wire_counter is not None and wire_counter > max_data_len:
+                    close_stream()
+                    self.to_screen(
+                        f'\r[download] File is larger than max-filesize ({wire_counter} bytes > {max_data_len} bytes). Aborting.')
+                    return False
 
                 # exit loop when download is finished
                 if len(data_block) == 0:
@@ -299,7 +324,16 @@ def retry(e):
 
                 # Progress message
                 speed = self.calc_speed(start, now, byte_counter - ctx.resume_len)
-                if ctx.data_len is None:
+                wire_progress = {}
+                if encoded:
+                    # The decoded size is only known once done, so estimate it from the compression ratio
+                    eta = self.calc_eta(start, time.time(), wire_len, wire_counter) if wire_counter else None
+                    wire_progress = {
+                        'total_bytes_estimate': int(wire_len * byte_counter / wire_counter) if wire_len and wire_counter else None,
+                        'downloaded_wire_bytes': wire_counter,
+                        'total_wire_bytes': wire_len,
+                    }
+                elif ctx.data_len is None:
                     eta = None
                 else:
                     eta = self.calc_eta(start, time.time(), ctx.data_len - ctx.resume_len, byte_counter - ctx.resume_len)
@@ -307,7 +341,8 @@ def retry(e):
                 self._hook_progress({
                     'status': 'downloading',
                     'downloaded_bytes': byte_counter,
-                    'total_bytes': ctx.data_len,
+                    'total_bytes': data_len if encoded else ctx.data_len,
+                    **wire_progress,
                     'tmpfilename': ctx.tmpfilename,
                     'filename': ctx.filename,
                     'eta': eta,
@@ -331,6 +366,10 @@ def retry(e):
                 elif speed:
                     ctx.throttle_start = None
 
+            if ctx.source_address:
+                self.ydl.source_address_pool.report(
+                    ctx.source_address, byte_counter - ctx.resume_len, time.time() - start)
+
             if ctx.stream is None:
                 self.to_stderr('\n')
                 self.report_error('Did not get any data blocks')
@@ -12,6 +12,7 @@
     get_element_by_id,
     get_element_html_by_class,
     get_elements_html_by_class,
+    index_html,
     int_or_none,
     orderedSet,
     parse_count,
@@ -136,6 +137,7 @@ def _real_extract(self, url):
         video_id = self._match_id(url)
         webpage = self._download_webpage(
             f'https://old.bitchute.com/video/{video_id}', video_id, headers=self._HEADERS)
+        index_html(webpage)
 
         self._raise_if_restricted(webpage)
         publish_date = clean_html(get_element_by_class('video-publish-date', webpage))
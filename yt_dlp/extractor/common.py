@@ -1,5 +1,6 @@
 import base64
 import collections
+import concurrent.futures
 import functools
 import getpass
 import hashlib
@@ -23,6 +24,7 @@
 import xml.etree.ElementTree
 
 from ..compat import (
+    _TreeBuilder,
     compat_etree_fromstring,
     compat_expanduser,
     compat_os_name,
@@ -44,6 +46,7 @@
     NO_DEFAULT,
     ExtractorError,
     FormatSorter,
+    FragmentSequence,
     GeoRestrictedError,
     GeoUtils,
     LenientJSONDecoder,
@@ -101,6 +104,46 @@
 )
 
 
+class _MPDSegmentTimeline(xml.etree.ElementTree.Element):
+    # (t, d, r) tuples of the S elements, which are not kept in the tree
+    segments = None
+
+
+class _MPDTreeBuilder(_TreeBuilder):
+    """Tree builder that discards the S elements of SegmentTimelines as soon as they are
+    parsed, since they can number in the hundreds of thousands for long streams"""
+
+    def __init__(self):
+        super().__init__(element_factory=self._element_factory)
+        self._timeline = None
+
+    @staticmethod
+    def _element_factory(tag, attrib):
+        if tag.rpartition('}')[2] == 'SegmentTimeline':
+            return _MPDSegmentTimeline(tag, attrib)
+        return xml.etree.ElementTree.Element(tag, attrib)
+
+    def start(self, tag, attrs):
+        element = super().start(tag, attrs)
+        if isinstance(element, _MPDSegmentTimeline):
+            element.segments = []
+            self._timeline = element
+        return element
+
+    def end(self, tag):
+        element = super().end(tag)
+        timeline = self._timeline
+        if element is timeline:
+            self._timeline = None
+        elif timeline is not None and tag == f'{timeline.tag[:-len("SegmentTimeline")]}S' and timeline[-1] is element:
+            timeline.segments.append((
+                int(element.get('t', 0)),
+                int(element.attrib['d']),  # @d is mandatory
+                int(element.get('r', 0))))
+            del timeline[-1]
+        return element
+
+
 class InfoExtractor:
     """Information Extractor class.
 
@@ -190,6 +233,8 @@ class InfoExtractor:
                                  value (if present) will be relative to
                                  this URL.
                     * fragments  A list of fragments of a fragmented media.
+                                 A FragmentSequence can be used for long
+                                 templated lists, to save memory.
                                  Each fragment entry must contain either an url
                                  or a path. If an url is present it should be
                                  considered by a client. Otherwise both path and
@@ -1073,6 +1118,16 @@ def _parse_xml(self, xml_string, video_id, transform_source=None, fatal=True, er
         except xml.etree.ElementTree.ParseError as ve:
             self.__print_error('Failed to parse XML' if errnote is None else errnote, fatal, video_id, ve)
 
+    def _parse_mpd_xml(self, xml_string, video_id, transform_source=None, fatal=True, errnote=None):
+        """Like _parse_xml, but keeps the SegmentTimelines compact for _parse_mpd_periods"""
+        if transform_source:
+            xml_string = transform_source(xml_string)
+        try:
+            return xml.etree.ElementTree.XML(
+                xml_string.encode(), parser=xml.etree.ElementTree.XMLParser(target=_MPDTreeBuilder()))
+        except xml.etree.ElementTree.ParseError as ve:
+            self.__print_error('Failed to parse XML' if errnote is None else errnote, fatal, video_id, ve)
+
     def _parse_json(self, json_string, video_id, transform_source=None, fatal=True, errnote=None, **parser_kwargs):
         try:
             return json.loads(
@@ -1154,6 +1209,9 @@ def impersonate(func, name, return_value):
 
     _download_xml_handle, _download_xml = __create_download_methods(
         'xml', '_parse_xml', 'Downloading XML', 'Unable to download XML', 'xml as an xml.etree.ElementTree.Element')
+    _download_mpd_handle, _download_mpd = __create_download_methods(
+        'mpd', '_parse_mpd_xml', 'Downloading MPD manifest', 'Failed to download MPD manifest',
+        'MPD manifest as an xml.etree.ElementTree.Element')
     _download_json_handle, _download_json = __create_download_methods(
         'json', '_parse_json', 'Downloading JSON metadata', 'Unable to download JSON metadata', 'JSON object as a dict')
     _download_socket_json_handle, _download_socket_json = __create_download_methods(
@@ -2048,6 +2106,8 @@ def _extract_m3u8_formats_and_subtitles(
             return [], {}
 
         m3u8_doc, urlh = res
+        if data is None:
+            self._cache_m3u8_playlist(m3u8_doc, None if query else m3u8_url, urlh.url)
         m3u8_url = urlh.url
 
         return self._parse_m3u8_formats_and_subtitles(
@@ -2072,11 +2132,14 @@ def _extract_m3u8_playlist_indices(manifest_url=None, m3u8_doc=None):
                 if not m3u8_doc:
                     if not manifest_url:
                         return []
-                    m3u8_doc = self._download_webpage(
+                    res = self._download_webpage_handle(
                         manifest_url, video_id, fatal=fatal, data=data, headers=headers,
                         note=False, errnote='Failed to download m3u8 playlist information')
-                    if m3u8_doc is False:
+                    if res is False:
                         return []
+                    m3u8_doc, urlh = res
+                    if data is None:
+                        self._cache_m3u8_playlist(m3u8_doc, manifest_url, urlh.url)
                 return range(1 + sum(line.startswith('#EXT-X-DISCONTINUITY') for line in m3u8_doc.splitlines()))
 
         else:
@@ -2280,16 +2343,32 @@ def build_stream_name():
                 last_stream_inf = {}
         return formats, subtitles
 
+    def _cache_m3u8_playlist(self, m3u8_doc, m3u8_url, final_url):
+        # VOD media playlists do not change, so that HlsFD can reuse them
+        if '#EXT-X-TARGETDURATION' not in m3u8_doc or '#EXT-X-ENDLIST' not in m3u8_doc:
+            return
+        for url in {m3u8_url, final_url} - {None}:
+            self._downloader.manifest_cache.store(url, m3u8_doc, final_url)
+
     def _extract_m3u8_vod_duration(
             self, m3u8_vod_url, video_id, note=None, errnote=None, data=None, headers={}, query={}):
 
-        m3u8_vod = self._download_webpage(
+        cached = None if data is not None or query else self._downloader.manifest_cache.load(m3u8_vod_url)
+        if cached:
+            return self._parse_m3u8_vod_duration(cached[1], video_id)
+
+        res = self._download_webpage_handle(
             m3u8_vod_url, video_id,
             note='Downloading m3u8 VOD manifest' if note is None else note,
             errnote='Failed to download VOD manifest' if errnote is None else errnote,
             fatal=False, data=data, headers=headers, query=query)
+        if res is False:
+            return None
+        m3u8_vod, urlh = res
+        if data is None:
+            self._cache_m3u8_playlist(m3u8_vod, None if query else m3u8_vod_url, urlh.url)
 
-        return self._parse_m3u8_vod_duration(m3u8_vod or '', video_id)
+        return self._parse_m3u8_vod_duration(m3u8_vod, video_id)
 
     def _parse_m3u8_vod_duration(self, m3u8_vod, video_id):
         if '#EXT-X-ENDLIST' not in m3u8_vod:
@@ -2619,7 +2698,7 @@ def _extract_mpd_periods(
         if self.get_param('ignore_no_formats_error'):
             fatal = False
 
-        res = self._download_xml_handle(
+        res = self._download_mpd_handle(
             mpd_url, video_id,
             note='Downloading MPD manifest' if note is None else note,
             errnote='Failed to download MPD manifest' if errnote is None else errnote,
@@ -2661,7 +2740,7 @@ def _merge_mpd_periods(self, periods):
                 if format_key not in formats:
                     formats[format_key] = f
                 elif 'fragments' in f:
-                    formats[format_key].setdefault('fragments', []).extend(f['fragments'])
+                    formats[format_key].setdefault('fragments', FragmentSequence()).extend(f['fragments'])
 
             if subtitles and period['subtitles']:
                 self.report_warning(bug_reports_message(
@@ -2703,19 +2782,18 @@ def extract_multisegment_info(element, ms_parent_info):
             def extract_common(source):
                 segment_timeline = source.find(_add_ns('SegmentTimeline'))
                 if segment_timeline is not None:
-                    s_e = segment_timeline.findall(_add_ns('S'))
+                    # The S elements are already parsed if the MPD was parsed with _parse_mpd_xml
+                    s_e = getattr(segment_timeline, 'segments', None)
+                    if s_e is None:
+                        s_e = [(
+                            int(s.get('t', 0)),
+                            # @d is mandatory (see [1, 5.3.9.6.2, Table 17, page 60])
+                            int(s.attrib['d']),
+                            int(s.get('r', 0)),
+                        ) for s in segment_timeline.findall(_add_ns('S'))]
                     if s_e:
-                        ms_info['total_number'] = 0
-                        ms_info['s'] = []
-                        for s in s_e:
-                            r = int(s.get('r', 0))
-                            ms_info['total_number'] += 1 + r
-                            ms_info['s'].append({
-                                't': int(s.get('t', 0)),
-                                # @d is mandatory (see [1, 5.3.9.6.2, Table 17, page 60])
-                                'd': int(s.attrib['d']),
-                                'r': r,
-                            })
+                        ms_info['total_number'] = sum(1 + r for _, _, r in s_e)
+                        ms_info['s'] = s_e
                 start_number = source.get('startNumber')
                 if start_number:
                     ms_info['start_number'] = int(start_number)
@@ -2753,6 +2831,14 @@ def extract_Initialization(source):
             return ms_info
 
         mpd_duration = parse_duration(mpd_doc.get('mediaPresentationDuration'))
+        # Time since the start of a live stream, to number the segments that are available now
+        live_edge = None
+        if mpd_doc.get('type') == 'dynamic':
+            availability_start_time = parse_iso8601(mpd_doc.get('availabilityStartTime'))
+            if availability_start_time is not None:
+                live_edge = time.time() - availability_start_time
+        time_shift_buffer_depth = parse_duration(mpd_doc.get('timeShiftBufferDepth'))
+        minimum_update_period = parse_duration(mpd_doc.get('minimumUpdatePeriod'))
         stream_numbers = collections.defaultdict(int)
         for period_idx, period in enumerate(mpd_doc.findall(_add_ns('Period'))):
             period_entry = {
@@ -2761,6 +2847,9 @@ def extract_Initialization(source):
                 'subtitles': collections.defaultdict(list),
             }
             period_duration = parse_duration(period.get('duration')) or mpd_duration
+            period_live_edge = (
+                live_edge - (parse_duration(period.get('start')) or 0)
+                if live_edge is not None and not period_duration else None)
             period_ms_info = extract_multisegment_info(period, {
                 'start_number': 1,
                 'timescale': 1,
@@ -2905,49 +2994,38 @@ def location_key(location):
                         # can't be used at the same time
                         if '%(Number' in media_template and 's' not in representation_ms_info:
                             segment_duration = None
+                            first_number = 0
                             if 'total_number' not in representation_ms_info and 'segment_duration' in representation_ms_info:
                                 segment_duration = float_or_none(representation_ms_info['segment_duration'], representation_ms_info['timescale'])
-                                representation_ms_info['total_number'] = int(math.ceil(
-                                    float_or_none(period_duration, segment_duration, default=0)))
-                            representation_ms_info['fragments'] = [{
-                                media_location_key: media_template % {
-                                    'Number': segment_number,
-                                    'Bandwidth': bandwidth,
-                                },
-                                'duration': segment_duration,
-                            } for segment_number in range(
-                                representation_ms_info['start_number'],
-                                representation_ms_info['total_number'] + representation_ms_info['start_number'])]
+                                if period_live_edge is not None and segment_duration:
+                                    # Live stream: only the segments completed by now, within the time shift buffer.
+                                    # Without a buffer depth, only the segments of one update period (at least 3)
+                                    # are listed, instead of every segment since availabilityStartTime
+                                    representation_ms_info['total_number'] = max(int(period_live_edge // segment_duration), 0)
+                                    window = max(int(math.ceil((minimum_update_period or 0) / segment_duration)), 3)
+                                    if time_shift_buffer_depth is not None:
+                                        window = int(math.ceil(time_shift_buffer_depth / segment_duration))
+                                    first_number = max(representation_ms_info['total_number'] - window, 0)
+                                else:
+                                    representation_ms_info['total_number'] = int(math.ceil(
+                                        float_or_none(period_duration, segment_duration, default=0)))
+                            # The fragments are only materialized when they are accessed,
+                            # since long VODs can have hundreds of thousands of them
+                            representation_ms_info['fragments'] = FragmentSequence()
+                            representation_ms_info['fragments'].add_template(
+                                media_location_key, media_template,
+                                representation_ms_info['total_number'] - first_number, segment_duration,
+                                number=representation_ms_info['start_number'] + first_number,
+                                Bandwidth=bandwidth)
                         else:
                             # $Number*$ or $Time$ in media template with S list available
                             # Example $Number*$: http://www.svtplay.se/klipp/9023742/stopptid-om-bjorn-borg
                             # Example $Time$: https://play.arkena.com/embed/avp/v2/player/media/b41dda37-d8e7-4d3f-b1b5-9a9db578bdfe/1/129411
-                            representation_ms_info['fragments'] = []
-                            segment_time = 0
-                            segment_d = None
-                            segment_number = representation_ms_info['start_number']
-
-                            def add_segment_url():
-                                segment_url = media_template % {
-                                    'Time': segment_time,
-                                    'Bandwidth': bandwidth,
-                                    'Number': segment_number,
-                                }
-                                representation_ms_info['fragments'].append({
-                                    media_location_key: segment_url,
-                                    'duration': float_or_none(segment_d, representation_ms_info['timescale']),
-                                })
-
-                            for s in representation_ms_info['s']:
-                                segment_time = s.get('t') or segment_time
-                                segment_d = s['d']
-                                add_segment_url()
-                                segment_number += 1
-                                for _ in range(s.get('r', 0)):
-                                    segment_time += segment_d
-                                    add_segment_url()
-                                    segment_number += 1
-                                segment_time += segment_d
+                            representation_ms_info['fragments'] = FragmentSequence()
+                            representation_ms_info['fragments'].add_timeline(
+                                media_location_key, media_template, representation_ms_info['s'],
+                                representation_ms_info['timescale'],
+                                number=representation_ms_info['start_number'], Bandwidth=bandwidth)
                     elif 'segment_urls' in representation_ms_info and 's' in representation_ms_info:
                         # No media template,
                         # e.g. https://www.youtube.com/watch?v=iXZV5uAYMJI
@@ -2955,9 +3033,9 @@ def add_segment_url():
                         fragments = []
                         segment_index = 0
                         timescale = representation_ms_info['timescale']
-                        for s in representation_ms_info['s']:
-                            duration = float_or_none(s['d'], timescale)
-                            for _ in range(s.get('r', 0) + 1):
+                        for _, d, r in representation_ms_info['s']:
+                            duration = float_or_none(d, timescale)
+                            for _ in range(r + 1):
                                 segment_uri = representation_ms_info['segment_urls'][segment_index]
                                 fragments.append({
                                     location_key(segment_uri): segment_uri,
@@ -2990,7 +3068,7 @@ def add_segment_url():
                             # NB: mpd_url may be empty when MPD manifest is parsed from a string
                             'url': mpd_url or base_url,
                             'fragment_base_url': base_url,
-                            'fragments': [],
+                            'fragments': FragmentSequence(),
                             'protocol': 'http_dash_segments' if mime_type != 'image/jpeg' else 'mhtml',
                         })
                         if 'initialization_url' in representation_ms_info:
@@ -3874,6 +3952,21 @@ def _error_or_warning(self, err, _count=None, _retries=0, *, fatal=True):
     def RetryManager(self, **kwargs):
         return RetryManager(self.get_param('extractor_retries', 3), self._error_or_warning, **kwargs)
 
+    def _map_concurrently(self, func, iterable):
+        """
+        Return [func(item) for item in iterable], making the calls concurrently.
+        Meant for independent network requests of an extraction, e.g. API calls or manifests.
+        The first exception raised by func is re-raised once all the calls have finished.
+        The calls are made sequentially if concurrent_requests is 1 or sleep_interval_requests is set
+        """
+        items = list(iterable)
+        max_workers = self.get_param('concurrent_requests') or 4
+        if max_workers <= 1 or len(items) <= 1 or self.get_param('sleep_interval_requests'):
+            return list(map(func, items))
+        with concurrent.futures.ThreadPoolExecutor(
+                min(max_workers, len(items)), thread_name_prefix=self.IE_NAME) as executor:
+            return list(executor.map(func, items))
+
     def _extract_generic_embeds(self, url, *args, info_dict={}, note='Extracting generic embeds', **kwargs):
         display_id = traverse_obj(info_dict, 'display_id', 'id')
         self.to_screen(f'{format_field(display_id, None, "%s: ")}{note}')
@@ -22,6 +22,7 @@
 from .common import InfoExtractor, SearchInfoExtractor
 from .openload import PhantomJSwrapper
 from ..jsinterp import JSInterpreter
+from ..networking import Request
 from ..networking.exceptions import HTTPError, network_exceptions
 from ..utils import (
     NO_DEFAULT,
@@ -2982,7 +2983,7 @@ def _load_player(self, video_id, player_url, fatal=True):
         player_id = self._extract_player_info(player_url)
         if player_id not in self._code_cache:
             code = self._download_webpage(
-                player_url, video_id, fatal=fatal,
+                Request(player_url, extensions={'cache': True}), video_id, fatal=fatal,
                 note='Downloading player ' + player_id,
                 errnote=f'Download of {player_url} failed')
             if code:
@@ -3730,39 +3731,28 @@ def _extract_player_responses(self, clients, video_id, webpage, master_ytcfg, sm
             prs.append({**initial_pr, 'streamingData': None})
 
         all_clients = set(clients)
-        clients = clients[::-1]
+        requested_clients, clients = clients, list(clients)
+        client_prs, fallback_clients = {}, collections.defaultdict(list)
 
-        def append_client(*client_names):
+        def append_client(parent_client, *client_names):
             """ Append the first client name that exists but not already used """
             for client_name in client_names:
                 actual_client = _split_innertube_client(client_name)[0]
                 if actual_client in INNERTUBE_CLIENTS:
                     if actual_client not in all_clients:
                         clients.append(client_name)
+                        fallback_clients[parent_client].append(client_name)
                         all_clients.add(actual_client)
                         return
 
-        tried_iframe_fallback = False
-        player_url = None
-        skipped_clients = {}
-        while clients:
-            client, base_client, variant = _split_innertube_client(clients.pop())
-            player_ytcfg = {}
-            if client == 'web':
-                player_ytcfg = self._get_default_ytcfg() if ignore_initial_response else master_ytcfg
-            elif 'configs' not in self._configuration_arg('player_skip'):
-                player_ytcfg = self._download_ytcfg(client, video_id) or player_ytcfg
-
-            player_url = player_url or self._extract_player_url(master_ytcfg, player_ytcfg, webpage=webpage)
-            require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
-            if 'js' in self._configuration_arg('player_skip'):
-                require_js_player = False
-                player_url = None
-
-            if not player_url and not tried_iframe_fallback and require_js_player:
-                player_url = self._download_player_url(video_id)
-                tried_iframe_fallback = True
+        def ordered_prs(client_names):
+            # Fallback clients follow the client that needed them, as if the clients were tried one by one
+            for client_name in client_names:
+                if client_name in client_prs:
+                    yield client_prs[client_name]
+                yield from ordered_prs(fallback_clients[client_name])
 
+        def fetch_player_response(client, player_ytcfg, require_js_player):
             pr = initial_pr if client == 'web' and not ignore_initial_response else None
             for retry in self.RetryManager(fatal=False):
                 try:
@@ -3778,28 +3768,68 @@ def append_client(*client_names):
                 if all(x in experiments for x in self._POTOKEN_EXPERIMENTS):
                     pr = None
                     retry.error = ExtractorError('API returned broken formats (poToken experiment detected)', expected=True)
-            if not pr:
-                continue
+            return pr
 
-            if pr_id := self._invalid_player_response(pr, video_id):
-                skipped_clients[client] = pr_id
-            elif pr:
-                # Save client name for introspection later
-                name = short_client_name(client)
-                sd = traverse_obj(pr, ('streamingData', {dict})) or {}
-                sd[STREAMING_DATA_CLIENT_NAME] = name
-                for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
-                    f[STREAMING_DATA_CLIENT_NAME] = name
-                prs.append(pr)
-
-            # creator clients can bypass AGE_VERIFICATION_REQUIRED if logged in
-            if variant == 'embedded' and self._is_unplayable(pr) and self.is_authenticated:
-                append_client(f'{base_client}_creator')
-            elif self._is_agegated(pr):
-                if variant == 'tv_embedded':
-                    append_client(f'{base_client}_embedded')
-                elif not variant:
-                    append_client(f'tv_embedded.{base_client}', f'{base_client}_embedded')
+        tried_iframe_fallback = False
+        player_url = None
+        skipped_clients = {}
+        while clients:
+            # The configs and player are needed by all clients, so they are fetched first.
+            # The player API requests are independent of each other and are made concurrently
+            batch, clients = clients, []
+            fetch_args = []
+            for client_name in batch:
+                client = _split_innertube_client(client_name)[0]
+                player_ytcfg = {}
+                if client == 'web':
+                    player_ytcfg = self._get_default_ytcfg() if ignore_initial_response else master_ytcfg
+                elif 'configs' not in self._configuration_arg('player_skip'):
+                    player_ytcfg = self._download_ytcfg(client, video_id) or player_ytcfg
+
+                player_url = player_url or self._extract_player_url(master_ytcfg, player_ytcfg, webpage=webpage)
+                require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
+                if 'js' in self._configuration_arg('player_skip'):
+                    require_js_player = False
+                    player_url = None
+
+                if not player_url and not tried_iframe_fallback and require_js_player:
+                    player_url = self._download_player_url(video_id)
+                    tried_iframe_fallback = True
+                fetch_args.append((client, player_ytcfg, require_js_player))
+
+            if player_url and any(
+                    require_js_player and not int_or_none((player_ytcfg or master_ytcfg).get('STS'))
+                    for _, player_ytcfg, require_js_player in fetch_args):
+                # Load the player once for the signature timestamp instead of in every request
+                self._load_player(video_id, player_url, fatal=False)
+
+            player_responses = self._map_concurrently(lambda args: fetch_player_response(*args), fetch_args)
+            for client_name, pr in zip(batch, player_responses):
+                if not pr:
+                    continue
+                client, base_client, variant = _split_innertube_client(client_name)
+
+                if pr_id := self._invalid_player_response(pr, video_id):
+                    skipped_clients[client] = pr_id
+                elif pr:
+                    # Save client name for introspection later
+                    name = short_client_name(client)
+                    sd = traverse_obj(pr, ('streamingData', {dict})) or {}
+                    sd[STREAMING_DATA_CLIENT_NAME] = name
+                    for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
+                        f[STREAMING_DATA_CLIENT_NAME] = name
+                    client_prs[client_name] = pr
+
+                # creator clients can bypass AGE_VERIFICATION_REQUIRED if logged in
+                if variant == 'embedded' and self._is_unplayable(pr) and self.is_authenticated:
+                    append_client(client_name, f'{base_client}_creator')
+                elif self._is_agegated(pr):
+                    if variant == 'tv_embedded':
+                        append_client(client_name, f'{base_client}_embedded')
+                    elif not variant:
+                        append_client(client_name, f'tv_embedded.{base_client}', f'{base_client}_embedded')
+
+        prs.extend(ordered_prs(requested_clients))
 
         if skipped_clients:
             self.report_warning(
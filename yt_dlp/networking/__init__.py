@@ -3,11 +3,16 @@
 
 from .common import (
     HEADRequest,
+    HTTPCache,
+    NetworkMetrics,
+    ProxyPool,
     PUTRequest,
+    RateLimiter,
     Request,
     RequestDirector,
     RequestHandler,
     Response,
+    SourceAddressPool,
 )
 
 # isort: split
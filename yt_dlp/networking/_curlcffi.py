@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import contextlib
 import io
 import math
 import re
 import urllib.parse
 
-from ._helper import InstanceStoreMixin, select_proxy
+from ._helper import InstanceStoreMixin, _request_timings, select_proxy
 from .common import (
     Features,
     Request,
@@ -36,7 +37,7 @@
     raise ImportError('Only curl_cffi versions 0.5.10, 0.7.X are supported')
 
 import curl_cffi.requests
-from curl_cffi.const import CurlECode, CurlOpt
+from curl_cffi.const import CurlECode, CurlHttpVersion, CurlInfo, CurlOpt
 
 
 class CurlCFFIResponseReader(io.IOBase):
@@ -104,6 +105,9 @@ def read(self, amt=None):
                     cause=e) from e
             raise TransportError(cause=e) from e
 
+    def readinto(self, buffer):
+        return self._readinto_from_read(buffer)
+
 
 @register_rh
 class CurlCFFIRH(ImpersonateRequestHandler, InstanceStoreMixin):
@@ -146,6 +150,7 @@ def _check_extensions(self, extensions):
         extensions.pop('impersonate', None)
         extensions.pop('cookiejar', None)
         extensions.pop('timeout', None)
+        extensions.pop('source_address', None)
         # CurlCFFIRH ignores legacy ssl options currently.
         # Impersonation generally uses a looser SSL configuration than urllib/requests.
         extensions.pop('legacy_ssl', None)
@@ -160,6 +165,21 @@ def send(self, request: Request) -> Response:
         response.extensions['impersonate'] = target
         return response
 
+    @staticmethod
+    def _record_timings(curl):
+        timings = _request_timings.get()
+        if timings is None:
+            return
+        # libcurl timings are cumulative from the start of the transfer, and zero for reused connections
+        with contextlib.suppress(Exception):
+            dns, connect, tls = (
+                curl.getinfo(info) for info in (
+                    CurlInfo.NAMELOOKUP_TIME, CurlInfo.CONNECT_TIME, CurlInfo.APPCONNECT_TIME))
+            if connect:
+                timings.update(dns=dns, connect=connect - dns)
+            if tls:
+                timings['tls'] = tls - connect
+
     def _send(self, request: Request):
         max_redirects_exceeded = False
         session: curl_cffi.requests.Session = self._get_instance(
@@ -224,7 +244,8 @@ def _send(self, request: Request):
                 timeout=(timeout, timeout),
                 impersonate=self._SUPPORTED_IMPERSONATE_TARGET_MAP.get(
                     self._get_request_target(request)),
-                interface=self.source_address,
+                interface=self._get_source_address(request),
+                http_version=CurlHttpVersion.V2TLS if request.extensions.get('http2') else None,
                 stream=True,
             )
         except curl_cffi.requests.errors.RequestsError as e:
@@ -246,6 +267,7 @@ def _send(self, request: Request):
             else:
                 raise TransportError(cause=e) from e
 
+        self._record_timings(getattr(curl_response, 'curl', None) or session.curl)
         response = CurlCFFIResponseAdapter(curl_response)
 
         if not 200 <= response.status < 300:
@@ -256,4 +278,5 @@ def _send(self, request: Request):
 
 @register_preference(CurlCFFIRH)
 def curl_cffi_preference(rh, request):
-    return -100
+    # curl multiplexes HTTP/2 streams and reuses the connection of each thread
+    return 200 if request.extensions.get('http2') else -100
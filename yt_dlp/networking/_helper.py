@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import collections
 import contextlib
+import contextvars
 import functools
+import itertools
 import os
+import queue
 import socket
 import ssl
 import sys
+import threading
+import time
 import typing
 import urllib.parse
 import urllib.request
@@ -20,6 +26,28 @@
 
     from ..utils.networking import HTTPHeaderDict
 
+# Timings of the request currently being sent, see NetworkMetrics
+_request_timings = contextvars.ContextVar('_request_timings', default=None)
+
+
+@contextlib.contextmanager
+def _record_timing(phase):
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0) + time.perf_counter() - start
+
+
+class _TimedSSLContext(ssl.SSLContext):
+    def wrap_socket(self, *args, **kwargs):
+        with _record_timing('tls'):
+            return super().wrap_socket(*args, **kwargs)
+
 
 def ssl_load_certs(context: ssl.SSLContext, use_certifi=True):
     if certifi and use_certifi:
@@ -119,7 +147,7 @@ def make_ssl_context(
     legacy_support=False,
     use_certifi=True,
 ):
-    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context = _TimedSSLContext(ssl.PROTOCOL_TLS_CLIENT)
     context.check_hostname = verify
     context.verify_mode = ssl.CERT_REQUIRED if verify else ssl.CERT_NONE
     # OpenSSL 1.1.1+ Python 3.8+ keylog file
@@ -246,18 +274,134 @@ def create_socks_proxy_socket(dest_addr, proxy_args, proxy_ip_addr, timeout, sou
         raise
 
 
+class _DNSCache:
+    """
+    Thread-safe cache of getaddrinfo() results shared by all connections.
+    getaddrinfo() does not expose the record TTLs, so entries are kept for a fixed amount of time
+    """
+    TTL = 60
+    MAX_ENTRIES = 512
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def getaddrinfo(self, host, port, family=0, type=0):
+        key = (host, port, family, type)
+        with self._lock:
+            expires, result = self._entries.get(key, (0, None))
+        if time.monotonic() < expires:
+            return result
+
+        result = socket.getaddrinfo(host, port, family, type)
+        with self._lock:
+            if len(self._entries) >= self.MAX_ENTRIES:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.MAX_ENTRIES:
+                    self._entries.clear()
+            self._entries[key] = (time.monotonic() + self.TTL, result)
+        return result
+
+    def invalidate(self, host, port, family=0, type=0):
+        with self._lock:
+            self._entries.pop((host, port, family, type), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_dns_cache = _DNSCache()
+
+
+def _interleave_addrinfo(ip_addrs):
+    """Alternate between address families, starting with the first one returned (RFC 8305 Section 4)"""
+    by_family = collections.defaultdict(list)
+    for ip_addr in ip_addrs:
+        by_family[ip_addr[0]].append(ip_addr)
+    return [ip_addr for group in itertools.zip_longest(*by_family.values()) for ip_addr in group if ip_addr]
+
+
+def _race_connections(ip_addrs, timeout, source_address, create_socket_func, attempt_delay):
+    """
+    Staggered parallel connection attempts (RFC 8305 Section 5).
+    A new attempt is started each time the previous one fails or does not complete
+    within `attempt_delay` seconds. The first successful connection is returned and
+    any others are closed.
+    """
+    results = queue.Queue()
+    lock = threading.Lock()
+    done = False
+
+    def attempt(ip_addr):
+        try:
+            sock = create_socket_func(ip_addr, timeout, source_address)
+        except Exception as e:
+            results.put((None, e))
+            return
+        with lock:
+            if not done:
+                results.put((sock, None))
+                return
+        sock.close()
+
+    pending_addrs = iter(ip_addrs)
+    remaining = len(ip_addrs)
+    running = 0
+    err = None
+
+    def start_next():
+        nonlocal remaining, running
+        remaining -= 1
+        running += 1
+        threading.Thread(target=attempt, args=(next(pending_addrs),), daemon=True).start()
+
+    start_next()
+    try:
+        while running:
+            try:
+                sock, err = results.get(timeout=attempt_delay if remaining else None)
+            except queue.Empty:
+                start_next()
+                continue
+            running -= 1
+            if sock:
+                return sock
+            if not isinstance(err, OSError):
+                raise err
+            if remaining:
+                start_next()
+        raise err
+    finally:
+        with lock:
+            done = True
+        # Close connections which completed after the winning one but before `done` was set
+        while not results.empty():
+            sock, _ = results.get_nowait()
+            if sock:
+                sock.close()
+        # Explicitly break __traceback__ reference cycle
+        # https://bugs.python.org/issue36820
+        err = None
+
+
 def create_connection(
     address,
     timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
     source_address=None,
     *,
     _create_socket_func=_socket_connect,
+    _attempt_delay=0.25,
 ):
     # Work around socket.create_connection() which tries all addresses from getaddrinfo() including IPv6.
     # This filters the addresses based on the given source_address.
     # Based on: https://github.com/python/cpython/blob/main/Lib/socket.py#L810
+    # Addresses are resolved through a shared DNS cache and, when there are several of them,
+    # connected to with staggered parallel attempts ("Happy Eyeballs", RFC 8305)
     host, port = address
-    ip_addrs = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    with _record_timing('dns'):
+        ip_addrs = _dns_cache.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
     if not ip_addrs:
         raise OSError('getaddrinfo returns an empty list')
     if source_address is not None:
@@ -268,20 +412,13 @@ def create_connection(
                 f'No remote IPv{4 if af == socket.AF_INET else 6} addresses available for connect. '
                 f'Can\'t use "{source_address[0]}" as source address')
 
-    err = None
-    for ip_addr in ip_addrs:
-        try:
-            sock = _create_socket_func(ip_addr, timeout, source_address)
-            # Explicitly break __traceback__ reference cycle
-            # https://bugs.python.org/issue36820
-            err = None
-            return sock
-        except OSError as e:
-            err = e
-
     try:
-        raise err
-    finally:
-        # Explicitly break __traceback__ reference cycle
-        # https://bugs.python.org/issue36820
-        err = None
+        with _record_timing('connect'):
+            if len(ip_addrs) == 1:
+                return _create_socket_func(ip_addrs[0], timeout, source_address)
+            return _race_connections(
+                _interleave_addrinfo(ip_addrs), timeout, source_address, _create_socket_func, _attempt_delay)
+    except OSError:
+        # The cached addresses may be stale
+        _dns_cache.invalidate(host, port, 0, socket.SOCK_STREAM)
+        raise
@@ -163,6 +163,14 @@ def read(self, amt: int | None = None):
             # catch-all for any other urllib3 response exceptions
             raise TransportError(cause=e) from e
 
+    def readinto(self, buffer):
+        # urllib3's readinto() does not decode the content
+        return self._readinto_from_read(buffer)
+
+    @property
+    def wire_bytes(self):
+        return self.fp.tell()
+
 
 class RequestsHTTPAdapter(requests.adapters.HTTPAdapter):
     def __init__(self, ssl_context=None, proxy_ssl_context=None, source_address=None, **kwargs):
@@ -296,12 +304,13 @@ def _check_extensions(self, extensions):
         extensions.pop('cookiejar', None)
         extensions.pop('timeout', None)
         extensions.pop('legacy_ssl', None)
+        extensions.pop('source_address', None)
 
-    def _create_instance(self, cookiejar, legacy_ssl_support=None):
+    def _create_instance(self, cookiejar, legacy_ssl_support=None, source_address=None):
         session = RequestsSession()
         http_adapter = RequestsHTTPAdapter(
             ssl_context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
-            source_address=self.source_address,
+            source_address=source_address,
             max_retries=urllib3.util.retry.Retry(False),
         )
         session.adapters.clear()
@@ -322,6 +331,7 @@ def _send(self, request):
         session = self._get_instance(
             cookiejar=self._get_cookiejar(request),
             legacy_ssl_support=request.extensions.get('legacy_ssl'),
+            source_address=self._get_source_address(request),
         )
 
         try:
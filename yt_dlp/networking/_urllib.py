@@ -51,6 +51,124 @@
     CONTENT_DECODE_ERRORS.append(brotli.error)
 
 
+class _ZlibDecoder:
+    def __init__(self, wbits):
+        self._decoder = zlib.decompressobj(wbits)
+        self._started = False
+
+    def decompress(self, data):
+        self._started = True
+        return self._decoder.decompress(data)
+
+    def flush(self):
+        data = self._decoder.flush()
+        if self._started and not self._decoder.eof:
+            raise zlib.error('incomplete or truncated stream')
+        return data
+
+
+class _DeflateDecoder(_ZlibDecoder):
+    """Decoder for deflate content, which servers send either raw or with a zlib header"""
+
+    def __init__(self):
+        self._decoder = None
+        self._header = b''
+
+    def decompress(self, data):
+        if self._decoder:
+            return super().decompress(data)
+        self._header += data
+        if len(self._header) < 2:
+            return b''
+        # zlib header: CM=8 (deflate) in the low bits of the first byte, and a multiple of 31
+        is_zlib = self._header[0] & 0x0f == 8 and (self._header[0] << 8 | self._header[1]) % 31 == 0
+        super().__init__(zlib.MAX_WBITS if is_zlib else -zlib.MAX_WBITS)
+        return super().decompress(self._header)
+
+    def flush(self):
+        if not self._decoder:
+            if self._header:
+                raise zlib.error('incomplete or truncated stream')
+            return b''
+        return super().flush()
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._decoder = brotli.Decompressor()
+
+    def decompress(self, data):
+        return self._decoder.process(data)
+
+    def flush(self):
+        return b''
+
+
+class ContentDecodingReader(io.RawIOBase):
+    """
+    Reader that incrementally decodes a content-encoded response as it is read
+
+    @param fp: Original, file-like, response.
+    @param encodings: Content encodings to decode, in the order to decode them.
+
+    wire_bytes is the number of bytes read from fp, and bytes_read the number of decoded bytes returned.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    _DECODERS = {
+        # There may be junk added the end of the file
+        # We ignore it by only ever decoding a single gzip payload
+        'gzip': functools.partial(_ZlibDecoder, zlib.MAX_WBITS | 16),
+        'deflate': _DeflateDecoder,
+        'br': _BrotliDecoder,
+    }
+
+    def __init__(self, fp, encodings):
+        self.fp = fp
+        self._decoders = [self._DECODERS[encoding]() for encoding in encodings]
+        self._buffer = bytearray()
+        self._eof = False
+        self.wire_bytes = 0
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def _decode(self, data):
+        for decoder in self._decoders:
+            data = decoder.decompress(data) if data else b''
+            if self._eof:
+                data += decoder.flush()
+        return data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = float('inf')
+        while not self._eof and len(self._buffer) < size:
+            data = self.fp.read(self.CHUNK_SIZE)
+            self.wire_bytes += len(data)
+            self._eof = not data
+            self._buffer += self._decode(data)
+
+        if size >= len(self._buffer):
+            data, self._buffer = bytes(self._buffer), bytearray()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.fp.close()
+        self._buffer = bytearray()
+        super().close()
+
+
 def _create_http_connection(http_class, source_address, *args, **kwargs):
     hc = http_class(*args, **kwargs)
 
@@ -103,29 +221,6 @@ def https_open(self, req):
                 _create_http_connection, conn_class, self._source_address),
             req, context=self._context)
 
-    @staticmethod
-    def deflate(data):
-        if not data:
-            return data
-        try:
-            return zlib.decompress(data, -zlib.MAX_WBITS)
-        except zlib.error:
-            return zlib.decompress(data)
-
-    @staticmethod
-    def brotli(data):
-        if not data:
-            return data
-        return brotli.decompress(data)
-
-    @staticmethod
-    def gz(data):
-        # There may be junk added the end of the file
-        # We ignore it by only ever decoding a single gzip payload
-        if not data:
-            return data
-        return zlib.decompress(data, wbits=zlib.MAX_WBITS | 16)
-
     def http_request(self, req):
         # According to RFC 3986, URLs can not contain non-ASCII characters, however this is not
         # always respected by websites, some tend to give out URLs with non percent-encoded
@@ -150,17 +245,14 @@ def http_response(self, req, resp):
         # Content-Encoding header lists the encodings in order that they were applied [1].
         # To decompress, we simply do the reverse.
         # [1]: https://datatracker.ietf.org/doc/html/rfc9110#name-content-encoding
-        decoded_response = None
-        for encoding in (e.strip() for e in reversed(resp.headers.get('Content-encoding', '').split(','))):
-            if encoding == 'gzip':
-                decoded_response = self.gz(decoded_response or resp.read())
-            elif encoding == 'deflate':
-                decoded_response = self.deflate(decoded_response or resp.read())
-            elif encoding == 'br' and brotli:
-                decoded_response = self.brotli(decoded_response or resp.read())
-
-        if decoded_response is not None:
-            resp = urllib.request.addinfourl(io.BytesIO(decoded_response), old_resp.headers, old_resp.url, old_resp.code)
+        # The body is decoded as it is read, see ContentDecodingReader
+        encodings = [
+            encoding for encoding in (e.strip() for e in reversed(resp.headers.get('Content-encoding', '').split(',')))
+            if encoding in SUPPORTED_ENCODINGS]
+
+        if encodings:
+            resp = urllib.request.addinfourl(
+                ContentDecodingReader(old_resp, encodings), old_resp.headers, old_resp.url, old_resp.code)
             resp.msg = old_resp.msg
         # Percent-encode redirect URL of Location HTTP header to satisfy RFC 3986 (see
         # https://github.com/ytdl-org/youtube-dl/issues/6457).
@@ -312,6 +404,18 @@ def read(self, amt=None):
             handle_response_read_exceptions(e)
             raise e
 
+    def readinto(self, buffer):
+        try:
+            return self.fp.readinto(buffer)
+        except Exception as e:
+            handle_response_read_exceptions(e)
+            raise e
+
+    @property
+    def wire_bytes(self):
+        reader = getattr(self.fp, 'fp', None)
+        return reader.wire_bytes if isinstance(reader, ContentDecodingReader) else None
+
 
 def handle_sslerror(e: ssl.SSLError):
     if not isinstance(e, ssl.SSLError):
@@ -349,15 +453,16 @@ def _check_extensions(self, extensions):
         extensions.pop('cookiejar', None)
         extensions.pop('timeout', None)
         extensions.pop('legacy_ssl', None)
+        extensions.pop('source_address', None)
 
-    def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None):
+    def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None, source_address=None):
         opener = urllib.request.OpenerDirector()
         handlers = [
             ProxyHandler(proxies),
             HTTPHandler(
                 debuglevel=int(bool(self.verbose)),
                 context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
-                source_address=self.source_address),
+                source_address=source_address),
             HTTPCookieProcessor(cookiejar),
             DataHandler(),
             UnknownHandler(),
@@ -393,6 +498,7 @@ def _send(self, request):
             proxies=self._get_proxies(request),
             cookiejar=self._get_cookiejar(request),
             legacy_ssl_support=request.extensions.get('legacy_ssl'),
+            source_address=self._get_source_address(request),
         )
         try:
             res = opener.open(urllib_req, timeout=self._calculate_timeout(request))
@@ -119,6 +119,7 @@ def _check_extensions(self, extensions):
         extensions.pop('timeout', None)
         extensions.pop('cookiejar', None)
         extensions.pop('legacy_ssl', None)
+        extensions.pop('source_address', None)
 
     def close(self):
         # Remove the logging handler that contains a reference to our logger
@@ -136,8 +137,9 @@ def _send(self, request):
                 headers['cookie'] = cookie_header
 
         wsuri = parse_uri(request.url)
+        source_address = self._get_source_address(request)
         create_conn_kwargs = {
-            'source_address': (self.source_address, 0) if self.source_address else None,
+            'source_address': (source_address, 0) if source_address else None,
             'timeout': timeout,
         }
         proxy = select_proxy(request.url, self._get_proxies(request))
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
 import abc
+import collections
+import concurrent.futures
+import contextlib
 import copy
+import email.utils
 import enum
 import functools
+import hashlib
 import io
+import json
+import os
+import random
+import threading
+import time
 import typing
 import urllib.parse
 import urllib.request
@@ -13,8 +23,9 @@
 from email.message import Message
 from http import HTTPStatus
 
-from ._helper import make_ssl_context, wrap_request_errors
+from ._helper import _request_timings, make_ssl_context, wrap_request_errors
 from .exceptions import (
+    HTTPError,
     NoSupportingHandlers,
     RequestError,
     TransportError,
@@ -28,6 +39,7 @@
     deprecation_warning,
     error_to_str,
     update_url_query,
+    write_json_file,
 )
 from ..utils.networking import HTTPHeaderDict, normalize_url
 
@@ -48,6 +60,514 @@ def inner(handler, *args, **kwargs):
     return outer
 
 
+class NetworkMetrics:
+    """NetworkMetrics class
+
+    Collects the timings of the requests sent through a RequestDirector.
+
+    Every request is recorded as a dict with the following keys:
+    - `url`, `host`, `method`, `handler` (RH_KEY of the handler that sent it)
+    - `status`: HTTP status of the response, if any
+    - `error`: Error raised while sending the request, if any
+    - `start`: Unix timestamp at which the request was sent
+    - `dns`, `connect`, `tls`: Time spent resolving the host, connecting and in the TLS handshake.
+        Only present if the handler opened a new connection for the request
+    - `ttfb`: Time until the response headers were received (includes the above)
+    - `transfer`: Time from receiving the response headers until the response was closed
+
+    All times are in seconds. Functions in `hooks` are called with each record
+    once the response headers have been received.
+
+    @param max_requests: Maximum number of request records to keep. The aggregated
+                         statistics in `summary()` always cover all requests.
+    """
+
+    PHASES = ('dns', 'connect', 'tls', 'ttfb', 'transfer')
+
+    def __init__(self, max_requests=None):
+        self.requests = collections.deque(maxlen=max_requests)
+        self.hooks = []
+        self._summary = {}
+        self._lock = threading.Lock()
+
+    def _get_stats(self, record):
+        return self._summary.setdefault(record['host'], {}).setdefault(record['handler'], {
+            'requests': 0,
+            'errors': 0,
+            **{phase: {'count': 0, 'total': 0, 'max': 0} for phase in self.PHASES},
+        })
+
+    def _add_timing(self, stats, phase, duration):
+        stats[phase]['count'] += 1
+        stats[phase]['total'] += duration
+        stats[phase]['max'] = max(stats[phase]['max'], duration)
+
+    def _add_request(self, record):
+        with self._lock:
+            self.requests.append(record)
+            stats = self._get_stats(record)
+            stats['requests'] += 1
+            if record['error']:
+                stats['errors'] += 1
+            for phase in self.PHASES:
+                if phase in record:
+                    self._add_timing(stats, phase, record[phase])
+        for hook in self.hooks:
+            hook(record)
+
+    def _add_transfer(self, record, headers_received):
+        with self._lock:
+            record['transfer'] = time.perf_counter() - headers_received
+            self._add_timing(self._get_stats(record), 'transfer', record['transfer'])
+
+    @contextlib.contextmanager
+    def measure(self, request, handler):
+        """Record the request sent by the handler within this context"""
+        record = {
+            'url': request.url,
+            'host': urllib.parse.urlparse(request.url).hostname,
+            'method': request.method,
+            'handler': handler.RH_KEY,
+            'status': None,
+            'error': None,
+            'start': time.time(),
+        }
+        token = _request_timings.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = error_to_str(e)
+            if isinstance(e, HTTPError):
+                record['status'] = e.status
+            raise
+        finally:
+            record['ttfb'] = time.perf_counter() - start
+            _request_timings.reset(token)
+            self._add_request(record)
+
+    def summary(self):
+        """Aggregated statistics in the form of {host: {handler: stats}}"""
+        with self._lock:
+            return copy.deepcopy(self._summary)
+
+    def to_json(self):
+        with self._lock:
+            requests = list(map(dict, self.requests))
+        return {'summary': self.summary(), 'requests': requests}
+
+    def dump(self, filename):
+        write_json_file(self.to_json(), filename)
+
+
+class _TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount, now, factor=1):
+        """Take `amount` tokens, going into debt if needed. Returns the seconds to wait for them"""
+        rate = self.rate * factor
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= amount
+        return max(0, -self.tokens / rate)
+
+
+class RateLimiter:
+    """RateLimiter class
+
+    Thread-safe per-host token-bucket rate limiter for a RequestDirector.
+
+    Requests to a host are paced to `requests_per_second` with up to `burst` requests
+    sent at once, and the bytes read from its responses to `bytes_per_second`.
+    When a host responds with 429 or 503, no requests are sent to it until the time
+    given in Retry-After (at most `max_retry_after` seconds) has passed, and its request
+    rate is halved. The rate is restored gradually with every successful response.
+
+    The reserve_* methods only do the accounting and return the number of seconds
+    the caller should sleep before going ahead.
+    """
+
+    MIN_RATE_FACTOR = 1 / 16
+    RATE_RECOVERY = 1 / 16
+
+    def __init__(self, requests_per_second=None, bytes_per_second=None, burst=1, max_retry_after=300):
+        self.requests_per_second = requests_per_second
+        self.bytes_per_second = bytes_per_second
+        self.burst = burst
+        self.max_retry_after = max_retry_after
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _get_host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {
+                'requests': self.requests_per_second and _TokenBucket(self.requests_per_second, self.burst),
+                'bytes': self.bytes_per_second and _TokenBucket(self.bytes_per_second, self.bytes_per_second),
+                'blocked_until': 0,
+                'rate_factor': 1,
+            }
+        return state
+
+    def reserve_request(self, host):
+        with self._lock:
+            state, now = self._get_host(host), time.monotonic()
+            delay = max(0, state['blocked_until'] - now)
+            if state['requests']:
+                delay = max(delay, state['requests'].reserve(1, now, state['rate_factor']))
+            return delay
+
+    def reserve_bytes(self, host, amount):
+        if not self.bytes_per_second or not amount:
+            return 0
+        with self._lock:
+            return self._get_host(host)['bytes'].reserve(amount, time.monotonic())
+
+    def report_response(self, host, status, headers=None):
+        """@returns the Retry-After of the response in seconds, if it was capped to max_retry_after"""
+        with self._lock:
+            state = self._get_host(host)
+            if status not in (429, 503):
+                state['rate_factor'] = min(1, state['rate_factor'] + self.RATE_RECOVERY)
+                return None
+            state['rate_factor'] = max(self.MIN_RATE_FACTOR, state['rate_factor'] / 2)
+            retry_after = self._parse_retry_after((headers or {}).get('Retry-After'))
+            if not retry_after or retry_after <= 0:
+                return None
+            capped = retry_after > self.max_retry_after
+            state['blocked_until'] = max(
+                state['blocked_until'], time.monotonic() + min(retry_after, self.max_retry_after))
+            return retry_after if capped else None
+
+    @staticmethod
+    def _parse_retry_after(value):
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdecimal():
+            return int(value)
+        with contextlib.suppress(TypeError, ValueError):
+            return email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        return None
+
+
+class HTTPCache:
+    """HTTPCache class
+
+    On-disk cache for the responses to cacheable requests sent through a RequestDirector.
+    Only GET requests with the `cache` extension set are cacheable.
+
+    Responses are stored unless marked no-store, if they have an ETag or Last-Modified
+    header or are fresh according to Cache-Control max-age or Expires. Fresh responses
+    are served from the cache without sending the request. Otherwise, a conditional
+    request is sent and the cached response is used if the server responds with 304.
+    The response extension `http_cache` is set to "hit" or "revalidated" for cached responses.
+
+    @param directory: Directory to store the responses in.
+    """
+
+    _VERSION = 1
+    _IGNORED_HEADERS = (
+        'Connection', 'Keep-Alive', 'Transfer-Encoding', 'Content-Encoding', 'Content-Length', 'Set-Cookie')
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def is_cacheable(request):
+        return bool(request.extensions.get('cache')) and request.method == 'GET' and request.data is None
+
+    def _get_filename(self, request):
+        return os.path.join(self.directory, hashlib.sha256(request.url.encode()).hexdigest())
+
+    @staticmethod
+    def _parse_cache_control(value):
+        directives = {}
+        for directive in (value or '').split(','):
+            name, _, arg = directive.partition('=')
+            if name.strip():
+                directives[name.strip().lower()] = arg.strip().strip('"')
+        return directives
+
+    @staticmethod
+    def _parse_http_date(value):
+        with contextlib.suppress(TypeError, ValueError):
+            return email.utils.parsedate_to_datetime(value).timestamp()
+        return None
+
+    def _get_expiry(self, headers, cache_control):
+        now = time.time()
+        if 'no-cache' in cache_control:
+            return 0
+        with contextlib.suppress(ValueError):
+            if 'max-age' in cache_control:
+                return now + int(cache_control['max-age']) - int(headers.get('Age') or 0)
+        expires = self._parse_http_date(headers.get('Expires'))
+        if expires is None:
+            return 0
+        # Use the server's clock for the lifetime
+        return now + expires - (self._parse_http_date(headers.get('Date')) or now)
+
+    def _load(self, request):
+        try:
+            with open(self._get_filename(request), 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get('version') != self._VERSION or meta.get('url') != request.url:
+            return None, None
+        if any(request.headers.get(name) != value for name, value in meta['vary'].items()):
+            return None, None
+        meta['headers'] = HTTPHeaderDict(meta['headers'])
+        return meta, body
+
+    def _store(self, request, meta, headers, body):
+        filename = self._get_filename(request)
+        cache_control = self._parse_cache_control(headers.get('Cache-Control'))
+        vary = [name.strip() for name in (headers.get('Vary') or '').split(',') if name.strip()]
+        expires = self._get_expiry(headers, cache_control)
+        if 'no-store' in cache_control or '*' in vary or not (
+                headers.get('ETag') or headers.get('Last-Modified') or expires > time.time()):
+            with contextlib.suppress(OSError):
+                os.remove(filename)
+            return None
+        meta = {
+            **meta,
+            'version': self._VERSION,
+            'url': request.url,
+            'headers': {name: value for name, value in headers.items() if name not in self._IGNORED_HEADERS},
+            'vary': {name: request.headers.get(name) for name in vary},
+            'expires': expires,
+        }
+        tmp_filename = f'{filename}.{os.getpid()}.{threading.get_ident()}.part'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_filename, 'wb') as f:
+                f.write(json.dumps(meta).encode() + b'\n')
+                f.write(body)
+            os.replace(tmp_filename, filename)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_filename)
+        return meta
+
+    @staticmethod
+    def _make_response(meta, body, status):
+        return Response(
+            fp=io.BytesIO(body), url=meta['response_url'], headers=meta['headers'],
+            status=meta['status'], extensions={'http_cache': status} if status else None)
+
+    def send(self, request, send_func):
+        """Return a response to the request from the cache, or by sending it with send_func"""
+        meta, body = self._load(request)
+        request_cache_control = self._parse_cache_control(request.headers.get('Cache-Control'))
+        if meta and 'no-cache' not in request_cache_control and time.time() < meta['expires']:
+            return self._make_response(meta, body, 'hit')
+
+        if meta:
+            request = request.copy()
+            if meta['headers'].get('ETag'):
+                request.headers.setdefault('If-None-Match', meta['headers']['ETag'])
+            if meta['headers'].get('Last-Modified'):
+                request.headers.setdefault('If-Modified-Since', meta['headers']['Last-Modified'])
+        try:
+            response = send_func(request)
+        except HTTPError as e:
+            if not meta or e.status != 304:
+                raise
+            e.response.close()
+            headers = HTTPHeaderDict(meta['headers'], dict(e.response.headers.items()))
+            meta = self._store(request, meta, headers, body) or meta
+            return self._make_response(meta, body, 'revalidated')
+
+        with response:
+            body = response.read()
+        headers = HTTPHeaderDict(dict(response.headers.items()))
+        meta = {'response_url': response.url, 'status': response.status}
+        return self._make_response(self._store(request, meta, headers, body) or {
+            **meta, 'headers': headers}, body, None)
+
+
+class SourceAddressPool:
+    """SourceAddressPool class
+
+    Spreads requests over several client-side IP addresses with smooth weighted round-robin.
+    Each address is weighed by its measured throughput, as reported with report().
+    Addresses that have not been measured yet are weighed by the average of the others.
+
+    @param addresses: Client-side IP addresses to bind to.
+    """
+
+    # Keep probing slow addresses in case their throughput recovers
+    MIN_WEIGHT_RATIO = 1 / 20
+    # Weight of the latest measurement in the throughput average
+    SMOOTHING = 0.3
+
+    def __init__(self, addresses):
+        self.addresses = list(addresses)
+        self._throughput = {}
+        self._current = dict.fromkeys(self.addresses, 0)
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the address to bind the next request to"""
+        with self._lock:
+            default = sum(self._throughput.values()) / len(self._throughput) if self._throughput else 1
+            weights = {address: self._throughput.get(address, default) for address in self.addresses}
+            min_weight = (max(weights.values()) or 1) * self.MIN_WEIGHT_RATIO
+            weights = {address: max(weight, min_weight) for address, weight in weights.items()}
+            for address, weight in weights.items():
+                self._current[address] += weight
+            address = max(self.addresses, key=self._current.__getitem__)
+            self._current[address] -= sum(weights.values())
+            return address
+
+    def report(self, address, size, elapsed):
+        """Record that `size` bytes were received through the address in `elapsed` seconds"""
+        if address not in self._current or elapsed <= 0:
+            return
+        throughput = size / elapsed
+        with self._lock:
+            previous = self._throughput.get(address)
+            self._throughput[address] = throughput if previous is None else (
+                previous + (throughput - previous) * self.SMOOTHING)
+
+
+class ProxyPool:
+    """ProxyPool class
+
+    Pool of proxies for a RequestDirector to send the requests without proxies of their own through.
+
+    Each request is sent through a healthy proxy, chosen at random weighted by the inverse
+    of its measured latency. Requests with the same `proxy_pool_key` extension stick to the
+    same proxy while it stays healthy, e.g. the fragments of a download.
+    If a GET or HEAD request fails with a TransportError, it is retried with the next proxy.
+
+    A proxy is ejected from the pool after `max_failures` consecutive failed requests.
+    If `check_url` is given, ejected proxies are checked every `check_interval` seconds by
+    requesting it through them in a background thread, and reinstated if the check succeeds.
+    Otherwise, an ejected proxy is given another try after `check_interval` seconds.
+    If all the proxies are ejected, the one that was ejected first is used.
+
+    @param proxies: List of proxy URLs.
+    @param check_url: URL to request when checking the health of the ejected proxies.
+    @param check_interval: Number of seconds between health checks of an ejected proxy.
+    @param max_failures: Number of consecutive failures after which a proxy is ejected.
+    """
+
+    MAX_KEYS = 1024
+
+    def __init__(self, proxies, check_url=None, check_interval=60, max_failures=3):
+        self.proxies = list(proxies)
+        self.check_url = check_url
+        self.check_interval = check_interval
+        self.max_failures = max_failures
+        self._latency = {}
+        self._failures = dict.fromkeys(self.proxies, 0)
+        self._ejected = {}
+        self._assignments = {}
+        self._lock = threading.Lock()
+        self._checker = None
+        self._stop_checks = threading.Event()
+
+    def healthy_proxies(self):
+        with self._lock:
+            return [proxy for proxy in self.proxies if proxy not in self._ejected]
+
+    def _is_available(self, proxy, now):
+        ejected_at = self._ejected.get(proxy)
+        # Without health checks, ejected proxies get another try after check_interval
+        return ejected_at is None or (not self.check_url and now - ejected_at >= self.check_interval)
+
+    def select(self, key=None, exclude=()):
+        """Return the proxy to send the next request (with the proxy_pool_key `key`) through"""
+        with self._lock:
+            now = time.monotonic()
+            assigned = self._assignments.get(key)
+            if assigned and assigned not in exclude and assigned not in self._ejected:
+                return assigned
+
+            candidates = [
+                proxy for proxy in self.proxies if proxy not in exclude and self._is_available(proxy, now)]
+            if candidates:
+                default = sum(self._latency.values()) / len(self._latency) if self._latency else 1
+                proxy = random.choices(
+                    candidates, [1 / max(self._latency.get(proxy, default), 0.001) for proxy in candidates])[0]
+            else:
+                proxy = min(
+                    (proxy for proxy in self.proxies if proxy not in exclude),
+                    key=lambda proxy: self._ejected.get(proxy, now), default=None)
+
+            if key is not None and proxy:
+                if len(self._assignments) >= self.MAX_KEYS:
+                    self._assignments.clear()
+                self._assignments[key] = proxy
+            return proxy
+
+    def report_success(self, proxy, latency):
+        with self._lock:
+            previous = self._latency.get(proxy)
+            self._latency[proxy] = latency if previous is None else (previous + latency) / 2
+            self._failures[proxy] = 0
+            self._ejected.pop(proxy, None)
+
+    def report_failure(self, proxy):
+        with self._lock:
+            self._failures[proxy] = self._failures.get(proxy, 0) + 1
+            if self._failures[proxy] >= self.max_failures or proxy in self._ejected:
+                self._ejected[proxy] = time.monotonic()
+
+    def _check_ejected(self, send_func):
+        while not self._stop_checks.wait(self.check_interval):
+            with self._lock:
+                ejected = list(self._ejected)
+            for proxy in ejected:
+                start = time.monotonic()
+                try:
+                    send_func(Request(
+                        self.check_url, proxies={'all': proxy}, extensions={'timeout': 10})).close()
+                except RequestError:
+                    self.report_failure(proxy)
+                else:
+                    self.report_success(proxy, time.monotonic() - start)
+
+    def send(self, request, send_func):
+        """Send the request with send_func through the proxies in the pool"""
+        if self.check_url and not self._checker:
+            self._checker = threading.Thread(
+                target=self._check_ejected, args=(send_func,), name='ProxyPool', daemon=True)
+            self._checker.start()
+
+        key = request.extensions.get('proxy_pool_key')
+        tried = []
+        while True:
+            proxy = self.select(key, exclude=tried)
+            tried.append(proxy)
+            proxied_request = request.copy()
+            proxied_request.proxies = {'all': proxy}
+            start = time.monotonic()
+            try:
+                response = send_func(proxied_request)
+            except HTTPError:
+                self.report_success(proxy, time.monotonic() - start)
+                raise
+            except TransportError:
+                self.report_failure(proxy)
+                if len(tried) >= len(self.proxies) or request.method not in ('GET', 'HEAD'):
+                    raise
+                continue
+            self.report_success(proxy, time.monotonic() - start)
+            return response
+
+    def close(self):
+        self._stop_checks.set()
+
+
 class RequestDirector:
     """RequestDirector class
 
@@ -59,18 +579,28 @@ class RequestDirector:
 
     @param logger: Logger instance.
     @param verbose: Print debug request information to stdout.
+    @param metrics: NetworkMetrics instance to record the timings of the requests in.
+    @param rate_limiter: RateLimiter instance to pace the requests and responses with.
+    @param http_cache: HTTPCache instance to cache the responses to cacheable requests in.
+    @param proxy_pool: ProxyPool instance to send the requests without proxies of their own through.
     """
 
-    def __init__(self, logger, verbose=False):
+    def __init__(self, logger, verbose=False, metrics=None, rate_limiter=None, http_cache=None, proxy_pool=None):
         self.handlers: dict[str, RequestHandler] = {}
         self.preferences: set[Preference] = set()
         self.logger = logger  # TODO(Grub4k): default logger
         self.verbose = verbose
+        self.metrics: NetworkMetrics | None = metrics
+        self.rate_limiter: RateLimiter | None = rate_limiter
+        self.http_cache: HTTPCache | None = http_cache
+        self.proxy_pool: ProxyPool | None = proxy_pool
 
     def close(self):
         for handler in self.handlers.values():
             handler.close()
         self.handlers.clear()
+        if self.proxy_pool:
+            self.proxy_pool.close()
 
     def add_handler(self, handler: RequestHandler):
         """Add a handler. If a handler of the same RH_KEY exists, it will overwrite it"""
@@ -100,6 +630,17 @@ def send(self, request: Request) -> Response:
 
         assert isinstance(request, Request)
 
+        if self.http_cache and self.http_cache.is_cacheable(request):
+            response = self.http_cache.send(request, self._send_to_handler)
+            if response.extensions.get('http_cache'):
+                self._print_verbose(f'Using cached response for {request.url} ({response.extensions["http_cache"]})')
+            return response
+        return self._send_to_handler(request)
+
+    def _send_to_handler(self, request: Request) -> Response:
+        if self.proxy_pool and not request.proxies:
+            return self.proxy_pool.send(request, self._send_to_handler)
+
         unexpected_errors = []
         unsupported_errors = []
         for handler in self._get_handlers(request):
@@ -114,7 +655,7 @@ def send(self, request: Request) -> Response:
 
             self._print_verbose(f'Sending request via "{handler.RH_NAME}"')
             try:
-                response = handler.send(request)
+                response = self._rate_limited_send(handler, request)
             except RequestError:
                 raise
             except Exception as e:
@@ -129,6 +670,88 @@ def send(self, request: Request) -> Response:
 
         raise NoSupportingHandlers(unsupported_errors, unexpected_errors)
 
+    def send_many(self, requests: Iterable[Request], max_workers=4) -> list[concurrent.futures.Future]:
+        """
+        Passes the requests onto suitable RequestHandlers concurrently
+
+        @param max_workers: Maximum number of requests to send at the same time (default 4).
+        @returns: A concurrent.futures.Future for each request, in order.
+                  Its result is the Response, or the error raised by send()
+        """
+        requests = list(requests)
+        if not requests:
+            return []
+        executor = concurrent.futures.ThreadPoolExecutor(
+            min(max_workers or 4, len(requests)), thread_name_prefix='RequestDirector')
+        try:
+            return [executor.submit(self.send, request) for request in requests]
+        finally:
+            executor.shutdown(wait=False)
+
+    def _report_rate_limited_response(self, host, status, headers):
+        retry_after = self.rate_limiter.report_response(host, status, headers)
+        if retry_after is not None:
+            self.logger.warning(
+                f'{host} asked to wait {retry_after:.0f} seconds before retrying; '
+                f'waiting only {self.rate_limiter.max_retry_after} seconds')
+
+    def _rate_limited_send(self, handler, request):
+        if not self.rate_limiter:
+            return self._send(handler, request)
+
+        host = urllib.parse.urlparse(request.url).hostname
+        delay = self.rate_limiter.reserve_request(host)
+        if delay > 0:
+            self._print_verbose(f'Rate limiting requests to {host}: sleeping {delay:.2f} seconds')
+            time.sleep(delay)
+        try:
+            response = self._send(handler, request)
+        except HTTPError as e:
+            self._report_rate_limited_response(host, e.status, e.response.headers)
+            raise
+        self._report_rate_limited_response(host, response.status, response.headers)
+
+        if self.rate_limiter.bytes_per_second and isinstance(response, Response):
+            read, readinto = response.read, response.readinto
+            # readinto() of some responses falls back to read(); the bytes must only be counted once
+            in_readinto = False
+
+            def reserve_bytes(size):
+                delay = self.rate_limiter.reserve_bytes(host, size)
+                if delay > 0:
+                    time.sleep(delay)
+
+            def rate_limited_read(amt=None):
+                data = read(amt)
+                if not in_readinto:
+                    reserve_bytes(len(data))
+                return data
+
+            def rate_limited_readinto(buffer):
+                nonlocal in_readinto
+                in_readinto = True
+                try:
+                    size = readinto(buffer)
+                finally:
+                    in_readinto = False
+                reserve_bytes(size)
+                return size
+
+            response.read = rate_limited_read
+            response.readinto = rate_limited_readinto
+        return response
+
+    def _send(self, handler, request):
+        if not self.metrics:
+            return handler.send(request)
+
+        with self.metrics.measure(request, handler) as record:
+            response = handler.send(request)
+            record['status'] = getattr(response, 'status', None)
+        if isinstance(response, Response):
+            response._on_close = functools.partial(self.metrics._add_transfer, record, time.perf_counter())
+        return response
+
 
 _REQUEST_HANDLERS = {}
 
@@ -206,8 +829,14 @@ class RequestHandler(abc.ABC):
     - `cookiejar`: Cookiejar to use for this request.
     - `timeout`: socket timeout to use for this request.
     - `legacy_ssl`: Enable legacy SSL options for this request. See legacy_ssl_support.
+    - `source_address`: Client-side IP address to bind to for this request. See source_address.
     To enable these, add extensions.pop('<extension>', None) to _check_extensions
 
+    The following extensions are handled by the RequestDirector and accepted by all RequestHandlers:
+    - `cache`: Whether the response may be cached. See HTTPCache.
+    - `proxy_pool_key`: Requests with the same key are sent through the same proxy. See ProxyPool.
+    - `http2`: Prefer a handler that negotiates HTTP/2 and keeps the connection open for further requests.
+
     Apart from the url protocol, proxies dict may contain the following keys:
     - `all`: proxy to use for all protocols. Used as a fallback if no proxy is set for a specific protocol.
     - `no`: comma seperated list of hostnames (optionally with port) to not use a proxy for.
@@ -269,6 +898,9 @@ def _get_cookiejar(self, request):
     def _get_proxies(self, request):
         return (request.proxies or self.proxies).copy()
 
+    def _get_source_address(self, request):
+        return request.extensions.get('source_address') or self.source_address
+
     def _check_url_scheme(self, request: Request):
         scheme = urllib.parse.urlparse(request.url).scheme.lower()
         if self._SUPPORTED_URL_SCHEMES is not None and scheme not in self._SUPPORTED_URL_SCHEMES:
@@ -317,6 +949,12 @@ def _check_extensions(self, extensions):
         assert isinstance(extensions.get('cookiejar'), (YoutubeDLCookieJar, NoneType))
         assert isinstance(extensions.get('timeout'), (float, int, NoneType))
         assert isinstance(extensions.get('legacy_ssl'), (bool, NoneType))
+        assert isinstance(extensions.get('source_address'), (str, NoneType))
+        assert isinstance(extensions.get('cache'), (bool, NoneType))
+        assert isinstance(extensions.get('http2'), (bool, NoneType))
+        extensions.pop('cache', None)
+        extensions.pop('proxy_pool_key', None)
+        extensions.pop('http2', None)
 
     def _validate(self, request):
         self._check_url_scheme(request)
@@ -538,10 +1176,37 @@ def read(self, amt: int | None = None) -> bytes:
         except Exception as e:
             raise TransportError(cause=e) from e
 
+    def readinto(self, buffer) -> int:
+        """Read up to len(buffer) bytes into the pre-allocated, writable buffer and return the number of bytes read"""
+        # Expected errors raised here should be of type RequestError or subclasses.
+        # Falls back to read() if the original response can not read into a buffer itself.
+        # Subclasses that redefine read() should redefine this method with the same error handling
+        if not callable(getattr(self.fp, 'readinto', None)):
+            return self._readinto_from_read(buffer)
+        try:
+            return self.fp.readinto(buffer)
+        except Exception as e:
+            raise TransportError(cause=e) from e
+
+    def _readinto_from_read(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    _on_close = None
+
     def close(self):
+        on_close, self._on_close = self._on_close, None
+        if on_close:
+            on_close()
         self.fp.close()
         return super().close()
 
+    @property
+    def wire_bytes(self) -> int | None:
+        """Number of bytes of the body received so far, before any content decoding. None if unknown"""
+        return None
+
     def get_header(self, name, default=None):
         """Get header for name.
         If there are multiple matching headers, return all seperated by comma."""
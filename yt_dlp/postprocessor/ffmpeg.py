@@ -9,6 +9,7 @@
 import time
 
 from .common import PostProcessor
+from .. import webvtt
 from ..compat import imghdr
 from ..utils import (
     MEDIA_EXTENSIONS,
@@ -29,7 +30,9 @@
     prepend_extension,
     replace_extension,
     shell_quote,
+    timetuple_from_msec,
     traverse_obj,
+    unescapeHTML,
     variadic,
     write_json_file,
 )
@@ -803,7 +806,8 @@ def _get_infojson_opts(self, info, infofn):
             if not self._downloader._ensure_dir_exists(infofn):
                 return
             self.write_debug(f'Writing info-json to: {infofn}')
-            write_json_file(self._downloader.sanitize_info(info, self.get_param('clean_infojson', True)), infofn)
+            write_json_file(info, infofn, cls=self._downloader.InfoJSONEncoder,
+                            remove_private_keys=self.get_param('clean_infojson', True))
             info['infojson_filename'] = infofn
 
         old_stream, new_stream = self.get_stream_number(info['filepath'], ('tags', 'mimetype'), 'application/json')
@@ -949,6 +953,23 @@ class FFmpegFixupDuplicateMoovPP(FFmpegCopyStreamPP):
 class FFmpegSubtitlesConvertorPP(FFmpegPostProcessor):
     SUPPORTED_EXTS = MEDIA_EXTENSIONS.subtitles
 
+    _ASS_HEADER = '''[Script Info]
+ScriptType: v4.00+
+PlayResX: 384
+PlayResY: 288
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,16,&Hffffff,&Hffffff,&H0,&H0,0,0,0,0,100,100,0,0,1,1,0,2,10,10,10,0
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+'''
+    # Natively converted cues are (start, end, text) with the times in milliseconds and the text
+    # in VTT markup: only <b>, <i> and <u> tags, with "&", "<" and ">" escaped in the rest
+    _STYLE_TAG_RE = re.compile(r'</?[biu]>')
+
     def __init__(self, downloader=None, format=None):
         super().__init__(downloader)
         self.format = format
@@ -994,7 +1015,7 @@ def run(self, info):
 
                 with open(srt_file, 'w', encoding='utf-8') as f:
                     f.write(srt_data)
-                old_file = srt_file
+                old_file, ext = srt_file, 'srt'
 
                 subs[lang] = {
                     'ext': 'srt',
@@ -1007,20 +1028,139 @@ def run(self, info):
                 else:
                     sub_filenames.append(srt_file)
 
-            self.run_ffmpeg(old_file, new_file, ['-f', new_format])
+            new_data = self._convert_subtitles_natively(old_file, ext, new_ext)
+            if new_data is None:
+                self.run_ffmpeg(old_file, new_file, ['-f', new_format])
+                with open(new_file, encoding='utf-8') as f:
+                    new_data = f.read()
+            else:
+                with open(new_file, 'w', encoding='utf-8') as f:
+                    f.write(new_data)
 
-            with open(new_file, encoding='utf-8') as f:
-                subs[lang] = {
-                    'ext': new_ext,
-                    'data': f.read(),
-                    'filepath': new_file,
-                }
+            subs[lang] = {
+                'ext': new_ext,
+                'data': new_data,
+                'filepath': new_file,
+            }
 
             info['__files_to_move'][new_file] = replace_extension(
                 info['__files_to_move'][sub['filepath']], new_ext)
 
         return sub_filenames, info
 
+    def _convert_subtitles_natively(self, filename, ext, new_ext):
+        """
+        Convert between the simple text based subtitle formats without invoking ffmpeg.
+        Only the basic b/i/u styling is kept, similar to what ffmpeg does.
+
+        @returns    The converted subtitle data, or None if the conversion is not supported
+        """
+        parse = {
+            'vtt': self._parse_vtt_cues,
+            'srt': self._parse_srt_cues,
+        }.get(ext)
+        write = {
+            'vtt': self._write_vtt_cues,
+            'srt': self._write_srt_cues,
+            'ass': self._write_ass_cues,
+            'lrc': self._write_lrc_cues,
+        }.get(new_ext)
+        if not parse or not write:
+            return None
+
+        with open(filename, 'rb') as f:
+            data = f.read()
+        try:
+            cues = [cue for cue in parse(data) if cue[2]]
+        except (webvtt.ParseError, UnicodeDecodeError, ValueError) as e:
+            self.write_debug(f'Unable to parse {ext} subtitles ({e}); falling back to ffmpeg')
+            return None
+        return write(cues)
+
+    @staticmethod
+    def _clean_markup(text):
+        """ Remove all tags except b/i/u, and the ruby annotations """
+        text = re.sub(r'{\\[^}]*}', '', text)  # SSA style overrides used in some SRT files
+        text = re.sub(r'(?s)<(rt|rp)\b[^>]*>.*?(?:</\1>|(?=</ruby>)|$)', '', text)
+        return re.sub(
+            r'<(/?)([^\s<>.]+)[^<>]*>', lambda m: f'<{m[1]}{m[2]}>' if m[2] in ('b', 'i', 'u') else '', text)
+
+    @classmethod
+    def _map_markup(cls, text, text_fn, tag_fn=lambda tag: tag):
+        """ Apply text_fn to the text between the style tags, and tag_fn to the tags """
+        return ''.join(
+            tag_fn(part) if i % 2 else text_fn(part)
+            for i, part in enumerate(re.split(f'({cls._STYLE_TAG_RE.pattern})', text)))
+
+    @staticmethod
+    def _escape_markup(text):
+        return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+    @classmethod
+    def _parse_vtt_cues(cls, data):
+        for block in webvtt.parse_fragment(data):
+            if isinstance(block, webvtt.CueBlock):
+                text = cls._clean_markup(block.text.replace('\r\n', '\n').replace('\r', '\n').strip('\n'))
+                yield (
+                    (block.start + 45) // 90, (block.end + 45) // 90,
+                    cls._map_markup(text, lambda t: cls._escape_markup(unescapeHTML(t))))
+
+    @classmethod
+    def _parse_srt_cues(cls, data):
+        def to_msec(hours, mins, secs, frac):
+            return ((int(hours or 0) * 60 + int(mins)) * 60 + int(secs)) * 1000 + int(frac[:3].ljust(3, '0'))
+
+        data = data.decode('utf-8-sig').replace('\r\n', '\n').replace('\r', '\n')
+        timestamp = r'(?:(\d+):)?(\d+):(\d+)[,.](\d+)'
+        for block in re.split(r'\n[ \t]*\n', data.strip()):
+            mobj = re.search(rf'^[ \t]*{timestamp}[ \t]*-->[ \t]*{timestamp}[^\n]*(?:\n|$)', block, re.MULTILINE)
+            if mobj:
+                yield (
+                    to_msec(*mobj.group(1, 2, 3, 4)), to_msec(*mobj.group(5, 6, 7, 8)),
+                    cls._map_markup(cls._clean_markup(block[mobj.end():].strip('\n')), cls._escape_markup))
+
+    @staticmethod
+    def _write_vtt_cues(cues):
+        def timecode(msec):
+            return '%02d:%02d:%02d.%03d' % timetuple_from_msec(msec)
+
+        return 'WEBVTT\n\n' + ''.join(
+            f'{timecode(start)} --> {timecode(end)}\n{text}\n\n' for start, end, text in cues)
+
+    @classmethod
+    def _write_srt_cues(cls, cues):
+        def timecode(msec):
+            return '%02d:%02d:%02d,%03d' % timetuple_from_msec(msec)
+
+        return ''.join(
+            f'{i}\n{timecode(start)} --> {timecode(end)}\n{cls._map_markup(text, unescapeHTML)}\n\n'
+            for i, (start, end, text) in enumerate(cues, 1))
+
+    @classmethod
+    def _write_ass_cues(cls, cues):
+        def timecode(msec):
+            return '%01d:%02d:%02d.%02d' % (*timetuple_from_msec(msec)[:-1], msec % 1000 // 10)
+
+        def to_ass(text):
+            return cls._map_markup(
+                text, lambda t: re.sub(r'[{}\\]', r'\\\g<0>', unescapeHTML(t)).replace('\n', '\\N'),
+                lambda tag: '{\\%s%d}' % (tag[-2], tag[1] != '/'))
+
+        return cls._ASS_HEADER + ''.join(
+            f'Dialogue: 0,{timecode(start)},{timecode(end)},Default,,0,0,0,,{to_ass(text)}\n'
+            for start, end, text in cues)
+
+    @classmethod
+    def _write_lrc_cues(cls, cues):
+        def timecode(msec):
+            mins, secs = divmod(msec // 10, 6000)
+            return '%02d:%02d.%02d' % (mins, *divmod(secs, 100))
+
+        def to_lrc(text):
+            return cls._map_markup(text, unescapeHTML, lambda tag: '').replace('\n', ' ')
+
+        return ''.join(f'[{timecode(start)}]{to_lrc(text)}\n' for start, _, text in cues)
+
 
 class FFmpegSplitChaptersPP(FFmpegPostProcessor):
     def __init__(self, downloader, force_keyframes=False):
@@ -1,6 +1,8 @@
+import copy
 import hashlib
 import json
 import re
+import time
 import urllib.parse
 
 from .ffmpeg import FFmpegPostProcessor
@@ -29,11 +31,14 @@ class SponsorBlockPP(FFmpegPostProcessor):
         'music_offtopic': 'Non-Music Section',
         **NON_SKIPPABLE_CATEGORIES,
     }
+    # Segments of all the videos sharing a hash prefix are cached on disk for this many seconds
+    _CACHE_TTL = 60 * 60
 
     def __init__(self, downloader, categories=None, api='https://sponsor.ajay.app'):
         FFmpegPostProcessor.__init__(self, downloader)
         self._categories = tuple(categories or self.CATEGORIES.keys())
         self._API_URL = api if re.match('^https?://', api) else 'https://' + api
+        self._segment_buckets = {}
 
     def run(self, info):
         extractor = info['extractor_key']
@@ -90,15 +95,43 @@ def to_chapter(s):
             self.to_screen(f'Found {len(sponsor_chapters)} segments in the SponsorBlock database')
         return sponsor_chapters
 
-    def _get_sponsor_segments(self, video_id, service):
-        video_hash = hashlib.sha256(video_id.encode('ascii')).hexdigest()
+    def prefetch(self, video_ids, service='YouTube'):
+        """Fetch the segments for all the given videos ahead of time using a single request per hash prefix"""
+        for prefix in dict.fromkeys(self._hash_prefix(video_id) for video_id in video_ids):
+            self._get_segment_bucket(prefix, service)
+
+    @staticmethod
+    def _hash_prefix(video_id):
         # SponsorBlock API recommends using first 4 hash characters.
-        url = f'{self._API_URL}/api/skipSegments/{video_hash[:4]}?' + urllib.parse.urlencode({
-            'service': service,
-            'categories': json.dumps(self._categories),
-            'actionTypes': json.dumps(['skip', 'poi', 'chapter']),
-        })
-        for d in self._download_json(url) or []:
-            if d['videoID'] == video_id:
-                return d['segments']
-        return []
+        return hashlib.sha256(video_id.encode('ascii')).hexdigest()[:4]
+
+    def _get_sponsor_segments(self, video_id, service):
+        bucket = self._get_segment_bucket(self._hash_prefix(video_id), service)
+        # The segments are modified in place by `_get_sponsor_chapters`
+        return copy.deepcopy(bucket.get(video_id) or [])
+
+    def _get_segment_bucket(self, prefix, service):
+        """Returns the segments of every video with the given hash prefix, keyed by video id"""
+        bucket = self._segment_buckets.get((prefix, service))
+        if bucket is not None:
+            return bucket
+
+        query_hash = hashlib.sha256(
+            json.dumps([self._API_URL, sorted(self._categories)]).encode()).hexdigest()[:16]
+        cache_key = f'{service}_{query_hash}_{prefix}'
+        cached = self._downloader.cache.load('sponsorblock', cache_key) if self._downloader else None
+        if cached and time.time() - cached.get('timestamp', 0) < self._CACHE_TTL:
+            bucket = cached['videos']
+        else:
+            url = f'{self._API_URL}/api/skipSegments/{prefix}?' + urllib.parse.urlencode({
+                'service': service,
+                'categories': json.dumps(self._categories),
+                'actionTypes': json.dumps(['skip', 'poi', 'chapter']),
+            })
+            bucket = {d['videoID']: d['segments'] for d in self._download_json(url) or []}
+            if self._downloader:
+                self._downloader.cache.store(
+                    'sponsorblock', cache_key, {'timestamp': time.time(), 'videos': bucket})
+
+        self._segment_buckets[(prefix, service)] = bucket
+        return bucket
@@ -1,5 +1,7 @@
+import array
 import base64
 import binascii
+import bisect
 import calendar
 import codecs
 import collections
@@ -33,6 +35,7 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import traceback
 import types
@@ -186,8 +189,8 @@ def preferredencoding():
     return pref
 
 
-def write_json_file(obj, fn):
-    """ Encode obj as JSON and write it to fn, atomically if possible """
+def write_json_file(obj, fn, **kwargs):
+    """ Encode obj as JSON and write it to fn, atomically if possible. kwargs are passed to json.dump """
 
     tf = tempfile.NamedTemporaryFile(
         prefix=f'{os.path.basename(fn)}.', dir=os.path.dirname(fn),
@@ -195,7 +198,7 @@ def write_json_file(obj, fn):
 
     try:
         with tf:
-            json.dump(obj, tf, ensure_ascii=False)
+            json.dump(obj, tf, **{'ensure_ascii': False, **kwargs})
         if sys.platform == 'win32':
             # Need to remove existing file on Windows, else os.rename raises
             # WindowsError or FileExistsError.
@@ -341,6 +344,89 @@ def get_elements_html_by_attribute(*args, **kwargs):
     return [whole for _, whole in get_elements_text_and_html_by_attribute(*args, **kwargs)]
 
 
+class HTMLIndex:
+    """
+    Positions of the attributes of all the start tags of an HTML document,
+    found in a single pass over it
+
+    Use index_html to build the index of a page that is queried repeatedly;
+    the get_element(s)_* helpers then only look at the tags having the
+    requested attribute instead of rescanning the whole page
+    """
+
+    # The attributes of a tag are those of its longest "region" reachable by partial_element_re
+    _TAG_RE = re.compile(r'''<[\w:.-]+(?=((?:\s[^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*)?))''')
+    _ATTRIBUTE_RE = re.compile(r'''"[^"]*"|'[^']*'|\s([^\s"'>=]+)\s*=(?=(\s*))''')
+
+    def __init__(self, html):
+        self.html = html
+        self._attributes = collections.defaultdict(list)
+        for tag in self._TAG_RE.finditer(html):
+            start, end = tag.span(1)
+            if start == end:
+                continue
+            for attribute in self._ATTRIBUTE_RE.finditer(html, start, end):
+                if attribute.group(1):
+                    # (start of the tag, end of the "=", start of the (quoted) value)
+                    self._attributes[attribute.group(1)].append((tag.start(), attribute.start(2), attribute.end(2)))
+
+    def finditer(self, pattern, attribute, value):
+        """
+        Equivalent to pattern.finditer(html) for a pattern that only matches
+        start tags having the attribute with a value matching the (compiled)
+        pattern value, optionally preceded by a quote
+        """
+        html, last_end = self.html, 0
+        for start, eq_end, value_start in self._attributes.get(attribute, ()):
+            if start < last_end:
+                continue
+            for pos in range(eq_end, value_start + 2):
+                if value.match(html, pos):
+                    break
+            else:
+                continue
+            mobj = pattern.match(html, start)
+            if mobj:
+                last_end = mobj.end()
+                yield mobj
+
+
+class _HTMLIndexCache:
+    MAX_ENTRIES = 4
+
+    def __init__(self):
+        self._indexes = collections.OrderedDict()
+        self._lock = threading.Lock()  # Extractors may run in threads (_map_concurrently)
+
+    def get(self, html):
+        index = self._indexes.get(id(html))
+        return index if index is not None and index.html is html else None
+
+    def add(self, html):
+        with self._lock:
+            index = self.get(html)
+        if index is None:
+            index = HTMLIndex(html)
+        with self._lock:
+            if self.get(html) is None:
+                self._indexes[id(html)] = index
+            self._indexes.move_to_end(id(html))
+            while len(self._indexes) > self.MAX_ENTRIES:
+                self._indexes.popitem(last=False)
+            return self._indexes[id(html)]
+
+
+_HTML_INDEXES = _HTMLIndexCache()
+
+
+def index_html(html):
+    """
+    Build (or reuse) the HTMLIndex of the passed HTML document; subsequent
+    get_element(s)_* calls on this same string are then answered using it
+    """
+    return _HTML_INDEXES.add(html)
+
+
 def get_elements_text_and_html_by_attribute(attribute, value, html, *, tag=r'[\w:.-]+', escape_value=True):
     """
     Return the text (content) and the html (whole) of the tag with the specified
@@ -359,8 +445,16 @@ def get_elements_text_and_html_by_attribute(attribute, value, html, *, tag=r'[\w
          \s{re.escape(attribute)}\s*=\s*(?P<_q>['"]{quote})(?-x:{value})(?P=_q)
         '''
 
-    for m in re.finditer(partial_element_re, html):
-        content, whole = get_element_text_and_html_by_tag(m.group('tag'), html[m.start():])
+    index = None
+    if (tag == r'[\w:.-]+' or re.fullmatch(r'[\w:.-]+', tag)) and re.fullmatch(r'''[^\s"'>=]+''', attribute):
+        index = _HTML_INDEXES.get(html)
+    if index is None:
+        matches = re.finditer(partial_element_re, html)
+    else:
+        matches = index.finditer(re.compile(partial_element_re), attribute, re.compile(value))
+
+    for m in matches:
+        content, whole = _get_element_text_and_html_by_tag(m.group('tag'), html, m.start())
 
         yield (
             unescapeHTML(re.sub(r'^(?P<q>["\'])(?P<content>.*)(?P=q)$', r'\g<content>', content, flags=re.DOTALL)),
@@ -416,17 +510,20 @@ def get_element_text_and_html_by_tag(tag, html):
     For the first element with the specified tag in the passed HTML document
     return its' content (text) and the whole element (html)
     """
-    def find_or_raise(haystack, needle, exc):
+    return _get_element_text_and_html_by_tag(tag, html, 0)
+
+
+def _get_element_text_and_html_by_tag(tag, html, start):
+    def find_or_raise(haystack, needle, start, exc):
         try:
-            return haystack.index(needle)
+            return haystack.index(needle, start)
         except ValueError:
             raise exc
     closing_tag = f'</{tag}>'
     whole_start = find_or_raise(
-        html, f'<{tag}', compat_HTMLParseError(f'opening {tag} tag not found'))
+        html, f'<{tag}', start, compat_HTMLParseError(f'opening {tag} tag not found'))
     content_start = find_or_raise(
-        html[whole_start:], '>', compat_HTMLParseError(f'malformed opening {tag} tag'))
-    content_start += whole_start + 1
+        html, '>', whole_start, compat_HTMLParseError(f'malformed opening {tag} tag')) + 1
     with HTMLBreakOnClosingTagParser() as parser:
         parser.feed(html[whole_start:content_start])
         if not parser.tagstack or parser.tagstack[0] != tag:
@@ -434,15 +531,15 @@ def find_or_raise(haystack, needle, exc):
         offset = content_start
         while offset < len(html):
             next_closing_tag_start = find_or_raise(
-                html[offset:], closing_tag,
+                html, closing_tag, offset,
                 compat_HTMLParseError(f'closing {tag} tag not found'))
             next_closing_tag_end = next_closing_tag_start + len(closing_tag)
             try:
-                parser.feed(html[offset:offset + next_closing_tag_end])
-                offset += next_closing_tag_end
+                parser.feed(html[offset:next_closing_tag_end])
+                offset = next_closing_tag_end
             except HTMLBreakOnClosingTagParser.HTMLBreakOnClosingTagException:
-                return html[content_start:offset + next_closing_tag_start], \
-                    html[whole_start:offset + next_closing_tag_end]
+                return html[content_start:next_closing_tag_start], \
+                    html[whole_start:next_closing_tag_end]
         raise compat_HTMLParseError('unexpected end of html')
 
 
@@ -2247,6 +2344,143 @@ def __str__(self):
         return repr(self.exhaust())
 
 
+class FragmentSequence(collections.abc.Sequence):
+    """Compact list of the fragments of a format
+
+    Runs of fragments following a template are stored as the template and a range of
+    numbers/times, and the fragment dicts are only materialized when they are accessed.
+    Note that slices of a FragmentSequence are lists and not FragmentSequence"""
+
+    class _Template:
+        __slots__ = ('key', 'template', 'count', 'duration', 'number', 'time', 'time_step', 'fields')
+
+        def __init__(self, key, template, count, duration, number, time, time_step, fields):
+            self.key, self.template, self.count, self.duration = key, template, count, duration
+            self.number, self.time, self.time_step, self.fields = number, time, time_step, fields
+
+        def __iter__(self):
+            return map(self.__getitem__, range(self.count))
+
+        def __getitem__(self, i):
+            return {
+                self.key: self.template % {
+                    **self.fields, 'Number': self.number + i, 'Time': self.time + i * self.time_step},
+                'duration': self.duration,
+            }
+
+    class _Timeline:
+        __slots__ = ('key', 'template', 'segments', 'timescale', 'number', 'fields', '_ends', '_times')
+
+        def __init__(self, key, template, segments, timescale, number, fields):
+            self.key, self.template, self.segments, self.timescale = key, template, segments, timescale
+            self.number, self.fields = number, fields
+            # Cumulative fragment counts and start times of the S entries
+            self._ends, self._times = array.array('q'), array.array('q')
+            count = time = 0
+            for t, d, r in segments:
+                time = t or time
+                self._times.append(time)
+                count += max(r, 0) + 1
+                self._ends.append(count)
+                time += d * (max(r, 0) + 1)
+
+        def __len__(self):
+            return self._ends[-1] if self._ends else 0
+
+        def __getitem__(self, i):
+            idx = bisect.bisect_right(self._ends, i)
+            repeat = i - (self._ends[idx - 1] if idx else 0)
+            d = self.segments[idx][1]
+            return {
+                self.key: self.template % {
+                    **self.fields, 'Number': self.number + i, 'Time': self._times[idx] + repeat * d},
+                'duration': float_or_none(d, self.timescale),
+            }
+
+        def __iter__(self):
+            number = self.number
+            for (_, d, r), start_time in zip(self.segments, self._times):
+                duration = float_or_none(d, self.timescale)
+                for _ in range(max(r, 0) + 1):
+                    yield {
+                        self.key: self.template % {**self.fields, 'Number': number, 'Time': start_time},
+                        'duration': duration,
+                    }
+                    number += 1
+                    start_time += d
+
+    def __init__(self, fragments=()):
+        self._runs = []  # [count, fragments list or template]
+        self._ends = []  # Cumulative counts of the runs, for bisection
+        self.extend(fragments)
+
+    def _add_run(self, count, data):
+        self._runs.append([count, data])
+        self._ends.append(len(self) + count)
+
+    def append(self, fragment):
+        if self._runs and isinstance(self._runs[-1][1], list):
+            self._runs[-1][1].append(fragment)
+            self._runs[-1][0] += 1
+            self._ends[-1] += 1
+        else:
+            self._add_run(1, [fragment])
+
+    def extend(self, fragments):
+        if isinstance(fragments, FragmentSequence):
+            for count, data in fragments._runs:
+                self._add_run(count, data[:] if isinstance(data, list) else data)
+        else:
+            for fragment in fragments:
+                self.append(fragment)
+
+    def add_template(self, key, template, count, duration=None, *, number=1, time=0, time_step=0, **fields):
+        """
+        Add `count` fragments whose `key` is `template` %-formatted with
+        the fields and the fragment's Number and Time, e.g. for $Number$ DASH templates
+        """
+        if count > 0:
+            self._add_run(count, self._Template(key, template, count, duration, number, time, time_step, fields))
+
+    def add_timeline(self, key, template, segments, timescale=1, *, number=1, **fields):
+        """
+        Add the fragments of a DASH SegmentTimeline, given as a list of (t, d, r) tuples
+        of its S elements. Otherwise like add_template
+        """
+        timeline = self._Timeline(key, template, segments, timescale, number, fields)
+        if len(timeline):
+            self._add_run(len(timeline), timeline)
+
+    def __iter__(self):
+        for _, data in self._runs:
+            yield from data
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        elif not isinstance(idx, int):
+            raise TypeError('indices must be integers or slices')
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('FragmentSequence index out of range')
+        run_idx = bisect.bisect_right(self._ends, idx)
+        count, data = self._runs[run_idx]
+        return data[idx - self._ends[run_idx] + count]
+
+    def __len__(self):
+        return self._ends[-1] if self._ends else 0
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, FragmentSequence)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        # repr and str should mimic a list
+        return repr(list(self))
+
+
 class PagedList:
 
     class IndexError(IndexError):  # noqa: A001
@@ -2708,13 +2942,16 @@ def strip_jsonp(code):
 def js_to_json(code, vars={}, *, strict=False):
     # vars is a dict of var, val pairs to substitute
     STRING_QUOTES = '\'"`'
-    STRING_RE = '|'.join(rf'{q}(?:\\.|[^\\{q}])*{q}' for q in STRING_QUOTES)
+    STRING_RE = '|'.join(rf'{q}[^\\{q}]*(?:\\.[^\\{q}]*)*{q}' for q in STRING_QUOTES)
     COMMENT_RE = r'/\*(?:(?!\*/).)*?\*/|//[^\n]*\n'
     SKIP_RE = fr'\s*(?:{COMMENT_RE})?\s*'
     INTEGER_TABLE = (
-        (fr'(?s)^(0[xX][0-9a-fA-F]+){SKIP_RE}:?$', 16),
-        (fr'(?s)^(0+[0-7]+){SKIP_RE}:?$', 8),
+        (re.compile(fr'(?s)^(0[xX][0-9a-fA-F]+){SKIP_RE}:?$'), 16),
+        (re.compile(fr'(?s)^(0+[0-7]+){SKIP_RE}:?$'), 8),
     )
+    # Compiled once per call rather than looked up for every string in the code
+    ESCAPE_RE = re.compile(r'(?s)(")|\\(.)')
+    TEMPLATE_RE = re.compile(r'(?s)\${([^}]+)}')
 
     def process_escape(match):
         JSON_PASSTHROUGH_ESCAPES = R'"\bfnrtu'
@@ -2733,20 +2970,22 @@ def template_substitute(match):
 
     def fix_kv(m):
         v = m.group(0)
-        if v in ('true', 'false', 'null'):
+        # Strings are by far the most common tokens in large blobs, so check them first
+        if v[0] in STRING_QUOTES:
+            v = TEMPLATE_RE.sub(template_substitute, v[1:-1]) if v[0] == '`' else v[1:-1]
+            if '\\' not in v and '"' not in v:
+                return f'"{v}"'
+            escaped = ESCAPE_RE.sub(process_escape, v)
+            return f'"{escaped}"'
+        elif v in ('true', 'false', 'null'):
             return v
         elif v in ('undefined', 'void 0'):
             return 'null'
         elif v.startswith(('/*', '//', '!')) or v == ',':
             return ''
 
-        if v[0] in STRING_QUOTES:
-            v = re.sub(r'(?s)\${([^}]+)}', template_substitute, v[1:-1]) if v[0] == '`' else v[1:-1]
-            escaped = re.sub(r'(?s)(")|\\(.)', process_escape, v)
-            return f'"{escaped}"'
-
         for regex, base in INTEGER_TABLE:
-            im = re.match(regex, v)
+            im = regex.match(v)
             if im:
                 i = int(im.group(1), base)
                 return f'"{i}":' if v.endswith(':') else str(i)
@@ -2768,13 +3007,19 @@ def fix_kv(m):
     def create_map(mobj):
         return json.dumps(dict(json.loads(js_to_json(mobj.group(1) or '[]', vars=vars))))
 
-    code = re.sub(r'(?:new\s+)?Array\((.*?)\)', r'[\g<1>]', code)
-    code = re.sub(r'new Map\((\[.*?\])?\)', create_map, code)
+    # The substring checks avoid scanning large inputs that cannot match
+    if 'Array(' in code:
+        code = re.sub(r'(?:new\s+)?Array\((.*?)\)', r'[\g<1>]', code)
+    if 'new ' in code:
+        code = re.sub(r'new Map\((\[.*?\])?\)', create_map, code)
     if not strict:
-        code = re.sub(rf'new Date\(({STRING_RE})\)', r'\g<1>', code)
-        code = re.sub(r'new \w+\((.*?)\)', lambda m: json.dumps(m.group(0)), code)
-        code = re.sub(r'parseInt\([^\d]+(\d+)[^\d]+\)', r'\1', code)
-        code = re.sub(r'\(function\([^)]*\)\s*\{[^}]*\}\s*\)\s*\(\s*(["\'][^)]*["\'])\s*\)', r'\1', code)
+        if 'new ' in code:
+            code = re.sub(rf'new Date\(({STRING_RE})\)', r'\g<1>', code)
+            code = re.sub(r'new \w+\((.*?)\)', lambda m: json.dumps(m.group(0)), code)
+        if 'parseInt(' in code:
+            code = re.sub(r'parseInt\([^\d]+(\d+)[^\d]+\)', r'\1', code)
+        if '(function(' in code:
+            code = re.sub(r'\(function\([^)]*\)\s*\{[^}]*\}\s*\)\s*\(\s*(["\'][^)]*["\'])\s*\)', r'\1', code)
 
     return re.sub(rf'''(?sx)
         {STRING_RE}|
@@ -5362,6 +5607,7 @@ def __init__(self, ydl, field_preference):
         self.evaluate_params(self.ydl.params, field_preference)
         if ydl.params.get('verbose'):
             self.print_verbose_info(self.ydl.write_debug)
+        self._field_preference_funcs = tuple(map(self._compile_field_preference, self._order))
 
     def _get_field_setting(self, field, key):
         if field not in self.settings:
@@ -5526,6 +5772,84 @@ def _calculate_field_preference(self, format_, field):
             value = get_value(field)
         return self._calculate_field_preference_from_value(format_, field, type_, value)
 
+    def _compile_order_resolver(self, field):
+        """Same as `_resolve_field_value(field, value, True)` for 'ordered' fields, but with
+        the settings looked up and the regexes compiled only once, and the results memoized"""
+        if self._get_field_setting(field, 'convert') != 'order':
+            return functools.partial(self._resolve_field_value, field, convert_none=True)
+
+        order_list = (self._use_free_order and self._get_field_setting(field, 'order_free')) or self._get_field_setting(field, 'order')
+        list_length = len(order_list)
+        empty_pos = order_list.index('') if '' in order_list else list_length + 1
+        patterns = self._get_field_setting(field, 'regex') and [regex and re.compile(regex) for regex in order_list]
+
+        @functools.lru_cache(maxsize=256)
+        def resolve(value):
+            if value is None:
+                pass
+            elif patterns:
+                value = value.lower()
+                for i, pattern in enumerate(patterns):
+                    if pattern and pattern.match(value):
+                        return list_length - i
+                return list_length - empty_pos  # not in list
+            else:
+                value = value.lower()
+            return list_length - (order_list.index(value) if value in order_list else empty_pos)
+
+        return resolve
+
+    def _compile_field_preference(self, field):
+        """Returns a function equivalent to `_calculate_field_preference(format, field)`
+        with the field settings resolved ahead of time"""
+        type_ = self._get_field_setting(field, 'type')
+        if type_ == 'multiple':
+            type_ = 'field'
+            keys = tuple(self._get_field_setting(f, 'field') for f in self._get_field_setting(field, 'field'))
+            function = self._get_field_setting(field, 'function')
+            get_value = lambda format_: function(format_.get(key) for key in keys)
+        else:
+            key = self._get_field_setting(field, 'field')
+            get_value = lambda format_: format_.get(key)
+
+        if type_ == 'extractor':
+            maximum = self._get_field_setting(field, 'max')
+            convert_value = lambda value: -1 if value is None or (maximum is not None and value >= maximum) else value
+        elif type_ == 'boolean':
+            in_list = self._get_field_setting(field, 'in_list')
+            not_in_list = self._get_field_setting(field, 'not_in_list')
+            convert_value = lambda value: 0 if (
+                (in_list is None or value in in_list) and (not_in_list is None or value not in not_in_list)) else -1
+        elif type_ == 'ordered':
+            convert_value = self._compile_order_resolver(field)
+        else:
+            convert_value = None
+
+        reverse = self._get_field_setting(field, 'reverse')
+        closest = self._get_field_setting(field, 'closest')
+        limit = self._get_field_setting(field, 'limit')
+        default = self._get_field_setting(field, 'default')
+        is_string = self._get_field_setting(field, 'convert') == 'string'
+
+        def calculate(format_):
+            value = get_value(format_)
+            if convert_value:
+                value = convert_value(value)
+
+            val_num = float_or_none(value, default=default)
+            is_num = not is_string and val_num is not None
+            if is_num:
+                value = val_num
+
+            return ((-10, 0) if value is None
+                    else (1, value, 0) if not is_num  # if a field has mixed strings and numbers, strings are sorted higher
+                    else (0, -abs(value - limit), value - limit if reverse else limit - value) if closest
+                    else (0, value, 0) if not reverse and (limit is None or value <= limit)
+                    else (0, -value, 0) if limit is None or (reverse and value == limit) or value > limit
+                    else (-1, value, 0))
+
+        return calculate
+
     def calculate_preference(self, format):
         # Determine missing protocol
         if not format.get('protocol'):
@@ -5561,7 +5885,7 @@ def calculate_preference(self, format):
         if not format.get('tbr'):
             format['tbr'] = try_call(lambda: format['vbr'] + format['abr']) or None
 
-        return tuple(self._calculate_field_preference(format, field) for field in self._order)
+        return tuple(func(format) for func in self._field_preference_funcs)
 
 
 def filesize_from_tbr(tbr, duration):
@@ -1,15 +1,16 @@
 import collections.abc
 import contextlib
+import functools
 import http.cookies
 import inspect
 import itertools
 import re
+import threading
+import types
 import xml.etree.ElementTree
 
 from ._utils import (
-    IDENTITY,
     NO_DEFAULT,
-    LazyList,
     deprecation_warning,
     is_iterable_like,
     try_call,
@@ -86,56 +87,184 @@ def traverse_obj(
     if is_user_input is not NO_DEFAULT:
         deprecation_warning('The is_user_input parameter is deprecated and no longer works')
 
-    casefold = lambda k: k.casefold() if isinstance(k, str) else k
-
     if isinstance(expected_type, type):
         type_test = lambda val: val if isinstance(val, expected_type) else None
+    elif expected_type:
+        type_test = lambda val: try_call(expected_type, args=(val,))
     else:
-        type_test = lambda val: try_call(expected_type or IDENTITY, args=(val,))
+        type_test = None
 
-    def apply_key(key, obj, is_last):
-        branching = False
-        result = None
+    traverser = _Traverser(default, get_all, type_test)
+    for index, path in enumerate(paths, 1):
+        result = traverser.traverse(
+            obj, _compile_path(path, casesense, traverse_string), index == len(paths), True)
+        if result is not None:
+            return result
 
-        if obj is None and traverse_string:
-            if key is ... or callable(key) or isinstance(key, slice):
-                branching = True
-                result = ()
+    return None if default is NO_DEFAULT else default
 
-        elif key is None:
-            result = obj
 
-        elif isinstance(key, set):
-            item = next(iter(key))
-            if len(key) > 1 or isinstance(item, type):
-                assert all(isinstance(item, type) for item in key)
-                if isinstance(obj, tuple(key)):
-                    result = obj
-            else:
-                result = try_call(item, args=(obj,))
+class _Traverser:
+    """The options of a traverse_obj call, used to apply compiled paths"""
 
-        elif isinstance(key, (list, tuple)):
-            branching = True
-            result = itertools.chain.from_iterable(
-                apply_path(obj, branch, is_last)[0] for branch in key)
+    __slots__ = ('default', 'get_all', 'type_test')
 
-        elif key is ...:
-            branching = True
+    def __init__(self, default, get_all, type_test):
+        self.default, self.get_all, self.type_test = default, get_all, type_test
+
+    def apply_path(self, start_obj, path, test_type):
+        if __debug__ and not path.validated:
+            path.validate()
+
+        # Until the path branches, there is a single object to apply the keys to
+        obj, objs = start_obj, None
+        has_branched = False
+
+        for step in path.steps:
+            if step is any or step is all:
+                has_branched = False
+                filtered_objs = (item for item in ((obj,) if objs is None else objs) if item not in (None, {}))
+                if step is any:
+                    obj = next(filtered_objs, None)
+                else:
+                    obj = list(filtered_objs)
+                objs = None
+                continue
+
+            if objs is None:
+                branching, results = step(obj, self)
+                if branching:
+                    has_branched = True
+                    objs = results
+                else:
+                    obj, = results
+                continue
+
+            new_objs = []
+            for obj in objs:
+                branching, results = step(obj, self)
+                has_branched |= branching
+                new_objs.append(results)
+
+            objs = itertools.chain.from_iterable(new_objs)
+
+        if objs is None:
+            objs = (obj,)
+        if test_type and path.test_type and self.type_test:
+            objs = map(self.type_test, objs)
+
+        return objs, has_branched
+
+    def traverse(self, obj, path, allow_empty, test_type):
+        results, has_branched = self.apply_path(obj, path, test_type)
+        results = (item for item in results if item not in (None, {}))
+        for result in results:
+            return [result, *results] if self.get_all and has_branched else result
+
+        if self.get_all and has_branched:
+            if allow_empty:
+                return [] if self.default is NO_DEFAULT else self.default
+            return None
+
+        return {} if allow_empty and path.is_dict else None
+
+
+class _CompiledPath:
+    """
+    A traversal path with each key turned into a function applying it
+
+    The functions take the object and the `_Traverser` and
+    return whether they branched and an iterable of the results
+    """
+
+    __slots__ = ('steps', 'callables', 'test_type', 'is_dict', 'validated')
+
+    def __init__(self, path, casesense, traverse_string):
+        self.steps, self.callables = [], []
+
+        keys = path if isinstance(path, tuple) else tuple(variadic(path, (str, bytes, dict, set)))
+        key = None
+        for index, key in enumerate(keys, 1):
+            if not casesense and isinstance(key, str):
+                key = key.casefold()
+
+            if key in (any, all):
+                self.steps.append(any if key is any else all)
+                continue
+
+            if callable(key):
+                self.callables.append(key)
+            self.steps.append(_compile_key(key, index == len(keys), casesense, traverse_string))
+
+        self.test_type = not isinstance(key, (dict, list, tuple))
+        self.is_dict = isinstance(key, dict)
+        self.validated = False
+
+    def validate(self):
+        for func in self.callables:
+            _validate_signature(func)
+        self.validated = True
+
+
+_VALID_SIGNATURES = set()
+
+
+def _validate_signature(func):
+    """Verify that the function can be used as a traversal filter"""
+    if type(func) is not types.FunctionType or func.__dict__:
+        inspect.signature(func).bind(None, None)
+        return
+
+    # The signature of a plain function (e.g. a lambda recreated on each call) only depends on these
+    signature_key = (func.__code__, len(func.__defaults__ or ()), tuple(func.__kwdefaults__ or ()))
+    if signature_key not in _VALID_SIGNATURES:
+        inspect.signature(func).bind(None, None)
+        _VALID_SIGNATURES.add(signature_key)
+
+
+def _compile_key(key, is_last, casesense, traverse_string):
+    if key is None:
+        def apply_key(obj, traverser):
+            return False, (obj,)
+
+    elif isinstance(key, set):
+        item = next(iter(key))
+        if len(key) > 1 or isinstance(item, type):
+            only_types = all(isinstance(item, type) for item in key)
+            key_types = tuple(key)
+
+            def apply_key(obj, traverser):
+                assert only_types
+                return False, (obj if isinstance(obj, key_types) else None,)
+        else:
+            def apply_key(obj, traverser):
+                return False, (try_call(item, args=(obj,)),)
+
+    elif isinstance(key, (list, tuple)):
+        branches = [_CompiledPath(branch, casesense, traverse_string) for branch in key]
+
+        def apply_key(obj, traverser):
+            return True, itertools.chain.from_iterable(
+                traverser.apply_path(obj, branch, is_last)[0] for branch in branches)
+
+    elif key is ...:
+        def apply_key(obj, traverser):
+            if type(obj) is dict:
+                return True, obj.values()
             if isinstance(obj, http.cookies.Morsel):
                 obj = dict(obj, key=obj.key, value=obj.value)
             if isinstance(obj, collections.abc.Mapping):
-                result = obj.values()
+                return True, obj.values()
             elif is_iterable_like(obj) or isinstance(obj, xml.etree.ElementTree.Element):
-                result = obj
+                return True, obj
             elif isinstance(obj, re.Match):
-                result = obj.groups()
+                return True, obj.groups()
             elif traverse_string:
-                branching = False
-                result = str(obj)
-            else:
-                result = ()
+                return False, (str(obj),)
+            return True, ()
 
-        elif callable(key):
+    elif callable(key):
+        def apply_key(obj, traverser):
             branching = True
             if isinstance(obj, http.cookies.Morsel):
                 obj = dict(obj, key=obj.key, value=obj.value)
@@ -155,16 +284,79 @@ def apply_key(key, obj, is_last):
 
             result = (v for k, v in iter_obj if try_call(key, args=(k, v)))
             if not branching:  # string traversal
-                result = ''.join(result)
+                return False, (''.join(result),)
+            return True, result
 
-        elif isinstance(key, dict):
-            iter_obj = ((k, _traverse_obj(obj, v, False, is_last)) for k, v in key.items())
-            result = {
+    elif isinstance(key, dict):
+        items = [(k, _CompiledPath(v, casesense, traverse_string)) for k, v in key.items()]
+
+        def apply_key(obj, traverser):
+            default = traverser.default
+            iter_obj = ((k, traverser.traverse(obj, v, False, is_last)) for k, v in items)
+            return False, ({
                 k: v if v is not None else default for k, v in iter_obj
                 if v is not None or default is not NO_DEFAULT
-            } or None
+            } or None,)
+
+    elif casesense and isinstance(key, (str, int)) and not isinstance(key, bool):
+        apply_item = _compile_item_key(key, casesense, traverse_string)
+
+        def apply_key(obj, traverser):
+            if type(obj) is dict:
+                return False, (obj.get(key),)
+            return apply_item(obj)
+
+    else:
+        apply_item = _compile_item_key(key, casesense, traverse_string)
+
+        def apply_key(obj, traverser):
+            return apply_item(obj)
+
+    if not traverse_string:
+        return apply_key
 
-        elif isinstance(obj, collections.abc.Mapping):
+    branches_on_none = key is ... or callable(key) or isinstance(key, slice)
+    apply_non_none_key = apply_key
+
+    def apply_key(obj, traverser):
+        if obj is None:
+            return (True, ()) if branches_on_none else (False, (None,))
+        return apply_non_none_key(obj, traverser)
+
+    return apply_key
+
+
+def _compile_item_key(key, casesense, traverse_string):
+    casefold = lambda k: k.casefold() if isinstance(k, str) else k
+
+    if isinstance(key, str):
+        xpath, _, special = key.rpartition('/')
+        if not special.startswith('@') and not special.endswith('()'):
+            xpath = key
+            special = None
+
+        # Allow abbreviations of relative paths, absolute paths error
+        if xpath.startswith('/'):
+            xpath = f'.{xpath}'
+        elif xpath and not xpath.startswith('./'):
+            xpath = f'./{xpath}'
+
+        def apply_specials(element):
+            if special is None:
+                return element
+            if special == '@':
+                return element.attrib
+            if special.startswith('@'):
+                return try_call(element.attrib.get, args=(special[1:],))
+            if special == 'text()':
+                return element.text
+            raise SyntaxError(f'apply_specials is missing case for {special!r}')
+
+    def apply_item(obj):
+        branching = False
+        result = None
+
+        if isinstance(obj, collections.abc.Mapping):
             if isinstance(obj, http.cookies.Morsel):
                 obj = dict(obj, key=obj.key, value=obj.value)
             result = (try_call(obj.get, args=(key,)) if casesense or try_call(obj.__contains__, args=(key,)) else
@@ -188,28 +380,6 @@ def apply_key(key, obj, is_last):
                     result = str(obj)[key]
 
         elif isinstance(obj, xml.etree.ElementTree.Element) and isinstance(key, str):
-            xpath, _, special = key.rpartition('/')
-            if not special.startswith('@') and not special.endswith('()'):
-                xpath = key
-                special = None
-
-            # Allow abbreviations of relative paths, absolute paths error
-            if xpath.startswith('/'):
-                xpath = f'.{xpath}'
-            elif xpath and not xpath.startswith('./'):
-                xpath = f'./{xpath}'
-
-            def apply_specials(element):
-                if special is None:
-                    return element
-                if special == '@':
-                    return element.attrib
-                if special.startswith('@'):
-                    return try_call(element.attrib.get, args=(special[1:],))
-                if special == 'text()':
-                    return element.text
-                raise SyntaxError(f'apply_specials is missing case for {special!r}')
-
             if xpath:
                 result = list(map(apply_specials, obj.iterfind(xpath)))
             else:
@@ -217,71 +387,64 @@ def apply_specials(element):
 
         return branching, result if branching else (result,)
 
-    def lazy_last(iterable):
-        iterator = iter(iterable)
-        prev = next(iterator, NO_DEFAULT)
-        if prev is NO_DEFAULT:
-            return
-
-        for item in iterator:
-            yield False, prev
-            prev = item
-
-        yield True, prev
-
-    def apply_path(start_obj, path, test_type):
-        objs = (start_obj,)
-        has_branched = False
-
-        key = None
-        for last, key in lazy_last(variadic(path, (str, bytes, dict, set))):
-            if not casesense and isinstance(key, str):
-                key = key.casefold()
-
-            if key in (any, all):
-                has_branched = False
-                filtered_objs = (obj for obj in objs if obj not in (None, {}))
-                if key is any:
-                    objs = (next(filtered_objs, None),)
-                else:
-                    objs = (list(filtered_objs),)
-                continue
-
-            if __debug__ and callable(key):
-                # Verify function signature
-                inspect.signature(key).bind(None, None)
-
-            new_objs = []
-            for obj in objs:
-                branching, results = apply_key(key, obj, last)
-                has_branched |= branching
-                new_objs.append(results)
-
-            objs = itertools.chain.from_iterable(new_objs)
-
-        if test_type and not isinstance(key, (dict, list, tuple)):
-            objs = map(type_test, objs)
-
-        return objs, has_branched, isinstance(key, dict)
-
-    def _traverse_obj(obj, path, allow_empty, test_type):
-        results, has_branched, is_dict = apply_path(obj, path, test_type)
-        results = LazyList(item for item in results if item not in (None, {}))
-        if get_all and has_branched:
-            if results:
-                return results.exhaust()
-            if allow_empty:
-                return [] if default is NO_DEFAULT else default
-            return None
-
-        return results[0] if results else {} if allow_empty and is_dict else None
-
-    for index, path in enumerate(paths, 1):
-        result = _traverse_obj(obj, path, index == len(paths), True)
-        if result is not None:
-            return result
-
-    return None if default is NO_DEFAULT else default
+    return apply_item
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+def _freeze_path(path):
+    """Return a hashable key for the path, which identifies what it traverses"""
+    if isinstance(path, (list, tuple)):
+        return tuple(map(_freeze_key, path))
+    elif isinstance(path, (str, bytes, dict, set)) or not isinstance(path, collections.abc.Iterable):
+        return (_freeze_key(path),)
+    raise _Uncacheable
+
+
+def _freeze_key(key):
+    if key is None or key is ... or type(key) in (str, int):
+        return key
+    elif isinstance(key, set):
+        return (set, frozenset(map(_freeze_key, key)))
+    elif isinstance(key, (list, tuple)):
+        return (tuple, *map(_freeze_path, key))
+    elif isinstance(key, dict):
+        return (dict, *((_freeze_key(k), _freeze_path(v)) for k, v in key.items()))
+    elif isinstance(key, slice):
+        return (slice, _freeze_key(key.start), _freeze_key(key.stop), _freeze_key(key.step))
+    elif isinstance(key, (functools.partial, types.MethodType)) or (
+            isinstance(key, types.FunctionType) and '<locals>' in key.__qualname__):
+        # Created anew on every call of the extractor, so caching it would only waste memory;
+        # a bound method would also keep its instance alive for as long as it is cached
+        raise _Uncacheable
+    try:
+        hash(key)
+    except TypeError:
+        raise _Uncacheable
+    return (type(key), key)
+
+
+_COMPILED_PATHS = {}
+_COMPILED_PATHS_MAX_SIZE = 1024
+_COMPILED_PATHS_LOCK = threading.Lock()  # Extractors may run in threads (_map_concurrently)
+
+
+def _compile_path(path, casesense, traverse_string):
+    try:
+        cache_key = (_freeze_path(path), casesense, traverse_string)
+    except _Uncacheable:
+        return _CompiledPath(path, casesense, traverse_string)
+
+    compiled = _COMPILED_PATHS.get(cache_key)
+    if compiled is None:
+        compiled = _CompiledPath(path, casesense, traverse_string)
+        with _COMPILED_PATHS_LOCK:
+            compiled = _COMPILED_PATHS.setdefault(cache_key, compiled)
+            if len(_COMPILED_PATHS) > _COMPILED_PATHS_MAX_SIZE:
+                _COMPILED_PATHS.pop(next(iter(_COMPILED_PATHS)))
+    return compiled
 
 
 def get_first(obj, *paths, **kwargs):